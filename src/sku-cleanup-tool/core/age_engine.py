@@ -0,0 +1,89 @@
+"""
+Batch SKU age calculation for SKU Cleanup Tool
+Parses each distinct open-date once and computes ages for the whole catalog in one NumPy pass
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# UTC offsets in minutes for the timezone abbreviations Amazon uses in report open-dates
+TIMEZONE_OFFSETS: Dict[str, int] = {
+    'UTC': 0, 'GMT': 0, 'WET': 0, 'BST': 60, 'WEST': 60,
+    'CET': 60, 'CEST': 120, 'MET': 60, 'MEST': 120, 'EET': 120, 'EEST': 180,
+    'EST': -300, 'EDT': -240, 'CST': -360, 'CDT': -300, 'MST': -420, 'MDT': -360,
+    'PST': -480, 'PDT': -420, 'AKST': -540, 'AKDT': -480, 'HST': -600,
+    'JST': 540, 'AEST': 600, 'AEDT': 660, 'NZST': 720, 'NZDT': 780
+}
+
+NOT_A_TIME = np.datetime64('NaT', 's')
+
+class AgeEngine:
+    """Computes SKU ages in days against one run-wide reference time"""
+
+    def __init__(self, reference_time: Optional[datetime] = None):
+        self.reference_time = (reference_time or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        self._reference = np.datetime64(self.reference_time.replace(tzinfo=None), 's')
+        self._instants: Dict[str, np.datetime64] = {}  # Memoized UTC instant per distinct date string
+        self._unknown_zones = set()
+
+    def ages(self, created_dates: Sequence[Optional[str]]) -> np.ndarray:
+        """Whole days since each created date as a float array, NaN where the date is missing or invalid"""
+        if len(created_dates) == 0:
+            return np.empty(0)
+
+        # Position of each row's date among the distinct dates, so each distinct string is looked up once
+        distinct: Dict[str, int] = {}
+        positions = [distinct.setdefault(created_date or '', len(distinct)) for created_date in created_dates]
+        instants = np.array([self.parse(created_date) for created_date in distinct], dtype='datetime64[s]')[positions]
+
+        return np.floor((self._reference - instants) / np.timedelta64(1, 'D'))
+
+    def evaluate(self, created_dates: Sequence[Optional[str]], threshold_days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Ages and the age >= threshold_days mask for every created date (invalid dates are never old enough)"""
+        ages = self.ages(created_dates)
+        with np.errstate(invalid='ignore'):
+            return ages, ages >= threshold_days
+
+    def parse(self, created_date: str) -> np.datetime64:
+        """UTC instant for a "DD/MM/YYYY[ HH:MM:SS TZ]" date, memoized per distinct string"""
+        instant = self._instants.get(created_date)
+        if instant is None:
+            instant = self._instants[created_date] = self._parse(created_date)
+        return instant
+
+    def _parse(self, created_date: str) -> np.datetime64:
+        """Parse one open-date string into a UTC datetime64 (NaT when unusable)"""
+        if not created_date:
+            logger.debug("No creation date provided")
+            return NOT_A_TIME
+
+        try:
+            parts = created_date.split()
+            day, month, year = parts[0].split('/')
+            if len(parts) == 1:
+                # Date only - a calendar day in the run's local timezone
+                local = datetime(int(year), int(month), int(day)).astimezone()
+                return np.datetime64(local.astimezone(timezone.utc).replace(tzinfo=None), 's')
+
+            hour, minute, second = (int(value) for value in parts[1].split(':'))
+            offset = self._timezone_offset(parts[2] if len(parts) > 2 else 'UTC')
+            local = datetime(int(year), int(month), int(day), hour, minute, second)
+            return np.datetime64(local - timedelta(minutes=offset), 's')
+
+        except (ValueError, IndexError, AttributeError) as e:
+            logger.warning(f"Invalid date format '{created_date}': {e}")
+            return NOT_A_TIME
+
+    def _timezone_offset(self, zone: str) -> int:
+        """UTC offset in minutes for a timezone abbreviation, treating unknown zones as UTC"""
+        offset = TIMEZONE_OFFSETS.get(zone.upper())
+        if offset is None:
+            if zone not in self._unknown_zones:
+                self._unknown_zones.add(zone)
+                logger.warning(f"Unknown timezone '{zone}' in report dates - treating as UTC")
+            return 0
+        return offset
@@ -2,9 +2,18 @@
 Amazon SP-API integration for SKU Cleanup Tool
 Handles authentication, report generation, and SKU operations with API resilience
 """
+import csv
+import gzip
+import io
+import json
+import hashlib
+import os
+import statistics
 import time
 import logging
-from typing import Dict, List, Optional, Any
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set
 from datetime import datetime, timedelta
 import requests
 import boto3
@@ -13,80 +22,296 @@ from urllib.parse import quote
 
 from .config import AmazonCredentials, config
 from .resilience import (
-    exponential_backoff,
     CircuitBreaker,
     CircuitBreakerConfig,
+    RetryPolicy,
     create_session_with_pool,
     get_api_session,
+    get_rate_limiter,
+    get_retry_budget,
     ErrorType
 )
+from .inventory_snapshot import FBA_INVENTORY_BATCH_SIZE, InventorySnapshotStore, has_inbound_inventory
+from .ranged_download import RangedDownloader
+from .report_cache import ReportDocumentCache, tee_lines
+from .sku_table import SkuTable
+from .token_manager import AccessTokenManager, TokenCache, token_cache_key
+from .concurrency import ConcurrencyController
+from .request_pipeline import (
+    APIRequest,
+    AuthMiddleware,
+    CircuitBreakerMiddleware,
+    ConcurrencyMiddleware,
+    HTTPTransport,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RequestMetrics,
+    ResponseMiddleware,
+    RetryMiddleware,
+    compose
+)
+from .utils import chunk_list
 
 logger = logging.getLogger(__name__)
 
-class AmazonAPI:
-    """Amazon Selling Partner API integration with resilience patterns"""
+# searchListingsItems accepts up to 20 SKUs in the identifiers parameter
+LISTINGS_SEARCH_BATCH_SIZE = 20
+
+# Listings Items data needed to tell whether a SKU still holds stock
+LISTING_INVENTORY_INCLUDED_DATA = 'summaries,fulfillmentAvailability'
+
+# JSON_LISTINGS_FEED accepts up to 10,000 messages per feed
+LISTINGS_FEED_TYPE = 'JSON_LISTINGS_FEED'
+LISTINGS_FEED_MAX_MESSAGES = 10000
+FEED_CONTENT_TYPE = 'application/json; charset=UTF-8'
+
+MERCHANT_LISTINGS_REPORT_TYPE = 'GET_MERCHANT_LISTINGS_ALL_DATA'
+FBA_INVENTORY_REPORT_TYPE = 'GET_FBA_MYI_ALL_INVENTORY_DATA'
+
+EU_BASE_URL = 'https://sellingpartnerapi-eu.amazon.com'
+NA_BASE_URL = 'https://sellingpartnerapi-na.amazon.com'
+FE_BASE_URL = 'https://sellingpartnerapi-fe.amazon.com'
+
+# Marketplace ID -> regional SP-API endpoint, resolved once per client
+MARKETPLACE_BASE_URLS = {
+    # EU marketplaces
+    'A1F83G8C2ARO7P': EU_BASE_URL,  # UK
+    'A1PA6795UKMFR9': EU_BASE_URL,  # UK (another one)
+    'A1RKKUPIHCS9HS': EU_BASE_URL,  # Spain
+    'A13V1IB3VIYZZH': EU_BASE_URL,  # France
+    'A1JEUMLCLC2WX2': EU_BASE_URL,  # Germany
+    'A1805IZSGTT6HS': EU_BASE_URL,  # Italy
+    'A2NODRKZP88ZB9': EU_BASE_URL,  # Sweden
+    'A1C3SOZRARQ6R3': EU_BASE_URL,  # Poland
+    'A17E79C6D8DWNP': EU_BASE_URL,  # Netherlands
+    'AE08WJ6YKNBMC': EU_BASE_URL,   # Belgium
+
+    # NA marketplaces
+    'ATVPDKIKX0DER': NA_BASE_URL,   # US
+    'A1AM78C64UM0Y8': NA_BASE_URL,  # Canada
+    'A2Q3Y263D00KWC': NA_BASE_URL,  # Brazil
+    'APJ6JRA9NG5V4': NA_BASE_URL,   # Mexico
+
+    # FE marketplaces
+    'A2EUQ1WTGCTBG2': FE_BASE_URL,  # Australia
+    'A1VC38T7YXB528': FE_BASE_URL,  # Japan
+    'A39IBJ37TRP1C6': FE_BASE_URL,  # Turkey
+    'AAHKV2XAUZCBG': FE_BASE_URL,   # India
+    'A19VAU5U5O7RUS': FE_BASE_URL,  # Singapore
+    'A2ZV50J4W1RKNI': FE_BASE_URL,  # UAE
+}
+
+DEFAULT_REPORT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'report_cache')
+DEFAULT_SHARED_RATE_LIMIT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'rate_limits')
+DEFAULT_TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'lwa_token_cache.json')
+
+LWA_TOKEN_URL = "https://api.amazon.com/auth/o2/token"
+
+class SPAPIEndpointMixin:
+    """Endpoint routing and response parsing shared by the sync and async SP-API clients"""
 
-    def __init__(self, credentials: AmazonCredentials):
-        self.credentials = credentials
-        self.access_token = None
-        self.token_expiry = None
+    def _get_base_url_for_marketplace(self) -> str:
+        """Determine the correct base URL based on marketplace ID"""
+        marketplace_id = self.credentials.marketplace_id
 
-        # Initialize AWS clients
-        self._init_aws_clients()
+        if marketplace_id in MARKETPLACE_BASE_URLS:
+            return MARKETPLACE_BASE_URLS[marketplace_id]
 
-        # Initialize resilience components
-        self._init_resilience()
+        # Default to EU for UK marketplace as fallback
+        logger.warning(f"Unknown marketplace ID: {marketplace_id}, defaulting to EU endpoint")
+        return EU_BASE_URL
 
-    def _init_resilience(self):
-        """Initialize circuit breakers and session management"""
-        # Create circuit breakers for different API endpoints
-        cb_config = CircuitBreakerConfig(
-            failure_threshold=config.settings.resilience.circuit_breaker_failure_threshold,
-            recovery_timeout=config.settings.resilience.circuit_breaker_recovery_timeout
-        )
+    def _get_circuit_breaker_for_endpoint(self, endpoint: str) -> str:
+        """Determine which circuit breaker to use based on endpoint"""
+        if '/reports/' in endpoint:
+            return 'reports'
+        elif '/fba/inventory/' in endpoint:
+            return 'fba_inventory'
+        elif '/listings/' in endpoint:
+            return 'listings'
+        elif '/feeds/' in endpoint:
+            return 'feeds'
+        else:
+            return 'auth'  # Default fallback
 
-        self.circuit_breakers = {
-            'reports': CircuitBreaker('reports_api', cb_config),
-            'fba_inventory': CircuitBreaker('fba_inventory_api', cb_config),
-            'listings': CircuitBreaker('listings_api', cb_config),
-            'auth': CircuitBreaker('auth_api', cb_config)
+    def _get_operation_for_request(self, method: str, endpoint: str) -> str:
+        """Map a request to its SP-API operation name for rate limiting"""
+        path = endpoint.split('?', 1)[0]
+        method = method.upper()
+
+        if path.startswith('/fba/inventory/v1/summaries'):
+            return 'getInventorySummaries'
+        elif path.startswith('/reports/2021-06-30/documents/'):
+            return 'getReportDocument'
+        elif path.startswith('/reports/2021-06-30/reports/'):
+            return 'getReport'
+        elif path.startswith('/reports/2021-06-30/reports'):
+            return 'createReport' if method == 'POST' else 'getReports'
+        elif path.startswith('/reports/2021-06-30/schedules'):
+            return 'createReportSchedule' if method == 'POST' else 'getReportSchedules'
+        elif path.startswith('/feeds/2021-06-30/documents/'):
+            return 'getFeedDocument'
+        elif path.startswith('/feeds/2021-06-30/documents'):
+            return 'createFeedDocument'
+        elif path.startswith('/feeds/2021-06-30/feeds/'):
+            return 'getFeed'
+        elif path.startswith('/feeds/2021-06-30/feeds'):
+            return 'createFeed' if method == 'POST' else 'getFeeds'
+        elif path.startswith('/listings/2021-08-01/items/'):
+            if path.rstrip('/').count('/') == 4:  # /listings/2021-08-01/items/{sellerId}
+                return 'searchListingsItems'
+            return 'deleteListingsItem' if method == 'DELETE' else 'getListingsItem'
+        else:
+            return 'unknown'
+
+    def _inventory_summary_params(self) -> List[str]:
+        """Base getInventorySummaries query parameters for the configured marketplace"""
+        return [
+            'details=true',
+            'granularityType=Marketplace',
+            f'granularityId={self.credentials.marketplace_id}',
+            f'marketplaceIds={self.credentials.marketplace_id}'
+        ]
+
+    def _process_fba_response(self, sku, response):
+        """Process FBA API response and extract inventory data for specific SKU"""
+        # Check if we got an expected error response
+        if '_status_code' in response:
+            if response['_status_code'] in [400, 404]:
+                # SKU not found in FBA inventory - treat as safe for deletion
+                logger.debug(f"SKU {sku} not found in FBA inventory (status {response['_status_code']}) - safe for deletion")
+                return self._empty_fba_result(sku)
+
+        # Extract inventory information from successful response
+        payload = response.get('payload', {})
+        inventory_summaries = payload.get('inventorySummaries', [])
+
+        logger.info(f"FBA response for {sku} contains {len(inventory_summaries)} inventory summaries")
+
+        if inventory_summaries:
+            # Find the specific SKU in the response
+            inventory = None
+            for summary in inventory_summaries:
+                if summary.get('sellerSku') == sku:
+                    inventory = summary
+                    logger.info(f"Successfully matched SKU '{sku}' in response")
+                    break
+
+            if inventory:
+                result = self._build_fba_result(inventory)
+                logger.debug(f"SKU {sku} FBA inventory: fulfillable={result['fulfillableQuantity']}, inbound={result.get('inboundWorkingQuantity', 0)}")
+                return result
+            else:
+                # SKU not found in response - treat as no inventory
+                logger.warning(f"SKU {sku} not found in FBA inventory response")
+                return self._empty_fba_result(sku)
+        else:
+            # No inventory found
+            logger.debug(f"No inventory data found for SKU {sku}")
+            return self._empty_fba_result(sku)
+
+    def _build_fba_result(self, inventory: Dict) -> Dict:
+        """Convert a single inventory summary into the FBA inventory result shape"""
+        # Use detailed inventory information if available
+        inventory_details = inventory.get('inventoryDetails', {})
+
+        result = {
+            'sellerSku': inventory.get('sellerSku', ''),
+            'asin': inventory.get('asin', ''),
+            'productName': inventory.get('productName', ''),
+            'condition': inventory.get('condition', ''),
+            'totalQuantity': inventory.get('totalQuantity', 0),
+            'lastUpdatedTime': inventory.get('lastUpdatedTime', '')
         }
 
-        # Use shared session for connection pooling
-        self.session = get_api_session()
+        # Extract detailed inventory quantities
+        if inventory_details:
+            result.update({
+                'fulfillableQuantity': inventory_details.get('fulfillableQuantity', 0),
+                'inboundWorkingQuantity': inventory_details.get('inboundWorkingQuantity', 0),
+                'inboundShippedQuantity': inventory_details.get('inboundShippedQuantity', 0),
+                'inboundReceivingQuantity': inventory_details.get('inboundReceivingQuantity', 0),
+                'reservedQuantity': inventory_details.get('reservedQuantity', {}).get('totalReservedQuantity', 0),
+                'unfulfillableQuantity': inventory_details.get('unfulfillableQuantity', {}).get('totalUnfulfillableQuantity', 0)
+            })
+        else:
+            # Fallback to basic quantities if details not available
+            result.update({
+                'fulfillableQuantity': inventory.get('fulfillableQuantity', 0),
+                'inboundQuantity': inventory.get('inboundQuantity', 0),
+                'reservedQuantity': inventory.get('reservedQuantity', 0)
+            })
+
+        return result
+
+    def _empty_fba_result(self, sku: str) -> Dict:
+        """Safe default FBA inventory result for a SKU with no inventory data"""
+        return {
+            'sellerSku': sku,
+            'fulfillableQuantity': 0,
+            'inboundQuantity': 0,
+            'reservedQuantity': 0
+        }
 
-    def _init_aws_clients(self):
-        """Initialize AWS clients for SP-API"""
-        try:
-            self.sp_client = boto3.client(
-                's3',  # We'll use S3 for downloading reports
-                aws_access_key_id=self.credentials.access_key_id,
-                aws_secret_access_key=self.credentials.secret_access_key,
-                region_name='us-east-1'  # SP-API uses us-east-1
-            )
-        except Exception as e:
-            logger.error(f"Failed to initialize AWS client: {e}")
-            raise
+    def _failed_fba_results(self, skus: List[str], summaries_by_sku: Dict[str, Dict], error: str) -> Dict[str, Dict]:
+        """Results for a batched lookup that failed part-way: SKUs not yet returned keep the error"""
+        results = {}
+        for sku in skus:
+            if sku in summaries_by_sku:
+                results[sku] = self._build_fba_result(summaries_by_sku[sku])
+            else:
+                results[sku] = self._empty_fba_result(sku)
+                results[sku]['error'] = error
+        return results
+
+    def _init_report_cache(self) -> Optional[ReportDocumentCache]:
+        """Create the on-disk report document cache when enabled"""
+        settings = config.settings
+        if not settings.report_cache_enabled:
+            return None
+        return ReportDocumentCache(
+            settings.report_cache_dir or DEFAULT_REPORT_CACHE_DIR,
+            ttl_seconds=settings.report_cache_ttl_hours * 60 * 60,
+            max_entries=settings.report_cache_max_entries
+        )
 
-    @exponential_backoff(
-        max_retries=config.settings.resilience.max_retries,
-        base_delay=config.settings.resilience.base_delay,
-        max_delay=config.settings.resilience.max_delay,
-        backoff_factor=config.settings.resilience.backoff_factor,
-        jitter=config.settings.resilience.jitter
-    )
-    def _get_access_token(self) -> str:
-        """Get or refresh access token for SP-API with circuit breaker protection"""
-        now = datetime.utcnow()
+    def _init_token_cache(self) -> Optional[TokenCache]:
+        """Create the owner-only on-disk access token cache when enabled"""
+        settings = config.settings
+        if not settings.token_cache_enabled:
+            return None
+        return TokenCache(settings.token_cache_file or DEFAULT_TOKEN_CACHE_FILE)
+
+    def _token_cache_key(self) -> str:
+        """Cache key for this client's LWA application and refresh token"""
+        return token_cache_key(self.credentials.lwa_client_id, self.credentials.lwa_refresh_token)
+
+    def _create_token_manager(self, fetch_token: Callable[[], Dict]) -> AccessTokenManager:
+        """Single-flight, proactively refreshed LWA token holder shared by every caller of this client"""
+        return AccessTokenManager(
+            fetch_token,
+            cache=self._init_token_cache(),
+            cache_key=self._token_cache_key(),
+            refresh_margin_seconds=config.settings.token_refresh_margin_seconds,
+            background_refresh=config.settings.token_background_refresh
+        )
 
-        # Check if we have a valid token
-        if (self.access_token and self.token_expiry and
-            now < self.token_expiry - timedelta(minutes=5)):
-            return self.access_token
+    def _create_concurrency_controller(self) -> Optional[ConcurrencyController]:
+        """AIMD per-operation concurrency limits starting from the configured worker count (None when disabled)"""
+        resilience = config.settings.resilience
+        if not resilience.adaptive_concurrency:
+            return None
+
+        return ConcurrencyController(
+            initial_limit=resilience.max_workers,
+            min_limit=1,
+            max_limit=resilience.concurrency_max_limit
+        )
 
+    def _request_lwa_token(self, session: requests.Session) -> Dict:
+        """Exchange the LWA refresh token for a new access token (blocking)"""
         logger.info("Getting new access token...")
 
-        token_url = "https://api.amazon.com/auth/o2/token"
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded'
         }
@@ -99,8 +324,11 @@ class AmazonAPI:
         }
 
         try:
-            response = self.session.post(
-                token_url,
+            if self.rate_limiter:
+                self.rate_limiter.acquire('token')
+
+            response = session.post(
+                LWA_TOKEN_URL,
                 headers=headers,
                 data=data,
                 timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout)
@@ -108,154 +336,415 @@ class AmazonAPI:
             response.raise_for_status()
 
             token_data = response.json()
-            self.access_token = token_data['access_token']
-            # Token is valid for 1 hour (3600 seconds)
-            self.token_expiry = now + timedelta(seconds=token_data['expires_in'])
-
             logger.info("Successfully obtained access token")
-            return self.access_token
+            return token_data
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get access token: {e}")
             raise
 
-    def _get_base_url_for_marketplace(self) -> str:
-        """Determine the correct base URL based on marketplace ID"""
-        marketplace_id = self.credentials.marketplace_id
-
-        # EU marketplaces
-        eu_marketplaces = [
-            'A1F83G8C2ARO7P',  # UK
-            'A1PA6795UKMFR9',  # UK (another one)
-            'A1RKKUPIHCS9HS',  # Spain
-            'A13V1IB3VIYZZH',  # France
-            'A1JEUMLCLC2WX2',  # Germany
-            'A1805IZSGTT6HS',  # Italy
-            'A2NODRKZP88ZB9',  # Sweden
-            'A1C3SOZRARQ6R3',  # Poland
-            'A17E79C6D8DWNP',  # Netherlands
-            'AE08WJ6YKNBMC',   # Belgium
+    def _shared_rate_limit_path(self) -> Optional[str]:
+        """State file shared by every process using this seller account and LWA application"""
+        resilience = config.settings.resilience
+        if not resilience.shared_rate_limiting:
+            return None
+
+        # SP-API usage plans apply per selling partner and application, across marketplaces
+        key = hashlib.sha256(f"{self.credentials.seller_id}:{self.credentials.lwa_client_id}".encode('utf-8')).hexdigest()[:32]
+        return os.path.join(resilience.shared_rate_limit_dir or DEFAULT_SHARED_RATE_LIMIT_DIR, f"{key}.sqlite3")
+
+    def _report_reuse_max_age_minutes(self) -> int:
+        """How recent a DONE report must be to reuse; scheduling widens the window to cover the lead time"""
+        settings = config.settings
+        if settings.report_schedule_enabled:
+            return max(settings.report_reuse_max_age_minutes, settings.report_schedule_max_age_minutes)
+        return settings.report_reuse_max_age_minutes
+
+    def _next_report_schedule_time(self, now: datetime) -> Optional[datetime]:
+        """Next UTC time for scheduled reports to be generated: the lead time before the next cleanup run"""
+        settings = config.settings
+        if not settings.report_schedule_run_time:
+            return None
+
+        hour, minute = (int(part) for part in settings.report_schedule_run_time.split(':'))
+        creation_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0) - timedelta(
+            minutes=settings.report_schedule_lead_minutes
+        )
+        while creation_time <= now:
+            creation_time += timedelta(days=1)
+        return creation_time
+
+    def _find_cached_report(self, report_type: str, max_age_minutes: int) -> Optional[str]:
+        """Return the document ID of a cached report recent enough to reuse without any API call"""
+        if not self.report_cache:
+            return None
+
+        document_id = self.report_cache.latest(report_type, self.credentials.marketplace_id, max_age_minutes * 60)
+        if document_id:
+            logger.info(f"Reusing cached {report_type} document {document_id} (within {max_age_minutes} minutes)")
+        return document_id
+
+    def _recent_reports_endpoint(self, report_type: str, max_age_minutes: int) -> str:
+        """getReports query for DONE reports of a type created within the reuse window"""
+        created_since = datetime.utcnow() - timedelta(minutes=max_age_minutes)
+        params = [
+            f'reportTypes={report_type}',
+            'processingStatuses=DONE',
+            f'marketplaceIds={self.credentials.marketplace_id}',
+            f"createdSince={quote(created_since.strftime('%Y-%m-%dT%H:%M:%SZ'), safe='')}",
+            'pageSize=10'
         ]
+        return f"/reports/2021-06-30/reports?{'&'.join(params)}"
 
-        # NA marketplaces
-        na_marketplaces = [
-            'ATVPDKIKX0DER',   # US
-            'A1AM78C64UM0Y8',  # Canada
-            'A2Q3Y263D00KWC',  # Brazil
-            'APJ6JRA9NG5V4',   # Mexico
-        ]
+    def _select_reusable_report(self, reports: List[Dict]) -> Optional[Dict]:
+        """Pick the most recently finished DONE report that has a document, recording generation times"""
+        for report in reports:
+            self._record_report_duration(report)
+
+        done = [report for report in reports
+                if report.get('processingStatus') == 'DONE' and report.get('reportDocumentId')]
+        return max(done, key=lambda report: report.get('processingEndTime') or report.get('createdTime') or '',
+                   default=None)
+
+    def _record_report_duration(self, report: Dict, fallback_seconds: Optional[float] = None):
+        """Remember how long a report took to generate so polling can be tuned to it"""
+        duration = fallback_seconds
+        try:
+            start = datetime.fromisoformat(report['processingStartTime'].replace('Z', '+00:00'))
+            end = datetime.fromisoformat(report['processingEndTime'].replace('Z', '+00:00'))
+            duration = (end - start).total_seconds()
+        except (KeyError, AttributeError, ValueError):
+            pass
+
+        if duration is not None and duration >= 0:
+            self._report_durations.append(duration)
+
+    def _record_report_generated_at(self, report: Dict):
+        """Remember when Amazon finished a report so its cached document ages from then, not from the download"""
+        for field in ('processingEndTime', 'createdTime'):
+            try:
+                generated_at = datetime.fromisoformat(report[field].replace('Z', '+00:00'))
+            except (KeyError, AttributeError, ValueError):
+                continue
+            self._report_generated_at[report.get('reportDocumentId')] = generated_at.timestamp()
+            return
+
+    def _report_poll_delays(self) -> Iterator[float]:
+        """Yield poll intervals: first wait about as long as recent reports took, then grow toward the cap"""
+        initial = config.settings.report_poll_initial_interval
+        max_interval = config.settings.report_poll_max_interval
+
+        if self._report_durations:
+            expected = statistics.median(self._report_durations)
+            yield min(max(expected, initial), max_interval)
+
+        interval = initial
+        while True:
+            yield interval
+            interval = min(interval * 1.5, max_interval)
+
+    def _parse_report_row(self, row: Dict[str, str]) -> Dict:
+        """Convert a GET_MERCHANT_LISTINGS_ALL_DATA row into a SKU record"""
+        # Clean up the data and convert types
+        return {
+            'sku': row.get('seller-sku', '').strip(),  # Fix: use 'seller-sku' not 'sku'
+            'asin': row.get('asin1', '').strip(),  # Fix: use 'asin1' not 'asin'
+            'created_date': row.get('open-date', '').strip(),  # Fix: use 'open-date' not 'created-date'
+            'fulfillment_channel': row.get('fulfillment-channel', '').strip(),
+            'quantity': int(row.get('quantity', 0) or 0),
+            'item_name': row.get('item-name', '').strip(),
+            'open_date': row.get('open-date', '').strip(),
+            'image_url': row.get('image-url', '').strip(),
+            'item_description': row.get('item-description', '').strip(),
+            'listing_id': row.get('listing-id', '').strip(),
+            'seller_sku': row.get('seller-sku', '').strip()
+        }
+
+    def _parse_fba_inventory_row(self, row: Dict[str, str]) -> Dict:
+        """Convert a GET_FBA_MYI_ALL_INVENTORY_DATA row into the FBA inventory result shape"""
+        def quantity(column: str) -> int:
+            return int(row.get(column, 0) or 0)
 
-        # FE marketplaces
-        fe_marketplaces = [
-            'A2EUQ1WTGCTBG2',  # Australia
-            'A1VC38T7YXB528',  # Japan
-            'A39IBJ37TRP1C6',   # Turkey
-            'AAHKV2XAUZCBG',    # India
-            'A19VAU5U5O7RUS',  # Singapore
-            'A2ZV50J4W1RKNI',  # UAE
+        inbound = {
+            'inboundWorkingQuantity': quantity('afn-inbound-working-quantity'),
+            'inboundShippedQuantity': quantity('afn-inbound-shipped-quantity'),
+            'inboundReceivingQuantity': quantity('afn-inbound-receiving-quantity')
+        }
+        return {
+            'sellerSku': row.get('sku', '').strip(),
+            'asin': row.get('asin', '').strip(),
+            'productName': row.get('product-name', '').strip(),
+            'condition': row.get('condition', '').strip(),
+            'totalQuantity': quantity('afn-total-quantity'),
+            'fulfillableQuantity': quantity('afn-fulfillable-quantity'),
+            **inbound,
+            'inboundQuantity': sum(inbound.values()),
+            'reservedQuantity': quantity('afn-reserved-quantity'),
+            'unfulfillableQuantity': quantity('afn-unsellable-quantity')
+        }
+
+    def _iter_report_records(self, lines: Iterable[str],
+                             report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> Iterator[Dict]:
+        """Parse TSV report lines into records one row at a time"""
+        parse_row = self._parse_fba_inventory_row if report_type == FBA_INVENTORY_REPORT_TYPE else self._parse_report_row
+        for row in csv.DictReader(lines, delimiter='\t'):
+            yield parse_row(row)
+
+    def _parse_report_stream(self, stream: BinaryIO, compression: Optional[str], encoding: Optional[str],
+                             report_type: str, report_document_id: str) -> Iterator[Dict]:
+        """Parse a downloading report document into records, copying it into the report cache when enabled"""
+        lines = self._open_report_lines(stream, compression, encoding)
+
+        if not self.report_cache:
+            yield from self._iter_report_records(lines, report_type)
+            return
+
+        # Copy the decoded document into the cache while parsing it
+        with self.report_cache.writer(report_type, report_document_id, self.credentials.marketplace_id,
+                                      self._report_generated_at.get(report_document_id)) as sink:
+            yield from self._iter_report_records(tee_lines(lines, sink), report_type)
+
+    def _open_report_lines(self, stream: BinaryIO, compression: Optional[str], encoding: Optional[str]) -> io.TextIOWrapper:
+        """Wrap a binary report stream so it decompresses and decodes incrementally"""
+        if compression == 'GZIP':
+            stream = gzip.GzipFile(fileobj=stream)
+        return io.TextIOWrapper(stream, encoding=encoding or 'utf-8', errors='replace', newline='')
+
+    def _listing_item_endpoint(self, sku: str) -> str:
+        """Listings Items API path for one SKU"""
+        return f"/listings/2021-08-01/items/{self.credentials.seller_id}/{quote(sku, safe='')}"
+
+    def _search_listings_endpoint(self, skus: List[str], included_data: Optional[str] = None) -> str:
+        """searchListingsItems query for up to LISTINGS_SEARCH_BATCH_SIZE SKUs"""
+        params = [
+            f'marketplaceIds={self.credentials.marketplace_id}',
+            f"identifiers={','.join(quote(sku, safe='') for sku in skus)}",
+            'identifiersType=SKU',
+            f'pageSize={LISTINGS_SEARCH_BATCH_SIZE}'
         ]
+        if included_data:
+            params.append(f'includedData={included_data}')
+        return f"/listings/2021-08-01/items/{self.credentials.seller_id}?{'&'.join(params)}"
+
+    def _build_listings_delete_feed(self, skus: List[str]) -> Dict:
+        """Build a JSON_LISTINGS_FEED body with one DELETE message per SKU (messageId = position + 1)"""
+        return {
+            'header': {
+                'sellerId': self.credentials.seller_id,
+                'version': '2.0',
+                'issueLocale': 'en_US'
+            },
+            'messages': [
+                {'messageId': message_id, 'sku': sku, 'operationType': 'DELETE'}
+                for message_id, sku in enumerate(skus, start=1)
+            ]
+        }
 
-        if marketplace_id in eu_marketplaces:
-            return 'https://sellingpartnerapi-eu.amazon.com'
-        elif marketplace_id in na_marketplaces:
-            return 'https://sellingpartnerapi-na.amazon.com'
-        elif marketplace_id in fe_marketplaces:
-            return 'https://sellingpartnerapi-fe.amazon.com'
-        else:
-            # Default to EU for UK marketplace as fallback
-            logger.warning(f"Unknown marketplace ID: {marketplace_id}, defaulting to EU endpoint")
-            return 'https://sellingpartnerapi-eu.amazon.com'
+    def _parse_feed_processing_report(self, skus: List[str], report: Dict) -> Dict[str, Optional[str]]:
+        """Map a feed processing report to an error message (or None on success) per SKU"""
+        errors_by_message = {}
+        for issue in report.get('issues', []):
+            if issue.get('severity') == 'ERROR' and issue.get('messageId') is not None:
+                errors_by_message.setdefault(issue['messageId'], f"{issue.get('code', 'ERROR')}: {issue.get('message', '')}")
+
+        return {sku: errors_by_message.get(message_id) for message_id, sku in enumerate(skus, start=1)}
+
+    def _build_listing_inventory_result(self, sku: str, response: Dict) -> Dict:
+        """Summarize getListingsItem fulfillment availability for a SKU"""
+        # Extract fulfillment availability information
+        fulfillment_availability = response.get('fulfillmentAvailability', [])
+
+        total_quantity = 0
+        fba_quantity = 0
+
+        for fulfillment in fulfillment_availability:
+            quantity = fulfillment.get('quantity', 0)
+            total_quantity += quantity
+
+            # Check if this is FBA fulfillment
+            fulfillment_code = fulfillment.get('fulfillmentChannelCode', '')
+            if fulfillment_code in ['AMAZON', 'DEFAULT']:  # DEFAULT often means FBA
+                fba_quantity += quantity
+
+        return {
+            'sellerSku': sku,
+            'total_quantity': total_quantity,
+            'fba_quantity': fba_quantity,
+            'fulfillment_availability': fulfillment_availability,
+            'has_inventory': total_quantity > 0
+        }
 
-    def _get_circuit_breaker_for_endpoint(self, endpoint: str) -> str:
-        """Determine which circuit breaker to use based on endpoint"""
-        if '/reports/' in endpoint:
-            return 'reports'
-        elif '/fba/inventory/' in endpoint:
-            return 'fba_inventory'  # Still return name for logging, but won't use circuit breaker
-        elif '/listings/' in endpoint:
-            return 'listings'
+    def _listing_not_found_result(self, sku: str) -> Dict:
+        """Listing inventory result for a SKU that is not (or no longer) listed"""
+        return {
+            'sellerSku': sku,
+            'total_quantity': 0,
+            'fba_quantity': 0,
+            'fulfillment_availability': [],
+            'has_inventory': False
+        }
+
+    def _listing_error_result(self, sku: str, error: Exception) -> Dict:
+        """Conservative listing inventory result used when the check itself fails"""
+        # For safety, assume has inventory if API fails
+        return {
+            'sellerSku': sku,
+            'total_quantity': 999,  # High number to be conservative
+            'fba_quantity': 999,
+            'fulfillment_availability': [],
+            'has_inventory': True,
+            'error': str(error)
+        }
+
+    def _build_listing_inventory_batch(self, skus: List[str], response: Dict) -> Dict[str, Dict]:
+        """Listing inventory results for one searchListingsItems chunk; SKUs not returned are no longer listed"""
+        items_by_sku = {item.get('sku'): item for item in response.get('items', [])}
+        return {
+            sku: self._build_listing_inventory_result(sku, items_by_sku[sku]) if sku in items_by_sku
+            else self._listing_not_found_result(sku)
+            for sku in skus
+        }
+
+    def _log_delete_response(self, sku: str, response: Dict):
+        """Log the outcome reported by a deleteListingsItem response"""
+        logger.info(f"DELETE API response for {sku}: {response}")
+
+        # Check if response indicates success
+        if response.get('status') == 'ACCEPTED':
+            logger.info(f"✅ SKU {sku} deletion accepted by Amazon")
+        elif response.get('status') == 'INVALID':
+            logger.warning(f"❌ SKU {sku} deletion rejected as invalid: {response.get('issues', [])}")
         else:
-            return 'auth'  # Default fallback
+            logger.warning(f"⚠️ SKU {sku} deletion status unclear: {response.get('status', 'unknown')}")
 
-    def _make_api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
-        """Make authenticated API request to SP-API with resilience patterns"""
-        token = self._get_access_token()
+class AmazonAPI(SPAPIEndpointMixin):
+    """Amazon Selling Partner API integration with resilience patterns"""
 
-        # Extract our custom parameters before passing to requests
-        expected_errors = kwargs.pop('expected_errors', [])
+    def __init__(self, credentials: AmazonCredentials):
+        self.credentials = credentials
+        self._report_durations = deque(maxlen=10)  # Recent report generation times in seconds
+        self._report_generated_at: Dict[str, float] = {}  # reportDocumentId -> epoch seconds Amazon finished it
+        self.report_cache = self._init_report_cache()
 
-        headers = {
-            'x-amz-access-token': token,
-            'Content-Type': 'application/json',
-            **kwargs.get('headers', {})
+        # Initialize AWS clients
+        self._init_aws_clients()
+
+        # Initialize resilience components
+        self._init_resilience()
+
+        # Single-flight, proactively refreshed LWA token shared by all worker threads
+        # On-demand refreshes run inside AuthMiddleware, so the pipeline's RetryMiddleware is their only retry layer
+        self.token_manager = self._create_token_manager(self._request_new_token)
+
+    def _init_resilience(self):
+        """Initialize circuit breakers and session management"""
+        # Create circuit breakers for different API endpoints
+        cb_config = CircuitBreakerConfig(
+            failure_threshold=config.settings.resilience.circuit_breaker_failure_threshold,
+            recovery_timeout=config.settings.resilience.circuit_breaker_recovery_timeout,
+            error_rate_threshold=config.settings.resilience.circuit_breaker_error_rate_threshold,
+            window_seconds=config.settings.resilience.circuit_breaker_window_seconds,
+            half_open_max_calls=config.settings.resilience.circuit_breaker_half_open_max_calls
+        )
+
+        self.circuit_breakers = {
+            'reports': CircuitBreaker('reports_api', cb_config),
+            'fba_inventory': CircuitBreaker('fba_inventory_api', cb_config),
+            'listings': CircuitBreaker('listings_api', cb_config),
+            'feeds': CircuitBreaker('feeds_api', cb_config),
+            'auth': CircuitBreaker('auth_api', cb_config)
         }
 
-        base_url = self._get_base_url_for_marketplace()
-        url = f"{base_url}{endpoint}"
+        # Use shared session for connection pooling
+        self.session = get_api_session()
 
-        # Determine which circuit breaker to use
-        circuit_breaker_name = self._get_circuit_breaker_for_endpoint(endpoint)
+        # Shared per-operation token buckets pace requests to the SP-API usage plans
+        self.rate_limiter = (get_rate_limiter(self._shared_rate_limit_path())
+                             if config.settings.resilience.rate_limiting_enabled else None)
+
+        # Resolve the regional endpoint once instead of per request
+        self.base_url = self._get_base_url_for_marketplace()
+
+        # One retry layer for every request, drawing on the run-wide retry budget
+        resilience = config.settings.resilience
+        self.retry_policy = RetryPolicy(
+            max_retries=resilience.max_retries,
+            base_delay=resilience.base_delay,
+            max_delay=resilience.max_delay,
+            backoff_factor=resilience.backoff_factor,
+            jitter=resilience.jitter,
+            budget=get_retry_budget(resilience.retry_budget_ratio, resilience.retry_budget_min_retries)
+        )
 
-        # Skip circuit breaker for FBA inventory API since it works when tested individually
-        # but fails during bulk operations due to rate limiting
-        use_circuit_breaker = circuit_breaker_name != 'fba_inventory'
+        # AIMD per-operation concurrency limits, starting from the configured worker count
+        self.concurrency = self._create_concurrency_controller()
+
+        self.request_metrics = RequestMetrics()
+        self._build_pipelines()
+
+    def _build_pipelines(self):
+        """Compose the request middleware once per endpoint family"""
+        resilience = config.settings.resilience
+        transport = HTTPTransport(lambda: self.session, (resilience.connection_timeout, resilience.read_timeout))
+        retry = RetryMiddleware(self.retry_policy)
+
+        # Per attempt: token, pacing and response handling sit inside the retry loop
+        attempt_middleware = [ResponseMiddleware(), AuthMiddleware(lambda: self._get_access_token())]
+        if self.rate_limiter:
+            attempt_middleware.append(RateLimitMiddleware(self.rate_limiter))
+        if self.concurrency:
+            # Innermost so the measured latency is the request itself, not time spent waiting for a token
+            attempt_middleware.append(ConcurrencyMiddleware(self.concurrency))
+
+        self.pipelines = {}
+        for family, breaker in self.circuit_breakers.items():
+            # 429s drain the rate limiter instead of counting as failures, so every family keeps its breaker
+            self.pipelines[family] = compose(
+                [MetricsMiddleware(self.request_metrics), CircuitBreakerMiddleware(breaker), retry] + attempt_middleware,
+                transport
+            )
 
+    def _init_aws_clients(self):
+        """Initialize AWS clients for SP-API"""
         try:
-            if use_circuit_breaker:
-                circuit_breaker = self.circuit_breakers[circuit_breaker_name]
-
-                # Use circuit breaker and exponential backoff for non-FBA endpoints
-                @circuit_breaker
-                @exponential_backoff(
-                    max_retries=config.settings.resilience.max_retries,
-                    base_delay=config.settings.resilience.base_delay,
-                    max_delay=config.settings.resilience.max_delay,
-                    backoff_factor=config.settings.resilience.backoff_factor,
-                    jitter=config.settings.resilience.jitter
-                )
-                def _execute_request():
-                    response = self.session.request(
-                        method,
-                        url,
-                        headers=headers,
-                        timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout),
-                        **kwargs
-                    )
-
-                    # Check for expected error codes that should not raise exceptions
-                    if response.status_code in expected_errors:
-                        return {'_status_code': response.status_code, '_response_text': response.text}
-
-                    response.raise_for_status()
-                    return response.json()
-
-                return _execute_request()
-            else:
-                # Use only exponential backoff for FBA inventory API (no circuit breaker)
-                @exponential_backoff(
-                    max_retries=config.settings.resilience.max_retries,
-                    base_delay=config.settings.resilience.base_delay,
-                    max_delay=config.settings.resilience.max_delay,
-                    backoff_factor=config.settings.resilience.backoff_factor,
-                    jitter=config.settings.resilience.jitter
-                )
-                def _execute_request_no_cb():
-                    response = self.session.request(
-                        method,
-                        url,
-                        headers=headers,
-                        timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout),
-                        **kwargs
-                    )
-
-                    # Check for expected error codes that should not raise exceptions
-                    if response.status_code in expected_errors:
-                        return {'_status_code': response.status_code, '_response_text': response.text}
-
-                    response.raise_for_status()
-                    return response.json()
-
-                return _execute_request_no_cb()
+            self.sp_client = boto3.client(
+                's3',  # We'll use S3 for downloading reports
+                aws_access_key_id=self.credentials.access_key_id,
+                aws_secret_access_key=self.credentials.secret_access_key,
+                region_name='us-east-1'  # SP-API uses us-east-1
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize AWS client: {e}")
+            raise
+
+    def _get_access_token(self) -> str:
+        """Get a valid access token for SP-API, refreshing once for all concurrent callers"""
+        return self.token_manager.get_token()
+
+    def _request_new_token(self) -> Dict:
+        """Exchange the LWA refresh token for a new access token"""
+        return self._request_lwa_token(self.session)
+
+    def _make_api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make authenticated API request to SP-API through the resilience pipeline"""
+        # Extract our custom parameters before passing to requests
+        expected_errors = kwargs.pop('expected_errors', [])
+        headers = {'Content-Type': 'application/json', **kwargs.pop('headers', {})}
+
+        # Determine which pipeline (and circuit breaker) to use
+        circuit_breaker_name = self._get_circuit_breaker_for_endpoint(endpoint)
+        request = APIRequest(
+            method=method,
+            url=f"{self.base_url}{endpoint}",
+            operation=self._get_operation_for_request(method, endpoint),
+            family=circuit_breaker_name,
+            headers=headers,
+            kwargs=kwargs,
+            expected_errors=expected_errors
+        )
+
+        try:
+            return self.pipelines[circuit_breaker_name](request)
 
         except Exception as e:
             logger.error(f"API request failed after resilience patterns: {method} {endpoint} - {e}")
@@ -269,14 +758,46 @@ class AmazonAPI:
 
             raise
 
-    def get_merchant_listings(self) -> List[Dict]:
-        """Get all merchant listings using Reports API"""
-        logger.info("Creating merchant listings report...")
+    def get_merchant_listings(self, reuse_recent: bool = True) -> SkuTable:
+        """Get all merchant listings using Reports API, reusing a recent DONE report when allowed"""
+        report_document_id = self._request_report(reuse_recent)
+
+        # Step 3: Download report
+        logger.info("Downloading report data...")
+        return self._download_report(report_document_id)
+
+    def iter_merchant_listings(self, reuse_recent: bool = True) -> Iterator[Dict]:
+        """Yield merchant listings row by row so memory stays flat as the catalog grows"""
+        report_document_id = self._request_report(reuse_recent)
+
+        logger.info("Streaming report data...")
+        yield from self._iter_report_document(report_document_id)
+
+    def get_fba_inventory_report(self, reuse_recent: bool = True) -> Dict[str, Dict]:
+        """Index the FBA inventory report by SKU so it can be joined with merchant listings locally"""
+        start_time = time.time()
+        report_document_id = self._request_report(reuse_recent, FBA_INVENTORY_REPORT_TYPE)
+
+        index = {}
+        for inventory in self._iter_report_document(report_document_id, FBA_INVENTORY_REPORT_TYPE):
+            if inventory['sellerSku']:
+                index[inventory['sellerSku']] = inventory
+
+        logger.info(f"FBA inventory report contains {len(index)} SKUs ({time.time() - start_time:.1f}s)")
+        return index
+
+    def _request_report(self, reuse_recent: bool, report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> str:
+        """Return the document ID of a recent or newly generated report of the given type"""
+        report_document_id = self._find_reusable_report(report_type) if reuse_recent else None
+        if report_document_id is not None:
+            return report_document_id
+
+        logger.info(f"Creating {report_type} report...")
 
         # Step 1: Create report request
         endpoint = "/reports/2021-06-30/reports"
         payload = {
-            "reportType": "GET_MERCHANT_LISTINGS_ALL_DATA",
+            "reportType": report_type,
             "marketplaceIds": [self.credentials.marketplace_id]
         }
 
@@ -286,33 +807,125 @@ class AmazonAPI:
 
         # Step 2: Poll for report completion
         logger.info("Waiting for report to be ready...")
-        report_document_id = self._poll_report_completion(report_id)
+        return self._poll_report_completion(report_id)
 
-        # Step 3: Download report
-        logger.info("Downloading report data...")
-        return self._download_report(report_document_id)
+    def _find_reusable_report(self, report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> Optional[str]:
+        """Return the document ID of a recent DONE report of the given type, if one exists"""
+        max_age_minutes = self._report_reuse_max_age_minutes()
+        if max_age_minutes <= 0:
+            return None
+
+        cached_document_id = self._find_cached_report(report_type, max_age_minutes)
+        if cached_document_id:
+            return cached_document_id
+
+        try:
+            endpoint = self._recent_reports_endpoint(report_type, max_age_minutes)
+            response = self._make_api_request('GET', endpoint)
+            report = self._select_reusable_report(response.get('reports', []))
+        except Exception as e:
+            # Reuse is only an optimization - fall back to creating a new report
+            logger.warning(f"Could not look up recent {report_type} reports: {e}")
+            return None
+
+        if report is None:
+            return None
+
+        logger.info(f"Reusing {report_type} report {report.get('reportId')} "
+                    f"(finished {report.get('processingEndTime')}, within {max_age_minutes} minutes)")
+        self._record_report_generated_at(report)
+        return report['reportDocumentId']
+
+    def ensure_report_schedule(self, report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> Optional[str]:
+        """Make sure Amazon pre-generates the report on the configured schedule, returning the schedule ID"""
+        period = config.settings.report_schedule_period
+        endpoint = "/reports/2021-06-30/schedules"
+
+        try:
+            response = self._make_api_request('GET', f"{endpoint}?reportTypes={report_type}")
+            for schedule in response.get('reportSchedules', []):
+                if (self.credentials.marketplace_id in schedule.get('marketplaceIds', [])
+                        and schedule.get('period') == period):
+                    logger.info(f"{report_type} report schedule {schedule.get('reportScheduleId')} already active "
+                                f"(period {period}, next report {schedule.get('nextReportCreationTime')})")
+                    return schedule.get('reportScheduleId')
+
+            # createReportSchedule replaces any existing schedule for the same report type and marketplaces
+            payload = {
+                "reportType": report_type,
+                "marketplaceIds": [self.credentials.marketplace_id],
+                "period": period
+            }
+            next_creation_time = self._next_report_schedule_time(datetime.utcnow())
+            if next_creation_time:
+                payload["nextReportCreationTime"] = next_creation_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+            response = self._make_api_request('POST', endpoint, json=payload)
+            logger.info(f"Created {report_type} report schedule {response.get('reportScheduleId')} "
+                        f"(period {period}, first report {payload.get('nextReportCreationTime', 'now')})")
+            return response.get('reportScheduleId')
+
+        except Exception as e:
+            # Scheduling only moves report generation off the critical path - runs still work without it
+            logger.warning(f"Could not set up {report_type} report schedule: {e}")
+            return None
 
-    def _poll_report_completion(self, report_id: str, max_attempts: int = 30) -> str:
-        """Poll report status until completion"""
+    def _poll_report_completion(self, report_id: str) -> str:
+        """Poll report status with adaptive intervals until completion"""
         endpoint = f"/reports/2021-06-30/reports/{report_id}"
+        timeout = config.settings.report_poll_timeout
+        start = time.monotonic()
+        delays = self._report_poll_delays()
 
-        for attempt in range(max_attempts):
+        attempt = 0
+        while True:
+            attempt += 1
             response = self._make_api_request('GET', endpoint)
             status = response['processingStatus']
+            elapsed = time.monotonic() - start
 
             if status == 'DONE':
-                logger.info(f"Report completed after {attempt + 1} attempts")
+                logger.info(f"Report completed after {attempt} attempts ({elapsed:.1f}s)")
+                self._record_report_duration(response, fallback_seconds=elapsed)
+                self._record_report_generated_at(response)
                 return response['reportDocumentId']
             elif status in ['FATAL', 'CANCELLED']:
                 raise Exception(f"Report failed with status: {status}")
 
-            logger.debug(f"Report status: {status} (attempt {attempt + 1}/{max_attempts})")
-            time.sleep(30)  # Wait 30 seconds between checks
+            if elapsed >= timeout:
+                raise Exception(f"Report did not complete within {timeout} seconds")
+
+            delay = min(next(delays), timeout - elapsed)
+            logger.debug(f"Report status: {status} (attempt {attempt}, next check in {delay:.1f}s)")
+            time.sleep(delay)
+
+    def _download_report(self, report_document_id: str) -> SkuTable:
+        """Download and parse report data into a columnar SKU table"""
+        # Item names, descriptions and image URLs are dropped as rows arrive and reloaded only on request
+        skus = SkuTable.from_records(
+            self._iter_report_document(report_document_id),
+            detail_loader=lambda wanted: self._load_report_details(report_document_id, wanted),
+            keep_details=False
+        )
+
+        logger.info(f"Parsed {len(skus)} SKUs from report")
+        return skus
 
-        raise Exception(f"Report did not complete within {max_attempts * 30} seconds")
+    def _load_report_details(self, report_document_id: str, skus: Set[str]) -> Dict[str, Dict]:
+        """Re-read a report document (from the report cache when enabled) for the full records of some SKUs"""
+        return {record['sku']: record for record in self._iter_report_document(report_document_id)
+                if record['sku'] in skus}
+
+    def _iter_report_document(self, report_document_id: str,
+                              report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> Iterator[Dict]:
+        """Stream a report document and yield parsed SKU records without holding the whole file"""
+        if self.report_cache:
+            cached = self.report_cache.open(report_type, report_document_id)
+            if cached is not None:
+                with cached:
+                    yield from self._iter_report_records(cached, report_type)
+                return
 
-    def _download_report(self, report_document_id: str) -> List[Dict]:
-        """Download and parse report data"""
         # Get download URL
         endpoint = f"/reports/2021-06-30/documents/{report_document_id}"
         response = self._make_api_request('GET', endpoint)
@@ -321,56 +934,40 @@ class AmazonAPI:
         download_url = response['url']
         logger.debug(f"Downloading from: {download_url}")
 
-        download_response = self.session.get(
-            download_url,
-            timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout)
-        )
-        download_response.raise_for_status()
+        compression = response.get('compressionAlgorithm')
+        with self._open_report_download(download_url, compression) as (stream, encoding):
+            # Parse TSV data as it arrives
+            yield from self._parse_report_stream(stream, compression, encoding, report_type, report_document_id)
+
+    @contextmanager
+    def _open_report_download(self, download_url: str, compression: Optional[str]) -> Iterator:
+        """Open a report document as (binary stream, charset), using parallel Range requests when uncompressed"""
+        settings = config.settings
+        timeout = (settings.resilience.connection_timeout, settings.resilience.read_timeout)
+
+        # Compressed documents must be inflated from the start, so they keep a single stream
+        if not compression and settings.report_download_workers > 1:
+            downloader = RangedDownloader(
+                self.session,
+                part_size=settings.report_download_part_size_mb * 1024 * 1024,
+                max_workers=settings.report_download_workers,
+                timeout=timeout,
+                retry=self.retry_policy.call
+            )
+            with downloader.open(download_url) as download:
+                yield download
+            return
 
-        # Parse TSV data
-        import csv
-        import io
-
-        content = download_response.text
-        reader = csv.DictReader(io.StringIO(content), delimiter='\t')
-
-        skus = []
-        for row in reader:
-            # Clean up the data and convert types
-            sku_data = {
-                'sku': row.get('seller-sku', '').strip(),  # Fix: use 'seller-sku' not 'sku'
-                'asin': row.get('asin1', '').strip(),  # Fix: use 'asin1' not 'asin'
-                'created_date': row.get('open-date', '').strip(),  # Fix: use 'open-date' not 'created-date'
-                'fulfillment_channel': row.get('fulfillment-channel', '').strip(),
-                'quantity': int(row.get('quantity', 0) or 0),
-                'item_name': row.get('item-name', '').strip(),
-                'open_date': row.get('open-date', '').strip(),
-                'image_url': row.get('image-url', '').strip(),
-                'item_description': row.get('item-description', '').strip(),
-                'listing_id': row.get('listing-id', '').strip(),
-                'seller_sku': row.get('seller-sku', '').strip()
-            }
-            skus.append(sku_data)
-
-        logger.info(f"Parsed {len(skus)} SKUs from report")
-        return skus
+        with self.session.get(download_url, stream=True, timeout=timeout) as download_response:
+            download_response.raise_for_status()
+            download_response.raw.decode_content = True  # Undo any HTTP transfer encoding
+            yield download_response.raw, download_response.encoding
 
     def check_fba_inventory(self, sku: str) -> Dict:
         """Check FBA inventory for a specific SKU using optimized API parameters"""
-        from urllib.parse import quote
-
-        # Use the most reliable method based on production testing
         # Method 2 (no startDateTime) proved most reliable for individual SKU lookups
-        params = [
-            'details=true',
-            'granularityType=Marketplace',
-            f'granularityId={self.credentials.marketplace_id}',
-            f'marketplaceIds={self.credentials.marketplace_id}',
-            f'sellerSku={quote(sku)}'
-        ]
-
-        query_string = '&'.join(params)
-        endpoint = f"/fba/inventory/v1/summaries?{query_string}"
+        params = self._inventory_summary_params() + [f'sellerSku={quote(sku)}']
+        endpoint = f"/fba/inventory/v1/summaries?{'&'.join(params)}"
 
         logger.info(f"Checking FBA inventory for SKU: {sku} with endpoint: {endpoint} (optimized method)")
 
@@ -391,86 +988,138 @@ class AmazonAPI:
                 'error': str(e)
             }
 
-    def _process_fba_response(self, sku, response):
-        """Process FBA API response and extract inventory data for specific SKU"""
-        # Check if we got an expected error response
-        if '_status_code' in response:
-            if response['_status_code'] in [400, 404]:
-                # SKU not found in FBA inventory - treat as safe for deletion
-                logger.debug(f"SKU {sku} not found in FBA inventory (status {response['_status_code']}) - safe for deletion")
-                return {
-                    'sellerSku': sku,
-                    'fulfillableQuantity': 0,
-                    'inboundQuantity': 0,
-                    'reservedQuantity': 0
-                }
+    def check_fba_inventory_batch(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check FBA inventory for many SKUs, packing up to 50 SKUs per request via sellerSkus"""
+        results = {}
+        unique_skus = list(dict.fromkeys(sku for sku in skus if sku))
 
-        # Extract inventory information from successful response
-        payload = response.get('payload', {})
-        inventory_summaries = payload.get('inventorySummaries', [])
+        for chunk in chunk_list(unique_skus, FBA_INVENTORY_BATCH_SIZE):
+            results.update(self._check_fba_inventory_chunk(chunk))
 
-        logger.info(f"FBA response for {sku} contains {len(inventory_summaries)} inventory summaries")
+        logger.info(f"Checked FBA inventory for {len(results)} SKUs in "
+                    f"{(len(unique_skus) + FBA_INVENTORY_BATCH_SIZE - 1) // FBA_INVENTORY_BATCH_SIZE} batched requests")
+        return results
 
-        if inventory_summaries:
-            # Find the specific SKU in the response
-            inventory = None
-            for summary in inventory_summaries:
-                if summary.get('sellerSku') == sku:
-                    inventory = summary
-                    logger.info(f"Successfully matched SKU '{sku}' in response")
-                    break
+    def _check_fba_inventory_chunk(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check FBA inventory for up to FBA_INVENTORY_BATCH_SIZE SKUs, following nextToken"""
+        params = self._inventory_summary_params() + [
+            f"sellerSkus={','.join(quote(sku, safe='') for sku in skus)}"
+        ]
 
-            if inventory:
-                # Use detailed inventory information if available
-                inventory_details = inventory.get('inventoryDetails', {})
-
-                result = {
-                    'sellerSku': inventory.get('sellerSku', ''),
-                    'asin': inventory.get('asin', ''),
-                    'productName': inventory.get('productName', ''),
-                    'condition': inventory.get('condition', ''),
-                    'totalQuantity': inventory.get('totalQuantity', 0),
-                    'lastUpdatedTime': inventory.get('lastUpdatedTime', '')
-                }
-
-                # Extract detailed inventory quantities
-                if inventory_details:
-                    result.update({
-                        'fulfillableQuantity': inventory_details.get('fulfillableQuantity', 0),
-                        'inboundWorkingQuantity': inventory_details.get('inboundWorkingQuantity', 0),
-                        'inboundShippedQuantity': inventory_details.get('inboundShippedQuantity', 0),
-                        'inboundReceivingQuantity': inventory_details.get('inboundReceivingQuantity', 0),
-                        'reservedQuantity': inventory_details.get('reservedQuantity', {}).get('totalReservedQuantity', 0),
-                        'unfulfillableQuantity': inventory_details.get('unfulfillableQuantity', {}).get('totalUnfulfillableQuantity', 0)
-                    })
-                else:
-                    # Fallback to basic quantities if details not available
-                    result.update({
-                        'fulfillableQuantity': inventory.get('fulfillableQuantity', 0),
-                        'inboundQuantity': inventory.get('inboundQuantity', 0),
-                        'reservedQuantity': inventory.get('reservedQuantity', 0)
-                    })
+        summaries_by_sku = {}
+        try:
+            for page, response in enumerate(self._iter_inventory_summary_pages(params), 1):
+                if '_status_code' in response:
+                    status = response['_status_code']
+                    if page > 1:
+                        # e.g. an expired nextToken - the missing pages may hold stock for the remaining SKUs
+                        logger.error(f"Batched FBA inventory check failed on page {page} with status {status}")
+                        return self._failed_fba_results(skus, summaries_by_sku,
+                                                        f"FBA inventory page {page} failed with status {status}")
+                    if status == 400 and len(skus) > 1:
+                        # One bad SKU rejects the whole batch, so look the SKUs up one at a time
+                        logger.warning(f"Batched FBA inventory check for {len(skus)} SKUs rejected - checking SKUs individually")
+                        return {sku: self.check_fba_inventory(sku) for sku in skus}
+                    # Nothing found - same safe defaults as single-SKU lookups
+                    return {sku: self._process_fba_response(sku, response) for sku in skus}
+
+                for summary in response.get('payload', {}).get('inventorySummaries', []):
+                    summaries_by_sku.setdefault(summary.get('sellerSku'), summary)
 
-                logger.debug(f"SKU {sku} FBA inventory: fulfillable={result['fulfillableQuantity']}, inbound={result.get('inboundWorkingQuantity', 0)}")
-                return result
-            else:
-                # SKU not found in response - treat as no inventory
-                logger.warning(f"SKU {sku} not found in FBA inventory response")
-                return {
-                    'sellerSku': sku,
-                    'fulfillableQuantity': 0,
-                    'inboundQuantity': 0,
-                    'reservedQuantity': 0
-                }
-        else:
-            # No inventory found
-            logger.debug(f"No inventory data found for SKU {sku}")
-            return {
-                'sellerSku': sku,
-                'fulfillableQuantity': 0,
-                'inboundQuantity': 0,
-                'reservedQuantity': 0
-            }
+        except Exception as e:
+            logger.error(f"Batched FBA inventory check failed for {len(skus)} SKUs: {e}")
+            # Return safe default on any failure, matching check_fba_inventory
+            return self._failed_fba_results(skus, summaries_by_sku, str(e))
+
+        return {
+            sku: self._build_fba_result(summaries_by_sku[sku]) if sku in summaries_by_sku
+            else self._empty_fba_result(sku)
+            for sku in skus
+        }
+
+    def get_fba_inventory_snapshot(self) -> Dict[str, Dict]:
+        """Page through all FBA inventory summaries and index them by sellerSku"""
+        logger.info("Building full-catalog FBA inventory snapshot...")
+        return self._collect_inventory_index(self._inventory_summary_params())
+
+    def get_fba_inventory_changes(self, since: datetime) -> Dict[str, Dict]:
+        """Fetch inventory summaries that changed since the given UTC time, indexed by sellerSku"""
+        start_date_time = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+        logger.info(f"Fetching FBA inventory changes since {start_date_time}...")
+
+        params = self._inventory_summary_params() + [f"startDateTime={quote(start_date_time, safe='')}"]
+        return self._collect_inventory_index(params)
+
+    def sync_fba_inventory_snapshot(self, store: InventorySnapshotStore, max_age_hours: int = 168) -> Dict[str, Dict]:
+        """Bring the persisted FBA inventory snapshot up to date, using a delta sync when possible"""
+        previous, last_sync = store.load()
+        sync_started = datetime.utcnow()
+
+        if previous is None or sync_started - last_sync > timedelta(hours=max_age_hours):
+            # No usable snapshot (or too old to trust a delta) - take a full one
+            snapshot = self.get_fba_inventory_snapshot()
+            store.save(snapshot, sync_started)
+            return snapshot
+
+        changes = self.get_fba_inventory_changes(last_sync)
+        snapshot = dict(previous)
+        snapshot.update(changes)
+
+        # startDateTime does not detect inbound quantity changes, so re-check SKUs that had inbound stock
+        inbound_skus = [sku for sku, inventory in previous.items()
+                        if sku not in changes and has_inbound_inventory(inventory)]
+        if inbound_skus:
+            logger.info(f"Re-checking {len(inbound_skus)} SKUs with inbound stock in the last snapshot")
+            for sku, inventory in self.check_fba_inventory_batch(inbound_skus).items():
+                # Keep the previous (conservative) entry if the re-check failed
+                if 'error' not in inventory:
+                    snapshot[sku] = inventory
+
+        logger.info(f"Delta-synced FBA inventory snapshot: {len(changes)} changed, "
+                    f"{len(inbound_skus)} inbound re-checked, {len(snapshot)} total SKUs")
+        store.save(snapshot, sync_started)
+        return snapshot
+
+    def _collect_inventory_index(self, params: List[str]) -> Dict[str, Dict]:
+        """Collect every inventory summary page for the given parameters into a dict keyed by sellerSku"""
+        start_time = time.time()
+
+        index = {}
+        pages = 0
+        for response in self._iter_inventory_summary_pages(params):
+            if '_status_code' in response:
+                # A partial snapshot would make unlisted SKUs look empty, so fail loudly instead
+                raise Exception(f"FBA inventory snapshot failed with status {response['_status_code']}: "
+                                f"{response.get('_response_text', '')}")
+
+            pages += 1
+            for summary in response.get('payload', {}).get('inventorySummaries', []):
+                seller_sku = summary.get('sellerSku')
+                if seller_sku:
+                    index[seller_sku] = self._build_fba_result(summary)
+
+        logger.info(f"FBA inventory index contains {len(index)} SKUs from {pages} pages "
+                    f"({time.time() - start_time:.1f}s)")
+        return index
+
+    def _iter_inventory_summary_pages(self, params: List[str]):
+        """Yield getInventorySummaries response pages, following nextToken until exhausted"""
+        next_token = None
+
+        while True:
+            page_params = params + ([f'nextToken={quote(next_token, safe="")}'] if next_token else [])
+            endpoint = f"/fba/inventory/v1/summaries?{'&'.join(page_params)}"
+
+            response = self._make_api_request('GET', endpoint, expected_errors=[400, 404])
+            yield response
+
+            if '_status_code' in response:
+                return
+
+            # nextToken expires 30 seconds after creation, so request the next page immediately
+            next_token = (response.get('pagination') or {}).get('nextToken')
+            if not next_token:
+                return
 
     def check_listing_inventory(self, sku: str) -> Dict:
         """Check listing inventory using Listings API as alternative to FBA Inventory API"""
@@ -478,58 +1127,124 @@ class AmazonAPI:
 
         params = {
             'marketplaceIds': [self.credentials.marketplace_id],
-            'includedData': 'summaries,fulfillmentAvailability'
+            'includedData': LISTING_INVENTORY_INCLUDED_DATA
         }
 
         try:
             response = self._make_api_request('GET', endpoint, params=params)
-
-            # Extract fulfillment availability information
-            fulfillment_availability = response.get('fulfillmentAvailability', [])
-
-            total_quantity = 0
-            fba_quantity = 0
-
-            for fulfillment in fulfillment_availability:
-                quantity = fulfillment.get('quantity', 0)
-                total_quantity += quantity
-
-                # Check if this is FBA fulfillment
-                fulfillment_code = fulfillment.get('fulfillmentChannelCode', '')
-                if fulfillment_code in ['AMAZON', 'DEFAULT']:  # DEFAULT often means FBA
-                    fba_quantity += quantity
-
-            return {
-                'sellerSku': sku,
-                'total_quantity': total_quantity,
-                'fba_quantity': fba_quantity,
-                'fulfillment_availability': fulfillment_availability,
-                'has_inventory': total_quantity > 0
-            }
+            return self._build_listing_inventory_result(sku, response)
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code in [400, 404]:
                 # SKU not found in listings (may already be deleted or never existed)
                 logger.info(f"SKU {sku}: Not found in listings (status {e.response.status_code}) - safe for deletion")
-                return {
-                    'sellerSku': sku,
-                    'total_quantity': 0,
-                    'fba_quantity': 0,
-                    'fulfillment_availability': [],
-                    'has_inventory': False
-                }
+                return self._listing_not_found_result(sku)
             else:
                 logger.error(f"Listing check failed for {sku} (status {e.response.status_code}): {e}")
                 logger.debug(f"Listing check error details - URL: {e.response.url}, Headers: {dict(e.response.headers)}")
-                # For safety, assume has inventory if API fails
-                return {
-                    'sellerSku': sku,
-                    'total_quantity': 999,  # High number to be conservative
-                    'fba_quantity': 999,
-                    'fulfillment_availability': [],
-                    'has_inventory': True,
-                    'error': str(e)
-                }
+                return self._listing_error_result(sku, e)
+
+    def listing_exists(self, sku: str) -> bool:
+        """Check whether a SKU still has a listing using getListingsItem"""
+        params = {'marketplaceIds': self.credentials.marketplace_id}
+        response = self._make_api_request('GET', self._listing_item_endpoint(sku), params=params, expected_errors=[404])
+
+        # 404 means the listing is gone; anything else raised above
+        return response.get('_status_code') != 404
+
+    def check_listing_inventory_batch(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check listing inventory for many SKUs, up to 20 per searchListingsItems call"""
+        results = {}
+        for chunk in chunk_list(list(dict.fromkeys(skus)), LISTINGS_SEARCH_BATCH_SIZE):
+            endpoint = self._search_listings_endpoint(chunk, LISTING_INVENTORY_INCLUDED_DATA)
+            try:
+                results.update(self._build_listing_inventory_batch(chunk, self._make_api_request('GET', endpoint)))
+            except Exception as e:
+                # Treat the whole chunk as having inventory rather than guessing
+                logger.error(f"Batch listing check failed for {len(chunk)} SKUs: {e}")
+                results.update({sku: self._listing_error_result(sku, e) for sku in chunk})
+        return results
+
+    def search_listings_items(self, skus: List[str]) -> Set[str]:
+        """Return which of the given SKUs still have listings, up to 20 SKUs per searchListingsItems call"""
+        found = set()
+        for chunk in chunk_list(list(dict.fromkeys(skus)), LISTINGS_SEARCH_BATCH_SIZE):
+            response = self._make_api_request('GET', self._search_listings_endpoint(chunk))
+            found.update(item.get('sku') for item in response.get('items', []))
+        return found
+
+    def delete_skus_via_feed(self, skus: List[str]) -> Dict[str, Optional[str]]:
+        """Delete SKUs with JSON_LISTINGS_FEED submissions, returning an error message (or None) per SKU"""
+        outcomes = {}
+        for chunk in chunk_list(list(dict.fromkeys(skus)), LISTINGS_FEED_MAX_MESSAGES):
+            try:
+                feed_id = self._submit_feed(LISTINGS_FEED_TYPE, json.dumps(self._build_listings_delete_feed(chunk)))
+                report = self._get_feed_result(self._poll_feed_completion(feed_id))
+                outcomes.update(self._parse_feed_processing_report(chunk, report))
+            except Exception as e:
+                logger.error(f"Listings delete feed for {len(chunk)} SKUs failed: {e}")
+                outcomes.update(dict.fromkeys(chunk, str(e)))
+        return outcomes
+
+    def _submit_feed(self, feed_type: str, content: str) -> str:
+        """Upload a feed document and create the feed, returning its feed ID"""
+        document = self._make_api_request('POST', "/feeds/2021-06-30/documents", json={'contentType': FEED_CONTENT_TYPE})
+
+        upload_response = self.session.put(
+            document['url'],
+            data=content.encode('utf-8'),
+            headers={'Content-Type': FEED_CONTENT_TYPE},
+            timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout)
+        )
+        upload_response.raise_for_status()
+
+        response = self._make_api_request('POST', "/feeds/2021-06-30/feeds", json={
+            'feedType': feed_type,
+            'marketplaceIds': [self.credentials.marketplace_id],
+            'inputFeedDocumentId': document['feedDocumentId']
+        })
+        logger.info(f"Submitted {feed_type} feed {response['feedId']}")
+        return response['feedId']
+
+    def _poll_feed_completion(self, feed_id: str) -> str:
+        """Poll feed status until processing finishes, returning the result document ID"""
+        endpoint = f"/feeds/2021-06-30/feeds/{feed_id}"
+        timeout = config.settings.feed_poll_timeout
+        start = time.monotonic()
+        delay = config.settings.report_poll_initial_interval
+
+        while True:
+            response = self._make_api_request('GET', endpoint)
+            status = response['processingStatus']
+            elapsed = time.monotonic() - start
+
+            if status == 'DONE':
+                logger.info(f"Feed {feed_id} processed after {elapsed:.1f}s")
+                return response['resultFeedDocumentId']
+            elif status in ['FATAL', 'CANCELLED']:
+                raise Exception(f"Feed {feed_id} failed with status: {status}")
+
+            if elapsed >= timeout:
+                raise Exception(f"Feed {feed_id} did not complete within {timeout} seconds")
+
+            logger.debug(f"Feed status: {status} (next check in {delay:.1f}s)")
+            time.sleep(min(delay, timeout - elapsed))
+            delay = min(delay * 1.5, config.settings.report_poll_max_interval)
+
+    def _get_feed_result(self, result_document_id: str) -> Dict:
+        """Download and decode a feed processing report"""
+        document = self._make_api_request('GET', f"/feeds/2021-06-30/documents/{result_document_id}")
+
+        download_response = self.session.get(
+            document['url'],
+            timeout=(config.settings.resilience.connection_timeout, config.settings.resilience.read_timeout)
+        )
+        download_response.raise_for_status()
+
+        content = download_response.content
+        if document.get('compressionAlgorithm') == 'GZIP':
+            content = gzip.decompress(content)
+        return json.loads(content.decode('utf-8'))
 
     def delete_sku(self, sku: str) -> Dict:
         """Delete a SKU using Listings API"""
@@ -542,16 +1257,7 @@ class AmazonAPI:
         try:
             logger.info(f"Sending DELETE request for SKU: {sku} to endpoint: {endpoint}")
             response = self._make_api_request('DELETE', endpoint, params=params)
-            logger.info(f"DELETE API response for {sku}: {response}")
-
-            # Check if response indicates success
-            if response.get('status') == 'ACCEPTED':
-                logger.info(f"✅ SKU {sku} deletion accepted by Amazon")
-            elif response.get('status') == 'INVALID':
-                logger.warning(f"❌ SKU {sku} deletion rejected as invalid: {response.get('issues', [])}")
-            else:
-                logger.warning(f"⚠️ SKU {sku} deletion status unclear: {response.get('status', 'unknown')}")
-
+            self._log_delete_response(sku, response)
             return response
 
         except requests.exceptions.HTTPError as e:
@@ -0,0 +1,534 @@
+"""
+Asyncio-native Amazon SP-API client for SKU Cleanup Tool
+Mirrors AmazonAPI with coroutines so thousands of requests can be in flight on a single thread
+"""
+import asyncio
+import io
+import itertools
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, TextIO
+from urllib.parse import quote
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency - install with: pip install "sku-cleanup-tool[async]"
+    aiohttp = None
+
+from .amazon_api import (
+    SPAPIEndpointMixin,
+    FBA_INVENTORY_BATCH_SIZE,
+    LISTING_INVENTORY_INCLUDED_DATA,
+    LISTINGS_SEARCH_BATCH_SIZE,
+    MERCHANT_LISTINGS_REPORT_TYPE
+)
+from .concurrency import ConcurrencyController
+from .config import AmazonCredentials, config
+from .resilience import (
+    async_exponential_backoff,
+    AsyncCircuitBreaker,
+    CircuitBreakerConfig,
+    get_api_session,
+    get_rate_limiter,
+    get_retry_budget
+)
+from .token_manager import AccessTokenManager
+from .sku_table import SkuTable
+from .utils import chunk_list
+
+logger = logging.getLogger(__name__)
+
+# Report rows parsed per worker-thread hop, and bytes read from the download per event loop hop
+REPORT_PARSE_BATCH_ROWS = 1000
+REPORT_READ_CHUNK_BYTES = 64 * 1024
+
+class _ResponseBodyReader(io.RawIOBase):
+    """Blocking file-like view of a streaming aiohttp body for a worker thread; the event loop does the reading"""
+
+    def __init__(self, content: 'aiohttp.StreamReader', loop: asyncio.AbstractEventLoop, timeout: float):
+        self._content = content
+        self._loop = loop
+        self._timeout = timeout  # Gives up if the loop stops serving reads, e.g. after the consumer was cancelled
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        future = asyncio.run_coroutine_threadsafe(self._content.read(len(buffer)), self._loop)
+        try:
+            data = future.result(timeout=self._timeout)
+        except BaseException:
+            future.cancel()
+            raise
+        buffer[:len(data)] = data
+        return len(data)
+
+class AsyncAmazonAPI(SPAPIEndpointMixin):
+    """Asyncio Selling Partner API client with pooled connections and resilience patterns"""
+
+    def __init__(self, credentials: AmazonCredentials, max_connections: Optional[int] = None,
+                 token_manager: Optional[AccessTokenManager] = None,
+                 concurrency: Optional[ConcurrencyController] = None):
+        if aiohttp is None:
+            raise ImportError("AsyncAmazonAPI requires aiohttp - install it with: pip install aiohttp")
+
+        self.credentials = credentials
+        self._report_durations = deque(maxlen=10)  # Recent report generation times in seconds
+        self._report_generated_at: Dict[str, float] = {}  # reportDocumentId -> epoch seconds Amazon finished it
+        self.report_cache = self._init_report_cache()
+        self.max_connections = max_connections or config.settings.resilience.max_connections
+        self.session = None
+
+        # Initialize resilience components
+        self._init_resilience()
+
+        # AIMD per-operation concurrency limits (pass AmazonAPI's controller so both clients share one limit)
+        self.concurrency = concurrency or self._create_concurrency_controller()
+
+        # Same single-flight token holder and cache rules as AmazonAPI (pass its manager to share one token)
+        self._owns_token_manager = token_manager is None
+        self.token_manager = token_manager or self._create_token_manager(self._request_new_token)
+
+    def _init_resilience(self):
+        """Initialize async circuit breakers, retry policy and rate limiting"""
+        resilience = config.settings.resilience
+        cb_config = CircuitBreakerConfig(
+            failure_threshold=resilience.circuit_breaker_failure_threshold,
+            recovery_timeout=resilience.circuit_breaker_recovery_timeout,
+            expected_exception=aiohttp.ClientError,
+            error_rate_threshold=resilience.circuit_breaker_error_rate_threshold,
+            window_seconds=resilience.circuit_breaker_window_seconds,
+            half_open_max_calls=resilience.circuit_breaker_half_open_max_calls
+        )
+
+        self.circuit_breakers = {
+            'reports': AsyncCircuitBreaker('reports_api', cb_config),
+            'fba_inventory': AsyncCircuitBreaker('fba_inventory_api', cb_config),
+            'listings': AsyncCircuitBreaker('listings_api', cb_config),
+            'feeds': AsyncCircuitBreaker('feeds_api', cb_config),
+            'auth': AsyncCircuitBreaker('auth_api', cb_config)
+        }
+
+        retry = async_exponential_backoff(
+            max_retries=resilience.max_retries,
+            base_delay=resilience.base_delay,
+            max_delay=resilience.max_delay,
+            backoff_factor=resilience.backoff_factor,
+            jitter=resilience.jitter,
+            # requests errors come from LWA token refreshes, which run off the event loop
+            retry_on=(aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException),
+            budget=get_retry_budget(resilience.retry_budget_ratio, resilience.retry_budget_min_retries)
+        )
+
+        # Compose the resilience wrappers once per endpoint family
+        self._executors = {
+            name: breaker(retry(self._send_authorized_request))
+            for name, breaker in self.circuit_breakers.items()
+        }
+
+        # Shared per-operation token buckets pace requests to the SP-API usage plans
+        self.rate_limiter = get_rate_limiter(self._shared_rate_limit_path()) if resilience.rate_limiting_enabled else None
+
+        # Resolve the regional endpoint once instead of per request
+        self.base_url = self._get_base_url_for_marketplace()
+
+    async def __aenter__(self) -> 'AsyncAmazonAPI':
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """Get or create the pooled HTTP session"""
+        if self.session is None or self.session.closed:
+            resilience = config.settings.resilience
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+            timeout = aiohttp.ClientTimeout(sock_connect=resilience.connection_timeout, sock_read=resilience.read_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.session
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        if self._owns_token_manager:
+            self.token_manager.close()
+
+    async def _get_access_token(self) -> str:
+        """Get or refresh access token for SP-API, refreshing once for all concurrent callers"""
+        token = self.token_manager.usable_token()
+        if token:
+            return token
+
+        # Refreshes wait on LWA and the manager's thread lock, so they run off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self.token_manager.get_token)
+
+    def _request_new_token(self) -> Dict:
+        """Exchange the LWA refresh token for a new access token (runs in a worker thread)"""
+        return self._request_lwa_token(get_api_session())
+
+    async def _send_authorized_request(self, method: str, url: str, operation: str, expected_errors: List[int],
+                                       **kwargs) -> Dict:
+        """Attach the access token and send one attempt, so a failed LWA refresh is retried by the same single retry layer"""
+        kwargs['headers'] = {**kwargs.get('headers', {}), 'x-amz-access-token': await self._get_access_token()}
+        return await self._send_request(method, url, operation, expected_errors, **kwargs)
+
+    async def _send_request(self, method: str, url: str, operation: str, expected_errors: List[int], **kwargs) -> Dict:
+        """Send one HTTP request (wrapped by retry and circuit breaker in _init_resilience)"""
+        session = await self._get_session()
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(operation)
+
+        # Acquired last so the measured latency is the request itself, as in AmazonAPI's pipeline
+        limiter = self.concurrency.limiter(operation) if self.concurrency else None
+        if limiter:
+            await limiter.acquire_async()
+        start = time.perf_counter()
+        status = None
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                status = response.status
+                if self.rate_limiter:
+                    self.rate_limiter.update_from_headers(operation, response.headers)
+                    if response.status == 429:
+                        self.rate_limiter.record_throttle(operation)
+
+                # Check for expected error codes that should not raise exceptions
+                if response.status in expected_errors:
+                    return {'_status_code': response.status, '_response_text': await response.text()}
+
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        finally:
+            if limiter:
+                limiter.release(time.perf_counter() - start, throttled=status == 429, failed=status is None)
+
+    async def _make_api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make authenticated API request to SP-API with resilience patterns"""
+        # Extract our custom parameters before passing to aiohttp
+        expected_errors = kwargs.pop('expected_errors', [])
+
+        kwargs['headers'] = {
+            'Content-Type': 'application/json',
+            **kwargs.get('headers', {})
+        }
+
+        url = f"{self.base_url}{endpoint}"
+        circuit_breaker_name = self._get_circuit_breaker_for_endpoint(endpoint)
+        operation = self._get_operation_for_request(method, endpoint)
+
+        try:
+            return await self._executors[circuit_breaker_name](method, url, operation, expected_errors, **kwargs)
+
+        except Exception as e:
+            logger.error(f"API request failed after resilience patterns: {method} {endpoint} - {e}")
+
+            # If circuit breaker is open, log that information
+            if "Circuit breaker" in str(e):
+                logger.error(f"Circuit breaker '{circuit_breaker_name}' is preventing requests")
+
+            raise
+
+    async def get_merchant_listings(self, reuse_recent: bool = True) -> SkuTable:
+        """Get all merchant listings using Reports API, reusing a recent DONE report when allowed"""
+        skus = SkuTable(keep_details=False)
+        async for sku in self.iter_merchant_listings(reuse_recent):
+            skus.append(sku)
+
+        logger.info(f"Parsed {len(skus)} SKUs from report")
+        return skus
+
+    async def iter_merchant_listings(self, reuse_recent: bool = True) -> AsyncIterator[Dict]:
+        """Yield merchant listings row by row so memory stays flat as the catalog grows"""
+        report_document_id = await self._request_merchant_listings_report(reuse_recent)
+
+        # Step 3: Download report
+        logger.info("Streaming report data...")
+        async for sku in self._iter_report_document(report_document_id):
+            yield sku
+
+    async def _request_merchant_listings_report(self, reuse_recent: bool) -> str:
+        """Return the document ID of a recent or newly generated merchant listings report"""
+        report_document_id = await self._find_reusable_report() if reuse_recent else None
+        if report_document_id is not None:
+            return report_document_id
+
+        logger.info("Creating merchant listings report...")
+
+        # Step 1: Create report request
+        payload = {
+            "reportType": MERCHANT_LISTINGS_REPORT_TYPE,
+            "marketplaceIds": [self.credentials.marketplace_id]
+        }
+
+        response = await self._make_api_request('POST', "/reports/2021-06-30/reports", json=payload)
+        report_id = response['reportId']
+        logger.info(f"Created report with ID: {report_id}")
+
+        # Step 2: Poll for report completion
+        logger.info("Waiting for report to be ready...")
+        return await self._poll_report_completion(report_id)
+
+    async def _find_reusable_report(self) -> Optional[str]:
+        """Return the document ID of a recent DONE merchant listings report, if one exists"""
+        max_age_minutes = self._report_reuse_max_age_minutes()
+        if max_age_minutes <= 0:
+            return None
+
+        cached_document_id = self._find_cached_report(MERCHANT_LISTINGS_REPORT_TYPE, max_age_minutes)
+        if cached_document_id:
+            return cached_document_id
+
+        try:
+            endpoint = self._recent_reports_endpoint(MERCHANT_LISTINGS_REPORT_TYPE, max_age_minutes)
+            response = await self._make_api_request('GET', endpoint)
+            report = self._select_reusable_report(response.get('reports', []))
+        except Exception as e:
+            # Reuse is only an optimization - fall back to creating a new report
+            logger.warning(f"Could not look up recent merchant listings reports: {e}")
+            return None
+
+        if report is None:
+            return None
+
+        logger.info(f"Reusing merchant listings report {report.get('reportId')} "
+                    f"(finished {report.get('processingEndTime')}, within {max_age_minutes} minutes)")
+        self._record_report_generated_at(report)
+        return report['reportDocumentId']
+
+    async def _poll_report_completion(self, report_id: str) -> str:
+        """Poll report status with adaptive intervals until completion"""
+        endpoint = f"/reports/2021-06-30/reports/{report_id}"
+        timeout = config.settings.report_poll_timeout
+        start = time.monotonic()
+        delays = self._report_poll_delays()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response = await self._make_api_request('GET', endpoint)
+            status = response['processingStatus']
+            elapsed = time.monotonic() - start
+
+            if status == 'DONE':
+                logger.info(f"Report completed after {attempt} attempts ({elapsed:.1f}s)")
+                self._record_report_duration(response, fallback_seconds=elapsed)
+                self._record_report_generated_at(response)
+                return response['reportDocumentId']
+            elif status in ['FATAL', 'CANCELLED']:
+                raise Exception(f"Report failed with status: {status}")
+
+            if elapsed >= timeout:
+                raise Exception(f"Report did not complete within {timeout} seconds")
+
+            delay = min(next(delays), timeout - elapsed)
+            logger.debug(f"Report status: {status} (attempt {attempt}, next check in {delay:.1f}s)")
+            await asyncio.sleep(delay)
+
+    async def _iter_report_document(self, report_document_id: str,
+                                    report_type: str = MERCHANT_LISTINGS_REPORT_TYPE) -> AsyncIterator[Dict]:
+        """Stream a report document and yield parsed SKU records, decoding and parsing off the event loop"""
+        if self.report_cache:
+            cached = self.report_cache.open(report_type, report_document_id)
+            if cached is not None:
+                async for sku in self._iter_off_loop(self._iter_cached_records(cached, report_type)):
+                    yield sku
+                return
+
+        response = await self._make_api_request('GET', f"/reports/2021-06-30/documents/{report_document_id}")
+
+        # Download from S3 URL
+        download_url = response['url']
+        logger.debug(f"Downloading from: {download_url}")
+
+        session = await self._get_session()
+        async with session.get(download_url) as download_response:
+            download_response.raise_for_status()
+            # The parser reads the body as it arrives, so neither the document nor a spool file is held
+            reader = _ResponseBodyReader(download_response.content, asyncio.get_running_loop(),
+                                         timeout=config.settings.resilience.read_timeout)
+            body = io.BufferedReader(reader, buffer_size=REPORT_READ_CHUNK_BYTES)
+            records = self._parse_report_stream(body, response.get('compressionAlgorithm'), download_response.charset,
+                                                report_type, report_document_id)
+            async for sku in self._iter_off_loop(records):
+                yield sku
+
+    def _iter_cached_records(self, cached: TextIO, report_type: str) -> Iterator[Dict]:
+        """Parse a cached report document, closing it once exhausted"""
+        with cached:
+            yield from self._iter_report_records(cached, report_type)
+
+    async def _iter_off_loop(self, records: Iterator[Dict]) -> AsyncIterator[Dict]:
+        """Advance a blocking record iterator in a worker thread, yielding its records in batches on the loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await loop.run_in_executor(None, lambda: list(itertools.islice(records, REPORT_PARSE_BATCH_ROWS)))
+                if not batch:
+                    return
+                for record in batch:
+                    yield record
+        finally:
+            # Discard a partial cache entry if the consumer stops early (a batch still parsing finishes on its own)
+            if not getattr(records, 'gi_running', False):
+                records.close()
+
+    async def check_fba_inventory(self, sku: str) -> Dict:
+        """Check FBA inventory for a specific SKU"""
+        params = self._inventory_summary_params() + [f'sellerSku={quote(sku)}']
+        endpoint = f"/fba/inventory/v1/summaries?{'&'.join(params)}"
+
+        try:
+            response = await self._make_api_request('GET', endpoint, expected_errors=[400, 404])
+            return self._process_fba_response(sku, response)
+
+        except Exception as e:
+            logger.error(f"FBA inventory check failed for {sku}: {e}")
+            # Return safe default on any failure
+            result = self._empty_fba_result(sku)
+            result['error'] = str(e)
+            return result
+
+    async def check_fba_inventory_batch(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check FBA inventory for many SKUs, with all 50-SKU sellerSkus requests in flight at once"""
+        unique_skus = list(dict.fromkeys(sku for sku in skus if sku))
+        chunks = chunk_list(unique_skus, FBA_INVENTORY_BATCH_SIZE)
+
+        results = {}
+        for chunk_results in await asyncio.gather(*(self._check_fba_inventory_chunk(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        return results
+
+    async def _check_fba_inventory_chunk(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check FBA inventory for up to FBA_INVENTORY_BATCH_SIZE SKUs, following nextToken"""
+        params = self._inventory_summary_params() + [
+            f"sellerSkus={','.join(quote(sku, safe='') for sku in skus)}"
+        ]
+
+        summaries_by_sku = {}
+        try:
+            next_token = None
+            page = 0
+            while True:
+                page += 1
+                page_params = params + ([f'nextToken={quote(next_token, safe="")}'] if next_token else [])
+                response = await self._make_api_request(
+                    'GET', f"/fba/inventory/v1/summaries?{'&'.join(page_params)}", expected_errors=[400, 404]
+                )
+
+                if '_status_code' in response:
+                    status = response['_status_code']
+                    if page > 1:
+                        # e.g. an expired nextToken - the missing pages may hold stock for the remaining SKUs
+                        logger.error(f"Batched FBA inventory check failed on page {page} with status {status}")
+                        return self._failed_fba_results(skus, summaries_by_sku,
+                                                        f"FBA inventory page {page} failed with status {status}")
+                    if status == 400 and len(skus) > 1:
+                        # One bad SKU rejects the whole batch, so look the SKUs up one at a time
+                        logger.warning(f"Batched FBA inventory check for {len(skus)} SKUs rejected - checking SKUs individually")
+                        results = await asyncio.gather(*(self.check_fba_inventory(sku) for sku in skus))
+                        return dict(zip(skus, results))
+                    # Nothing found - same safe defaults as single-SKU lookups
+                    return {sku: self._process_fba_response(sku, response) for sku in skus}
+
+                for summary in response.get('payload', {}).get('inventorySummaries', []):
+                    summaries_by_sku.setdefault(summary.get('sellerSku'), summary)
+
+                next_token = (response.get('pagination') or {}).get('nextToken')
+                if not next_token:
+                    break
+
+        except Exception as e:
+            logger.error(f"Batched FBA inventory check failed for {len(skus)} SKUs: {e}")
+            return self._failed_fba_results(skus, summaries_by_sku, str(e))
+
+        return {
+            sku: self._build_fba_result(summaries_by_sku[sku]) if sku in summaries_by_sku
+            else self._empty_fba_result(sku)
+            for sku in skus
+        }
+
+    async def check_listing_inventory(self, sku: str) -> Dict:
+        """Check listing inventory using Listings API as alternative to FBA Inventory API"""
+        endpoint = f"/listings/2021-08-01/items/{self.credentials.seller_id}/{quote(sku, safe='')}"
+
+        params = {
+            'marketplaceIds': self.credentials.marketplace_id,
+            'includedData': LISTING_INVENTORY_INCLUDED_DATA
+        }
+
+        try:
+            response = await self._make_api_request('GET', endpoint, params=params)
+            return self._build_listing_inventory_result(sku, response)
+
+        except aiohttp.ClientResponseError as e:
+            if e.status in [400, 404]:
+                # SKU not found in listings (may already be deleted or never existed)
+                logger.info(f"SKU {sku}: Not found in listings (status {e.status}) - safe for deletion")
+                return self._listing_not_found_result(sku)
+
+            logger.error(f"Listing check failed for {sku} (status {e.status}): {e}")
+            return self._listing_error_result(sku, e)
+
+    async def listing_exists(self, sku: str) -> bool:
+        """Check whether a SKU still has a listing using getListingsItem"""
+        params = {'marketplaceIds': self.credentials.marketplace_id}
+        response = await self._make_api_request('GET', self._listing_item_endpoint(sku), params=params, expected_errors=[404])
+
+        # 404 means the listing is gone; anything else raised above
+        return response.get('_status_code') != 404
+
+    async def check_listing_inventory_batch(self, skus: List[str]) -> Dict[str, Dict]:
+        """Check listing inventory for many SKUs, with all 20-SKU searches in flight at once"""
+        chunks = chunk_list(list(dict.fromkeys(skus)), LISTINGS_SEARCH_BATCH_SIZE)
+        responses = await asyncio.gather(*(
+            self._make_api_request('GET', self._search_listings_endpoint(chunk, LISTING_INVENTORY_INCLUDED_DATA))
+            for chunk in chunks
+        ), return_exceptions=True)
+
+        results = {}
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                # Treat the whole chunk as having inventory rather than guessing
+                logger.error(f"Batch listing check failed for {len(chunk)} SKUs: {response}")
+                results.update({sku: self._listing_error_result(sku, response) for sku in chunk})
+            else:
+                results.update(self._build_listing_inventory_batch(chunk, response))
+        return results
+
+    async def search_listings_items(self, skus: List[str]) -> Set[str]:
+        """Return which of the given SKUs still have listings, with all 20-SKU searches in flight at once"""
+        chunks = chunk_list(list(dict.fromkeys(skus)), LISTINGS_SEARCH_BATCH_SIZE)
+        responses = await asyncio.gather(*(
+            self._make_api_request('GET', self._search_listings_endpoint(chunk)) for chunk in chunks
+        ))
+        return {item.get('sku') for response in responses for item in response.get('items', [])}
+
+    async def delete_sku(self, sku: str) -> Dict:
+        """Delete a SKU using Listings API"""
+        endpoint = f"/listings/2021-08-01/items/{self.credentials.seller_id}/{quote(sku, safe='')}"
+
+        params = {
+            'marketplaceIds': self.credentials.marketplace_id
+        }
+
+        try:
+            logger.info(f"Sending DELETE request for SKU: {sku} to endpoint: {endpoint}")
+            response = await self._make_api_request('DELETE', endpoint, params=params)
+            self._log_delete_response(sku, response)
+            return response
+
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"❌ DELETE API call failed for {sku}: HTTP {e.status} - {e.message}")
+            if e.status == 404:
+                logger.warning(f"SKU {sku} not found (may already be deleted)")
+                return {'sku': sku, 'status': 'not_found'}
+
+            logger.error(f"Delete failed for {sku}: {e}")
+            raise
@@ -0,0 +1,134 @@
+"""
+Adaptive concurrency control for SKU Cleanup Tool
+AIMD limits per SP-API operation so each seller account converges to its real quota
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AIMDLimiter:
+    """Concurrency limit for one operation: additive increase while healthy, multiplicative decrease on throttling"""
+
+    def __init__(self, operation: str, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0, decrease_cooldown: float = 1.0):
+        self.operation = operation
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance  # Latency above baseline * tolerance stops increases
+        self.decrease_cooldown = decrease_cooldown  # One cut per burst of 429s from the same window
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []  # Coroutines waiting for a slot
+        self.history = deque([(time.time(), int(self._limit))], maxlen=200)  # (timestamp, limit) on every change
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight"""
+        return int(self._limit)
+
+    def acquire(self):
+        """Wait for a free slot under the current limit"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def acquire_async(self):
+        """Coroutine version of acquire that waits without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return
+                # Registered under the lock so a release between the check and the wait is not missed
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, latency: float, throttled: bool = False, failed: bool = False):
+        """Free a slot and adjust the limit from the call's outcome"""
+        with self._condition:
+            self._in_flight -= 1
+            previous = int(self._limit)
+
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif not failed:
+                if self._baseline_latency is None:
+                    self._baseline_latency = latency
+                healthy = latency <= self._baseline_latency * self.latency_tolerance
+                # Exponentially weighted baseline so slow drift is tracked but spikes stand out
+                self._baseline_latency += 0.1 * (latency - self._baseline_latency)
+
+                if healthy:
+                    # +1 per limit's worth of successful calls, i.e. roughly one step per round trip
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+            if int(self._limit) != previous:
+                self.history.append((time.time(), int(self._limit)))
+                logger.debug(f"{self.operation} concurrency {previous} -> {int(self._limit)}")
+
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+
+        # Woken coroutines re-check the limit, like threads returning from wait()
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # Loop already closed - nothing left to wake
+
+def _wake(waiter: asyncio.Future):
+    """Resolve a slot waiter unless its coroutine was cancelled"""
+    if not waiter.done():
+        waiter.set_result(None)
+
+class ConcurrencyController:
+    """Per-operation AIMD limiters shared by every worker thread and coroutine of the API clients"""
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 16):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, operation: str) -> AIMDLimiter:
+        """Get or create the limiter for an operation"""
+        with self._lock:
+            limiter = self._limiters.get(operation)
+            if limiter is None:
+                limiter = self._limiters[operation] = AIMDLimiter(
+                    operation, self.initial_limit, self.min_limit, self.max_limit
+                )
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current, lowest and highest limit and the change history for each operation"""
+        with self._lock:
+            limiters = dict(self._limiters)
+
+        summary = {}
+        for operation, limiter in limiters.items():
+            history: List[Tuple[float, int]] = list(limiter.history)
+            limits = [limit for _, limit in history]
+            summary[operation] = {
+                'limit': limiter.limit,
+                'min': min(limits),
+                'max': max(limits),
+                'history': history
+            }
+        return summary
@@ -31,15 +31,33 @@ class ResilienceSettings:
     backoff_factor: float = 2.0  # Exponential backoff multiplier
     jitter: bool = True  # Add random jitter to prevent thundering herd
 
+    # Run-wide retry budget: retries may add at most this fraction of extra requests (plus a small floor)
+    retry_budget_ratio: float = 0.1
+    retry_budget_min_retries: int = 10
+
     # Connection pooling settings
     max_connections: int = 20  # Increased for better parallelism
+    max_workers: int = 4  # Concurrent inventory check requests (1 = sequential)
+    deletion_workers: int = 4  # Concurrent deleteListingsItem requests (1 = sequential)
     connection_timeout: float = 15.0  # Reduced timeout
     read_timeout: float = 30.0  # Reduced timeout
 
+    # Rate limiting settings (per-operation token buckets using SP-API usage plans)
+    rate_limiting_enabled: bool = True
+    shared_rate_limiting: bool = True  # Coordinate token buckets with other processes on the same seller account
+    shared_rate_limit_dir: str = ''  # Empty = logs/rate_limits next to the tool
+
+    # Adaptive (AIMD) concurrency: start at max_workers/deletion_workers, grow while healthy,
+    # halve on 429s, never exceeding concurrency_max_limit in-flight calls per operation
+    adaptive_concurrency: bool = True
+    concurrency_max_limit: int = 16
+
     # Circuit breaker settings
     circuit_breaker_failure_threshold: int = 50  # Much more tolerant for bulk operations
     circuit_breaker_recovery_timeout: int = 60  # Longer recovery time
     circuit_breaker_error_rate_threshold: float = 0.5  # 50% error rate before opening
+    circuit_breaker_window_seconds: float = 60.0  # Only failures this recent count (429s never do)
+    circuit_breaker_half_open_max_calls: int = 1  # Concurrent recovery probes while half-open
 
 @dataclass
 class CleanupSettings:
@@ -51,6 +69,61 @@ class CleanupSettings:
     skip_skus: List[str]
     resilience: ResilienceSettings = field(default_factory=ResilienceSettings)
 
+    # FBA inventory lookup mode
+    # batch: check old FBA SKUs with batched sellerSkus requests
+    # snapshot: page through the full FBA inventory once per run and answer from that index
+    # incremental: persist the snapshot and only fetch changes since the previous run
+    # report: join merchant listings with the FBA inventory report, confirming candidates with the API
+    fba_inventory_mode: str = 'batch'
+    fba_snapshot_max_age_hours: int = 168  # Force a full snapshot when the persisted one is older than this
+
+    # Merchant listings report polling and reuse
+    report_reuse_max_age_minutes: int = 60  # Reuse a DONE report this recent instead of creating one (0 = never)
+    report_poll_initial_interval: float = 5.0  # First poll interval when no generation times are known
+    report_poll_max_interval: float = 30.0  # Poll intervals grow toward this cap
+    report_poll_timeout: int = 900  # Give up on a report after this many seconds
+
+    # Scheduled reports: Amazon generates them shortly before the cron window so runs find a DONE report
+    report_schedule_enabled: bool = False
+    report_schedule_period: str = 'P1D'  # createReportSchedule period (ISO 8601 duration from the allowed set)
+    report_schedule_run_time: str = ''  # HH:MM UTC the cleanup cron starts (empty = Amazon starts the schedule now)
+    report_schedule_lead_minutes: int = 30  # Generate reports this long before the run
+    report_schedule_max_age_minutes: int = 180  # Reuse window while scheduling (covers the lead time and cron drift)
+
+    # On-disk cache of downloaded report documents (gzip-compressed, keyed by report type and document ID)
+    report_cache_enabled: bool = True
+    report_cache_dir: str = ''  # Empty = logs/report_cache next to the tool
+    report_cache_ttl_hours: int = 24
+    report_cache_max_entries: int = 5
+
+    # Uncompressed report documents are downloaded as parallel HTTP Range requests (1 worker = single stream)
+    report_download_workers: int = 4
+    report_download_part_size_mb: int = 8
+
+    # Deletion backend
+    # listings: one deleteListingsItem call per SKU on a worker pool
+    # feed: one JSON_LISTINGS_FEED submission with a DELETE message per SKU
+    deletion_backend: str = 'listings'
+    feed_poll_timeout: int = 3600  # Give up on a feed after this many seconds
+
+    # Post-deletion verification: up to this many SKUs are checked with getListingsItem,
+    # larger sets with searchListingsItems (20 SKUs per call)
+    verification_search_threshold: int = 5
+
+    # Run the cleanup on the asyncio SP-API client (requires aiohttp)
+    async_mode: bool = False
+
+    # Streaming pipeline: report batches flow through age, inventory, cooldown, delete and record stages
+    # connected by bounded queues, so deletions start while the report is still being parsed
+    streaming_pipeline: bool = False
+    pipeline_queue_size: int = 4  # Batches (of batch_size SKUs) buffered between two stages
+
+    # LWA access token: refreshed once for all workers, ahead of expiry, and cached owner-only (0600) on disk
+    token_cache_enabled: bool = True
+    token_cache_file: str = ''  # Empty = logs/lwa_token_cache.json next to the tool
+    token_refresh_margin_seconds: int = 300  # Treat tokens as expired this long before they actually expire
+    token_background_refresh: bool = True
+
     # Testing modes
     # test_mode: Use sample of SKUs for testing (implies dry_run=True for safety)
     test_mode: bool = False
@@ -84,12 +157,23 @@ class Config:
             max_delay=self._get_env_float('MAX_DELAY', 30.0),
             backoff_factor=self._get_env_float('BACKOFF_FACTOR', 2.0),
             jitter=self._get_env_bool('JITTER', True),
+            retry_budget_ratio=self._get_env_float('RETRY_BUDGET_RATIO', 0.1),
+            retry_budget_min_retries=self._get_env_int('RETRY_BUDGET_MIN_RETRIES', 10),
             max_connections=self._get_env_int('MAX_CONNECTIONS', 20),
+            max_workers=self._get_env_int('MAX_WORKERS', 4),
+            deletion_workers=self._get_env_int('DELETION_WORKERS', 4),
             connection_timeout=self._get_env_float('CONNECTION_TIMEOUT', 15.0),
             read_timeout=self._get_env_float('READ_TIMEOUT', 30.0),
+            rate_limiting_enabled=self._get_env_bool('RATE_LIMITING_ENABLED', True),
+            shared_rate_limiting=self._get_env_bool('SHARED_RATE_LIMITING', True),
+            shared_rate_limit_dir=self._get_env_var('SHARED_RATE_LIMIT_DIR', ''),
+            adaptive_concurrency=self._get_env_bool('ADAPTIVE_CONCURRENCY', True),
+            concurrency_max_limit=self._get_env_int('CONCURRENCY_MAX_LIMIT', 16),
             circuit_breaker_failure_threshold=self._get_env_int('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 50),
             circuit_breaker_recovery_timeout=self._get_env_int('CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 60),
-            circuit_breaker_error_rate_threshold=self._get_env_float('CIRCUIT_BREAKER_ERROR_RATE_THRESHOLD', 0.5)
+            circuit_breaker_error_rate_threshold=self._get_env_float('CIRCUIT_BREAKER_ERROR_RATE_THRESHOLD', 0.5),
+            circuit_breaker_window_seconds=self._get_env_float('CIRCUIT_BREAKER_WINDOW_SECONDS', 60.0),
+            circuit_breaker_half_open_max_calls=self._get_env_int('CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS', 1)
         )
 
         return CleanupSettings(
@@ -99,6 +183,33 @@ class Config:
             log_level=self._get_env_var('LOG_LEVEL', 'INFO').upper(),
             skip_skus=self._parse_skip_skus(),
             resilience=resilience,
+            fba_inventory_mode=self._get_env_var('FBA_INVENTORY_MODE', 'batch').lower(),
+            fba_snapshot_max_age_hours=self._get_env_int('FBA_SNAPSHOT_MAX_AGE_HOURS', 168),
+            report_reuse_max_age_minutes=self._get_env_int('REPORT_REUSE_MAX_AGE_MINUTES', 60),
+            report_poll_initial_interval=self._get_env_float('REPORT_POLL_INITIAL_INTERVAL', 5.0),
+            report_poll_max_interval=self._get_env_float('REPORT_POLL_MAX_INTERVAL', 30.0),
+            report_poll_timeout=self._get_env_int('REPORT_POLL_TIMEOUT', 900),
+            report_schedule_enabled=self._get_env_bool('REPORT_SCHEDULE_ENABLED', False),
+            report_schedule_period=self._get_env_var('REPORT_SCHEDULE_PERIOD', 'P1D'),
+            report_schedule_run_time=self._get_env_var('REPORT_SCHEDULE_RUN_TIME', ''),
+            report_schedule_lead_minutes=self._get_env_int('REPORT_SCHEDULE_LEAD_MINUTES', 30),
+            report_schedule_max_age_minutes=self._get_env_int('REPORT_SCHEDULE_MAX_AGE_MINUTES', 180),
+            report_cache_enabled=self._get_env_bool('REPORT_CACHE_ENABLED', True),
+            report_cache_dir=self._get_env_var('REPORT_CACHE_DIR', ''),
+            report_cache_ttl_hours=self._get_env_int('REPORT_CACHE_TTL_HOURS', 24),
+            report_cache_max_entries=self._get_env_int('REPORT_CACHE_MAX_ENTRIES', 5),
+            report_download_workers=self._get_env_int('REPORT_DOWNLOAD_WORKERS', 4),
+            report_download_part_size_mb=self._get_env_int('REPORT_DOWNLOAD_PART_SIZE_MB', 8),
+            deletion_backend=self._get_env_var('DELETION_BACKEND', 'listings').lower(),
+            feed_poll_timeout=self._get_env_int('FEED_POLL_TIMEOUT', 3600),
+            verification_search_threshold=self._get_env_int('VERIFICATION_SEARCH_THRESHOLD', 5),
+            async_mode=self._get_env_bool('ASYNC_MODE', False),
+            streaming_pipeline=self._get_env_bool('STREAMING_PIPELINE', False),
+            pipeline_queue_size=self._get_env_int('PIPELINE_QUEUE_SIZE', 4),
+            token_cache_enabled=self._get_env_bool('TOKEN_CACHE_ENABLED', True),
+            token_cache_file=self._get_env_var('TOKEN_CACHE_FILE', ''),
+            token_refresh_margin_seconds=self._get_env_int('TOKEN_REFRESH_MARGIN_SECONDS', 300),
+            token_background_refresh=self._get_env_bool('TOKEN_BACKGROUND_REFRESH', True),
             test_mode=self._get_env_bool('TEST_MODE', False),
             test_sample_size=self._get_env_int('TEST_SAMPLE_SIZE', 10),
             test_seed_skus=self._parse_test_seed_skus()
@@ -3,94 +3,140 @@ Data processing and filtering logic for SKU Cleanup Tool
 Handles SKU data analysis, age calculation, and deletion eligibility
 """
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 import re
 
+from .age_engine import AgeEngine
+from .inventory_snapshot import FBA_INVENTORY_BATCH_SIZE, has_inbound_inventory
+from .sku_table import MISSING, RESULT_FIELDS, SkuTable
+from .utils import chunk_list
+
 logger = logging.getLogger(__name__)
 
 class DataProcessor:
     """Processes and filters SKU data for cleanup decisions"""
 
-    def __init__(self, amazon_api=None):
+    def __init__(self, amazon_api=None, inventory_index: Optional[Dict[str, Dict]] = None, max_workers: int = 1,
+                 age_threshold_days: int = 30, age_engine: Optional[AgeEngine] = None):
         self.amazon_api = amazon_api  # For FBA API calls during processing
-
-    def process_sku_data(self, raw_skus: List[Dict]) -> List[Dict]:
-        """Process raw SKU data with simultaneous age and FBA inventory checking"""
-        processed_skus = []
-
+        self.age_threshold_days = age_threshold_days
+        # Ages are measured against one reference time for the whole run
+        self.age_engine = age_engine or AgeEngine()
+        # Optional full-catalog FBA inventory snapshot keyed by sellerSku (answers lookups without API calls)
+        self.inventory_index = inventory_index
+        # Number of batched inventory requests allowed in flight at once (1 = sequential)
+        self.max_workers = max(1, max_workers)
+
+    def process_sku_data(self, raw_skus: Sequence[Dict], max_workers: Optional[int] = None) -> SkuTable:
+        """Process raw SKU data with simultaneous age and FBA inventory checking (max_workers overrides lookup concurrency)"""
         logger.info(f"Starting to process {len(raw_skus)} raw SKUs")
 
+        table = SkuTable.coerce(raw_skus)
+        ages, old_enough, old_fba_skus = self._prepare_inventory_lookup(table)
+        fba_results, fba_errors = self._lookup_fba_inventory(old_fba_skus, max_workers or self.max_workers)
+        return self._build_processed_skus(table, ages, old_enough, fba_results, fba_errors)
+
+    async def process_sku_data_async(self, raw_skus: Sequence[Dict]) -> SkuTable:
+        """Coroutine version of process_sku_data for use with AsyncAmazonAPI"""
+        logger.info(f"Starting to process {len(raw_skus)} raw SKUs (async)")
+
+        table = SkuTable.coerce(raw_skus)
+        ages, old_enough, old_fba_skus = self._prepare_inventory_lookup(table)
+        fba_results, fba_errors = await self._lookup_fba_inventory_async(old_fba_skus)
+        return self._build_processed_skus(table, ages, old_enough, fba_results, fba_errors)
+
+    def _prepare_inventory_lookup(self, table: SkuTable) -> Tuple[List[Optional[int]], List[bool], List[str]]:
+        """Calculate ages and collect the old FBA SKUs that need an inventory lookup"""
+        # Ages for the whole batch in one vectorized pass, so every old FBA SKU can be checked in batched API calls
+        age_array, old_mask = self.age_engine.evaluate(table.column('created_date', ''), self.age_threshold_days)
+        ages = [None if math.isnan(age) else int(age) for age in age_array.tolist()]
+        old_enough = old_mask.tolist()
+
+        old_fba_skus = [
+            sku for sku, channel, is_old in zip(table.column('sku'), table.column('fulfillment_channel'), old_enough)
+            if is_old and sku and channel in ['AMAZON', 'AMAZON_EU']
+        ]
+        return ages, old_enough, old_fba_skus
+
+    def _build_processed_skus(self, table: SkuTable, ages: List[Optional[int]], old_enough: List[bool],
+                              fba_results: Dict[str, Dict], fba_errors: Dict[str, Exception]) -> SkuTable:
+        """Combine ages and FBA inventory results into a table of processed SKUs with eligibility decisions"""
+        # One list per result field aligned with the kept rows instead of per-SKU record copies
+        # (each decision below is a tuple in RESULT_FIELDS order)
+        kept_rows = []
+        results = {field: [] for field in RESULT_FIELDS}
+
         valid_skus = 0
         old_enough_skus = 0
         fba_skus = 0
 
-        for i, sku_data in enumerate(raw_skus):
+        skus = table.column('sku')
+        channels = table.column('fulfillment_channel')
+        created_dates = table.column('created_date')
+
+        for i, (sku, fulfillment_channel, created_date) in enumerate(zip(skus, channels, created_dates)):
             try:
                 # Skip invalid or empty SKUs
-                if not sku_data.get('sku'):
+                if not sku:
                     if i < 3:  # Only log first few for brevity
                         logger.warning(f"Skipping SKU with missing SKU field at index {i}")
                     continue
 
-                sku = sku_data.get('sku')
                 valid_skus += 1
 
                 # Log fulfillment channel for first few SKUs
                 if valid_skus <= 3:
-                    fulfillment = sku_data.get('fulfillment_channel', 'MISSING')
-                    created_date = sku_data.get('created_date', 'MISSING')
-                    logger.info(f"Valid SKU {valid_skus}: {sku}, fulfillment='{fulfillment}', created='{created_date}'")
+                    fulfillment = fulfillment_channel if fulfillment_channel is not None else 'MISSING'
+                    created = created_date if created_date is not None else 'MISSING'
+                    logger.info(f"Valid SKU {valid_skus}: {sku}, fulfillment='{fulfillment}', created='{created}'")
 
                 # Debug logging for first few SKUs to understand data structure
-                if len(processed_skus) < 5:
+                if len(kept_rows) < 5:
                     logger.debug(f"Processing SKU: {sku}")
-                    logger.debug(f"SKU data keys: {list(sku_data.keys())}")
-                    logger.debug(f"Created date: {sku_data.get('created_date', 'None')}")
-                    logger.debug(f"Fulfillment channel: {sku_data.get('fulfillment_channel', 'None')}")
+                    logger.debug(f"SKU data keys: {list(table[i].keys())}")
+                    logger.debug(f"Created date: {created_date}")
+                    logger.debug(f"Fulfillment channel: {fulfillment_channel}")
 
                 # Check age first
-                age_days = self._calculate_sku_age(sku_data.get('created_date', ''))
+                age_days = ages[i]
 
                 # Debug age calculation for first few SKUs
-                if len(processed_skus) < 10:
-                    logger.info(f"SKU {sku}: Age calculation - created_date='{sku_data.get('created_date', '')}', age_days={age_days}")
+                if len(kept_rows) < 10:
+                    logger.info(f"SKU {sku}: Age calculation - created_date='{created_date or ''}', age_days={age_days}")
 
-                is_old_enough = age_days >= 30 if age_days else False
+                is_old_enough = old_enough[i]
 
                 # If not old enough, skip FBA check for efficiency
                 if not is_old_enough:
-                    processed_sku = sku_data.copy()
-                    processed_sku['age_days'] = age_days
-                    processed_sku['is_old_enough'] = False
-                    processed_sku['fba_inventory_check'] = 'skipped'
-                    processed_sku['is_eligible_for_deletion'] = False
-                    processed_skus.append(processed_sku)
-                    continue
+                    decision = (age_days, False, 'skipped', MISSING, False)
 
                 # For old SKUs, check FBA inventory using FBA Inventory API (more reliable for inventory data)
                 # Note: Rate limiting and resilience patterns are handled by the API layer
-                if self.amazon_api and sku_data.get('fulfillment_channel') in ['AMAZON', 'AMAZON_EU']:
+                elif (self.amazon_api or self.inventory_index is not None) and fulfillment_channel in ['AMAZON', 'AMAZON_EU']:
                     try:
                         # Use FBA Inventory API - provides actual quantity data
                         # Resilience patterns (retry, circuit breaker) are handled by amazon_api.py
-                        fba_check = self.amazon_api.check_fba_inventory(sku)
+                        if sku in fba_errors:
+                            raise fba_errors[sku]
+                        fba_check = fba_results[sku]
+                        if 'error' in fba_check:
+                            # Lookup failed for this SKU (e.g. a rejected later page) - its zero quantities are not real
+                            raise RuntimeError(fba_check['error'])
 
                         # Check if there's any FBA inventory (fulfillable or inbound)
                         fulfillable_qty = fba_check.get('fulfillableQuantity', 0)
                         inbound_qty = fba_check.get('inboundQuantity', 0)
                         has_inventory = fulfillable_qty > 0 or inbound_qty > 0
 
-                        processed_sku = sku_data.copy()
-                        processed_sku['age_days'] = age_days
-                        processed_sku['is_old_enough'] = True
-                        processed_sku['fba_inventory_check'] = {
+                        inventory_check = {
                             'fulfillable_quantity': fulfillable_qty,
                             'inbound_quantity': inbound_qty,
                             'reserved_quantity': fba_check.get('reservedQuantity', 0),
                             'has_inventory': has_inventory
                         }
-                        processed_sku['is_eligible_for_deletion'] = not has_inventory
+                        decision = (age_days, True, inventory_check, MISSING, not has_inventory)
 
                         status = "SAFE" if not has_inventory else f"HAS INVENTORY (F: {fulfillable_qty}, I: {inbound_qty})"
                         logger.info(f"SKU {sku}: Age={age_days}d, FBA Check - Fulfillable: {fulfillable_qty}, Inbound: {inbound_qty}, Status: {status}")
@@ -109,33 +155,155 @@ class DataProcessor:
                             logger.warning(f"SKU {sku}: Network error during FBA inventory check")
 
                         # Be conservative - if API fails, don't delete
-                        processed_sku = sku_data.copy()
-                        processed_sku['age_days'] = age_days
-                        processed_sku['is_old_enough'] = True
-                        processed_sku['fba_inventory_check'] = {
+                        inventory_check = {
                             'error': str(e),
                             'error_type': error_type,
                             'safe_decision': True  # Conservative approach
                         }
-                        processed_sku['is_eligible_for_deletion'] = False
+                        decision = (age_days, True, inventory_check, MISSING, False)
                 else:
                     # Non-FBA or no API available - check fulfillment channel only
-                    is_fba_configured = sku_data.get('fulfillment_channel') in ['AMAZON', 'AMAZON_EU']
+                    is_fba_configured = fulfillment_channel in ['AMAZON', 'AMAZON_EU']
+                    listing_check = 'not_applicable' if not is_fba_configured else 'no_api'
+                    decision = (age_days, True, MISSING, listing_check, not is_fba_configured)  # Safe if not FBA
 
-                    processed_sku = sku_data.copy()
-                    processed_sku['age_days'] = age_days
-                    processed_sku['is_old_enough'] = True
-                    processed_sku['listing_inventory_check'] = 'not_applicable' if not is_fba_configured else 'no_api'
-                    processed_sku['is_eligible_for_deletion'] = not is_fba_configured  # Safe if not FBA
-
-                processed_skus.append(processed_sku)
+                kept_rows.append(i)
+                for field, value in zip(RESULT_FIELDS, decision):
+                    results[field].append(value)
 
             except Exception as e:
-                logger.error(f"Error processing SKU {sku_data.get('sku', 'unknown')}: {e}")
+                logger.error(f"Error processing SKU {sku or 'unknown'}: {e}")
                 continue
 
+        processed_skus = table.take(kept_rows)
+        for field, values in results.items():
+            processed_skus.set_column(field, values)
         return processed_skus
 
+    def _lookup_fba_inventory(self, skus: List[str], max_workers: int) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+        """Fetch FBA inventory for old FBA SKUs from the snapshot index or batched getInventorySummaries calls"""
+        if not skus:
+            return {}, {}
+
+        if self.inventory_index is not None:
+            return self._lookup_inventory_index(skus), {}
+
+        if not self.amazon_api:
+            return {}, {}
+
+        def check_chunk(chunk: List[str]) -> Tuple[Dict[str, Dict], Optional[Exception]]:
+            try:
+                return self.amazon_api.check_fba_inventory_batch(chunk), None
+            except Exception as e:
+                logger.warning(f"Batched FBA inventory lookup failed for {len(chunk)} SKUs: {e}")
+                return {}, e
+
+        # Sequential mode sends everything in one call; concurrent mode fans out one request-sized chunk per task
+        if max_workers > 1 and len(skus) > FBA_INVENTORY_BATCH_SIZE:
+            chunks = chunk_list(skus, FBA_INVENTORY_BATCH_SIZE)
+            workers = min(max_workers, len(chunks))
+            logger.info(f"Checking FBA inventory for {len(skus)} SKUs in {len(chunks)} chunks with {workers} workers")
+            # Threads share the pooled session and rate limiter of the API layer
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fba-inventory') as executor:
+                outcomes = list(executor.map(check_chunk, chunks))
+        else:
+            chunks = [skus]
+            outcomes = [check_chunk(skus)]
+
+        results = {}
+        errors = {}
+        for chunk, (chunk_results, error) in zip(chunks, outcomes):
+            results.update(chunk_results)
+            if error is not None:
+                errors.update(dict.fromkeys(chunk, error))
+
+        return results, errors
+
+    async def _lookup_fba_inventory_async(self, skus: List[str]) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+        """Coroutine version of _lookup_fba_inventory; the async API keeps all batches in flight at once"""
+        if not skus:
+            return {}, {}
+
+        if self.inventory_index is not None:
+            return self._lookup_inventory_index(skus), {}
+
+        if not self.amazon_api:
+            return {}, {}
+
+        try:
+            return await self.amazon_api.check_fba_inventory_batch(skus), {}
+        except Exception as e:
+            logger.warning(f"Batched FBA inventory lookup failed for {len(skus)} SKUs: {e}")
+            return {}, dict.fromkeys(skus, e)
+
+    def _lookup_inventory_index(self, skus: List[str]) -> Dict[str, Dict]:
+        """Answer FBA inventory lookups from the full-catalog snapshot index"""
+        # SKUs absent from the full-catalog snapshot have no FBA inventory
+        return {
+            sku: self.inventory_index.get(sku) or {
+                'sellerSku': sku,
+                'fulfillableQuantity': 0,
+                'inboundQuantity': 0,
+                'reservedQuantity': 0
+            }
+            for sku in skus
+        }
+
+    def confirm_fba_candidates(self, candidates: List[Dict]) -> List[Dict]:
+        """Re-check FBA deletion candidates decided from report data against the live FBA Inventory API"""
+        fba_skus = self._fba_candidate_skus(candidates)
+        if not fba_skus or not self.amazon_api:
+            return candidates
+
+        try:
+            live_results = self.amazon_api.check_fba_inventory_batch(fba_skus)
+        except Exception as e:
+            logger.warning(f"Live FBA inventory confirmation failed for {len(fba_skus)} candidates: {e}")
+            live_results = {}
+        return self._apply_fba_confirmation(candidates, live_results)
+
+    async def confirm_fba_candidates_async(self, candidates: List[Dict]) -> List[Dict]:
+        """Coroutine version of confirm_fba_candidates for use with AsyncAmazonAPI"""
+        fba_skus = self._fba_candidate_skus(candidates)
+        if not fba_skus or not self.amazon_api:
+            return candidates
+
+        try:
+            live_results = await self.amazon_api.check_fba_inventory_batch(fba_skus)
+        except Exception as e:
+            logger.warning(f"Live FBA inventory confirmation failed for {len(fba_skus)} candidates: {e}")
+            live_results = {}
+        return self._apply_fba_confirmation(candidates, live_results)
+
+    def _fba_candidate_skus(self, candidates: List[Dict]) -> List[str]:
+        """SKUs of the FBA-configured candidates that need a live inventory check"""
+        return [candidate['sku'] for candidate in candidates
+                if candidate.get('fulfillment_channel') in ['AMAZON', 'AMAZON_EU']]
+
+    def _apply_fba_confirmation(self, candidates: List[Dict], live_results: Dict[str, Dict]) -> List[Dict]:
+        """Drop FBA candidates whose live inventory shows stock or could not be checked"""
+        confirmed = []
+        for candidate in candidates:
+            sku = candidate['sku']
+            if candidate.get('fulfillment_channel') not in ['AMAZON', 'AMAZON_EU']:
+                confirmed.append(candidate)
+                continue
+
+            live = live_results.get(sku)
+            if live is None or 'error' in live:
+                # Be conservative - a candidate that cannot be confirmed is not deleted
+                logger.warning(f"SKU {sku}: Live FBA confirmation unavailable - keeping listing")
+                candidate['is_eligible_for_deletion'] = False
+            elif live.get('fulfillableQuantity', 0) > 0 or has_inbound_inventory(live):
+                logger.warning(f"SKU {sku}: Live FBA inventory differs from the report "
+                               f"(F: {live.get('fulfillableQuantity', 0)}) - keeping listing")
+                candidate['is_eligible_for_deletion'] = False
+            else:
+                confirmed.append(candidate)
+
+        logger.info(f"Live FBA check confirmed {len(confirmed)} of {len(candidates)} deletion candidates")
+        return confirmed
+
     def identify_deletable_skus(self, processed_skus: List[Dict]) -> List[Dict]:
         """Identify SKUs that are eligible for deletion"""
         deletable_skus = []
@@ -148,26 +316,8 @@ class DataProcessor:
 
     def _calculate_sku_age(self, created_date: str) -> Optional[int]:
         """Calculate SKU age in days from Amazon's datetime format"""
-        if not created_date:
-            logger.debug("No creation date provided")
-            return None
-
-        try:
-            # Handle different date formats
-            # Format 1: DD/MM/YYYY (old format)
-            # Format 2: DD/MM/YYYY HH:MM:SS TIMEZONE (new format from API)
-
-            date_part = created_date.split()[0]  # Get just the date part
-            day, month, year = date_part.split('/')
-            sku_date = datetime(int(year), int(month), int(day))
-
-            # Calculate age in days
-            age = datetime.now() - sku_date
-            return age.days
-
-        except (ValueError, IndexError) as e:
-            logger.warning(f"Invalid date format '{created_date}': {e}")
-            return None
+        age = float(self.age_engine.ages([created_date])[0])
+        return None if math.isnan(age) else int(age)
 
     def _check_fba_eligibility(self, sku_data: Dict) -> bool:
         """Check if SKU has active FBA offers - DETERMINED BY FBA API LATER"""
@@ -186,15 +336,14 @@ class DataProcessor:
         logger.debug(f"SKU {sku_data.get('sku')} is not FBA-configured")
         return False
 
-    def filter_by_age(self, skus: List[Dict], threshold_days: int = 30) -> List[Dict]:
-        """Filter SKUs by age threshold"""
-        old_skus = []
-
-        for sku in skus:
-            age_days = self._calculate_sku_age(sku.get('created_date', ''))
-
-            if age_days and age_days >= threshold_days:
-                old_skus.append(sku)
+    def filter_by_age(self, skus: Sequence[Dict], threshold_days: int = 30) -> Sequence[Dict]:
+        """Filter SKUs by age threshold (a SkuTable is filtered into a SkuTable)"""
+        if isinstance(skus, SkuTable):
+            _, old_mask = self.age_engine.evaluate(skus.column('created_date', ''), threshold_days)
+            old_skus = skus.take(i for i, is_old in enumerate(old_mask.tolist()) if is_old)
+        else:
+            _, old_mask = self.age_engine.evaluate([sku.get('created_date', '') for sku in skus], threshold_days)
+            old_skus = [sku for sku, is_old in zip(skus, old_mask.tolist()) if is_old]
 
         logger.info(f"Found {len(old_skus)} SKUs older than {threshold_days} days")
         return old_skus
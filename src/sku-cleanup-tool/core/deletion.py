@@ -0,0 +1,210 @@
+"""
+SKU deletion backends for SKU Cleanup Tool
+Per-SKU deleteListingsItem calls on a bounded worker pool, or bulk JSON_LISTINGS_FEED submissions
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .resilience import CircuitBreakerState
+
+logger = logging.getLogger(__name__)
+
+class DeletionExecutor:
+    """Delete SKUs concurrently, stopping cleanly once the listings circuit breaker opens"""
+
+    def __init__(self, amazon_api, max_workers: int = 1, dry_run: bool = True,
+                 should_skip: Optional[Callable[[str], bool]] = None):
+        self.amazon_api = amazon_api
+        self.max_workers = max(1, max_workers)
+        self.dry_run = dry_run
+        self.should_skip = should_skip or (lambda sku: False)
+        self._stop = threading.Event()
+
+    def execute(self, skus_to_delete: List[Dict]) -> Dict[str, Any]:
+        """Delete the given SKUs and return deleted/skipped/errors in the order they were passed in"""
+        results = {
+            'deleted': [],
+            'skipped': [],
+            'errors': [],
+            'execution_time': 0
+        }
+
+        if not skus_to_delete:
+            logger.info("No SKUs to delete")
+            return results
+
+        start_time = datetime.now()
+        self._stop.clear()
+        skus = [sku_data['sku'] for sku_data in skus_to_delete]
+
+        if self.max_workers > 1 and len(skus) > 1 and not self.dry_run:
+            logger.info(f"Deleting {len(skus)} SKUs with {self.max_workers} concurrent workers")
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sku-delete') as executor:
+                outcomes = list(executor.map(self._delete_one, skus))
+        else:
+            outcomes = [self._delete_one(sku) for sku in skus]
+
+        self._collect(results, skus, outcomes)
+        results['execution_time'] = (datetime.now() - start_time).total_seconds()
+        return results
+
+    async def execute_async(self, skus_to_delete: List[Dict]) -> Dict[str, Any]:
+        """Coroutine version of execute for AsyncAmazonAPI, with max_workers deletions in flight on the event loop"""
+        results = {
+            'deleted': [],
+            'skipped': [],
+            'errors': [],
+            'execution_time': 0
+        }
+
+        if not skus_to_delete:
+            logger.info("No SKUs to delete")
+            return results
+
+        start_time = datetime.now()
+        self._stop.clear()
+        skus = [sku_data['sku'] for sku_data in skus_to_delete]
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        outcomes = await asyncio.gather(*(self._delete_one_async(sku, semaphore) for sku in skus))
+
+        self._collect(results, skus, outcomes)
+        results['execution_time'] = (datetime.now() - start_time).total_seconds()
+        return results
+
+    def _collect(self, results: Dict[str, Any], skus: List[str], outcomes: List[Tuple[str, Optional[str]]]):
+        """Sort (outcome, detail) pairs into the results, logging a circuit breaker stop"""
+        # Collect in input order so reports and cooldown files are the same on every run
+        for sku, (outcome, detail) in zip(skus, outcomes):
+            if outcome == 'deleted':
+                results['deleted'].append(sku)
+            elif outcome == 'skipped':
+                results['skipped'].append({'sku': sku, 'reason': detail})
+            else:
+                results['errors'].append({'sku': sku, 'error': detail})
+
+        if self._stop.is_set():
+            stopped = sum(1 for item in results['skipped'] if item['reason'] == 'circuit_breaker_open')
+            logger.warning(f"Listings circuit breaker opened - stopped deletions with {stopped} SKUs not attempted")
+
+    def _delete_one(self, sku: str) -> Tuple[str, Optional[str]]:
+        """Delete one SKU, returning an (outcome, detail) pair"""
+        # Final safety check
+        if self.should_skip(sku):
+            logger.info(f"Skipping SKU {sku} (in skip list)")
+            return 'skipped', 'in_skip_list'
+
+        if self._stop.is_set() or self._listings_circuit_open():
+            self._stop.set()
+            return 'skipped', 'circuit_breaker_open'
+
+        # FBA verification already done during processing phase
+        # If SKU made it here, it passed both age and FBA inventory checks
+        if self.dry_run:
+            logger.info(f"DRY RUN: Would delete SKU: {sku}")
+            return 'deleted', None  # Still count in dry run
+
+        try:
+            self.amazon_api.delete_sku(sku)
+            logger.info(f"Successfully deleted SKU: {sku}")
+            return 'deleted', None
+
+        except Exception as e:
+            return self._failure(sku, e)
+
+    async def _delete_one_async(self, sku: str, semaphore: asyncio.Semaphore) -> Tuple[str, Optional[str]]:
+        """Coroutine version of _delete_one; the circuit breaker is checked again once a slot is free"""
+        # Final safety check
+        if self.should_skip(sku):
+            logger.info(f"Skipping SKU {sku} (in skip list)")
+            return 'skipped', 'in_skip_list'
+
+        async with semaphore:
+            # The breaker may have opened while this SKU waited for a slot
+            if self._stop.is_set() or self._listings_circuit_open():
+                self._stop.set()
+                return 'skipped', 'circuit_breaker_open'
+
+            if self.dry_run:
+                logger.info(f"DRY RUN: Would delete SKU: {sku}")
+                return 'deleted', None  # Still count in dry run
+
+            try:
+                await self.amazon_api.delete_sku(sku)
+                logger.info(f"Successfully deleted SKU: {sku}")
+                return 'deleted', None
+            except Exception as e:
+                return self._failure(sku, e)
+
+    def _failure(self, sku: str, error: Exception) -> Tuple[str, Optional[str]]:
+        """Outcome of a failed delete call, stopping further deletions once the listings breaker is open"""
+        if "Circuit breaker" in str(error):
+            # Blocked before reaching Amazon - nothing was attempted for this SKU
+            self._stop.set()
+            return 'skipped', 'circuit_breaker_open'
+
+        logger.error(f"Error processing SKU {sku}: {str(error)}")
+        if self._listings_circuit_open():
+            self._stop.set()
+        return 'error', str(error)
+
+    def _listings_circuit_open(self) -> bool:
+        """Check whether the listings circuit breaker is currently blocking calls"""
+        breaker = getattr(self.amazon_api, 'circuit_breakers', {}).get('listings')
+        return breaker is not None and breaker.metrics.circuit_state == CircuitBreakerState.OPEN
+
+class FeedDeletionExecutor:
+    """Delete SKUs in bulk with JSON_LISTINGS_FEED submissions instead of one call per SKU"""
+
+    def __init__(self, amazon_api, dry_run: bool = True, should_skip: Optional[Callable[[str], bool]] = None):
+        self.amazon_api = amazon_api
+        self.dry_run = dry_run
+        self.should_skip = should_skip or (lambda sku: False)
+
+    def execute(self, skus_to_delete: List[Dict]) -> Dict[str, Any]:
+        """Delete the given SKUs and return deleted/skipped/errors in the order they were passed in"""
+        results = {
+            'deleted': [],
+            'skipped': [],
+            'errors': [],
+            'execution_time': 0
+        }
+
+        if not skus_to_delete:
+            logger.info("No SKUs to delete")
+            return results
+
+        start_time = datetime.now()
+        pending = []
+        for sku_data in skus_to_delete:
+            sku = sku_data['sku']
+            # Final safety check
+            if self.should_skip(sku):
+                logger.info(f"Skipping SKU {sku} (in skip list)")
+                results['skipped'].append({'sku': sku, 'reason': 'in_skip_list'})
+            else:
+                pending.append(sku)
+
+        if self.dry_run:
+            for sku in pending:
+                logger.info(f"DRY RUN: Would delete SKU via listings feed: {sku}")
+            results['deleted'].extend(pending)  # Still count in dry run
+        elif pending:
+            logger.info(f"Submitting listings delete feed for {len(pending)} SKUs")
+            outcomes = self.amazon_api.delete_skus_via_feed(pending)
+
+            for sku in pending:
+                error = outcomes.get(sku, 'No result in feed processing report')
+                if error is None:
+                    logger.info(f"Successfully deleted SKU: {sku}")
+                    results['deleted'].append(sku)
+                else:
+                    logger.error(f"Error processing SKU {sku}: {error}")
+                    results['errors'].append({'sku': sku, 'error': error})
+
+        results['execution_time'] = (datetime.now() - start_time).total_seconds()
+        return results
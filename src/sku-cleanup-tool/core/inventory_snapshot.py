@@ -0,0 +1,66 @@
+"""
+Persisted FBA inventory snapshot for SKU Cleanup Tool
+Stores the last full-catalog inventory index on disk so later runs can sync deltas only
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# getInventorySummaries accepts up to 50 SKUs in the sellerSkus parameter
+FBA_INVENTORY_BATCH_SIZE = 50
+
+class InventorySnapshotStore:
+    """Load and save the FBA inventory snapshot together with its sync time"""
+
+    def __init__(self, path: str, marketplace_id: str):
+        self.path = path
+        self.marketplace_id = marketplace_id
+
+    def load(self) -> Tuple[Optional[Dict[str, Dict]], Optional[datetime]]:
+        """Load the persisted snapshot, returning (None, None) when missing or unusable"""
+        try:
+            if not os.path.exists(self.path):
+                return None, None
+
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+
+            if data.get('marketplace_id') != self.marketplace_id:
+                logger.info("Persisted FBA inventory snapshot is for a different marketplace - ignoring it")
+                return None, None
+
+            return data['inventory'], datetime.fromisoformat(data['synced_at'])
+
+        except Exception as e:
+            logger.warning(f"Could not load FBA inventory snapshot: {e}")
+            return None, None
+
+    def save(self, inventory: Dict[str, Dict], synced_at: datetime):
+        """Atomically write the snapshot so an interrupted run never leaves a truncated file"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'marketplace_id': self.marketplace_id,
+                    'synced_at': synced_at.isoformat(),
+                    'inventory': inventory
+                }, f)
+            os.replace(temp_path, self.path)
+
+            logger.info(f"Saved FBA inventory snapshot with {len(inventory)} SKUs (synced at {synced_at.isoformat()})")
+        except Exception as e:
+            logger.error(f"Could not save FBA inventory snapshot: {e}")
+
+def has_inbound_inventory(inventory: Dict) -> bool:
+    """Check whether an FBA inventory result shows any inbound stock"""
+    return any(inventory.get(field, 0) > 0 for field in (
+        'inboundQuantity',
+        'inboundWorkingQuantity',
+        'inboundShippedQuantity',
+        'inboundReceivingQuantity'
+    ))
@@ -0,0 +1,111 @@
+"""
+Streaming cleanup pipeline for SKU Cleanup Tool
+Connects cleanup stages with bounded queues so SKU batches flow from the report to deletion
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_END = object()  # End-of-stream marker passed down the queues
+
+@dataclass
+class StageStats:
+    """Per-stage counters for one pipeline run"""
+    name: str
+    workers: int
+    batches_in: int = 0
+    batches_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+@dataclass
+class Stage:
+    """One pipeline step: func maps each batch to the batch to pass on (empty or None passes nothing)"""
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1  # Worker threads applying func concurrently
+
+class StreamingPipeline:
+    """Run stages concurrently, each reading batches from the previous stage through a bounded queue"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)  # Batches buffered between two stages (bounds peak memory)
+        self.stats: Dict[str, StageStats] = {}
+
+    def run(self, source: Iterable, source_name: str = 'parse') -> Dict[str, StageStats]:
+        """Feed batches from source through every stage; source errors are raised after the pipeline drains"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self.stats = {source_name: StageStats(source_name, 1)}
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            stats = self.stats[stage.name] = StageStats(stage.name, max(1, stage.workers))
+            shared = {'running': stats.workers, 'lock': threading.Lock()}
+            for worker in range(stats.workers):
+                thread = threading.Thread(target=self._work, args=(stage, stats, queues[index], outbox, shared),
+                                          name=f'pipeline-{stage.name}-{worker}', daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # The source runs on the calling thread and blocks whenever the first queue is full
+        source_stats = self.stats[source_name]
+        source_error: Optional[Exception] = None
+        start = time.perf_counter()
+        try:
+            for batch in source:
+                source_stats.busy_seconds += time.perf_counter() - start
+                source_stats.batches_out += 1
+                queues[0].put(batch)
+                start = time.perf_counter()
+        except Exception as e:
+            logger.error(f"Pipeline source '{source_name}' failed after {source_stats.batches_out} batches: {e}")
+            source_stats.errors += 1
+            source_error = e
+        finally:
+            queues[0].put(_END)
+
+        for thread in threads:
+            thread.join()
+
+        if source_error is not None:
+            raise source_error
+        return self.stats
+
+    def _work(self, stage: Stage, stats: StageStats, inbox: queue.Queue, outbox: Optional[queue.Queue], shared: Dict):
+        """Worker loop: process batches until end of stream, then hand the marker on"""
+        while True:
+            batch = inbox.get()
+            if batch is _END:
+                inbox.put(_END)  # Let sibling workers see the end of the stream too
+                with shared['lock']:
+                    shared['running'] -= 1
+                    last_worker = shared['running'] == 0
+                if last_worker and outbox is not None:
+                    outbox.put(_END)
+                return
+
+            start = time.perf_counter()
+            try:
+                result = stage.func(batch)
+            except Exception as e:
+                # Drop the failed batch and keep the stream moving, as batch mode does
+                logger.error(f"Pipeline stage '{stage.name}' failed on a batch: {e}")
+                result = None
+                with shared['lock']:
+                    stats.errors += 1
+
+            with shared['lock']:
+                stats.batches_in += 1
+                stats.busy_seconds += time.perf_counter() - start
+                if result:
+                    stats.batches_out += 1
+
+            if result and outbox is not None:
+                outbox.put(result)
@@ -0,0 +1,144 @@
+"""
+On-disk report document cache for SKU Cleanup Tool
+Keeps recently downloaded report documents gzip-compressed so repeated runs skip the download
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+class ReportDocumentCache:
+    """Content-addressed cache of report documents keyed by report type and reportDocumentId"""
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 24 * 60 * 60, max_entries: int = 5):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def _key(self, report_type: str, document_id: str) -> str:
+        """Stable file-safe key for a report document"""
+        return hashlib.sha256(f"{report_type}:{document_id}".encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        """Data and metadata file paths for a cache key"""
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.tsv.gz", f"{base}.json"
+
+    def _entries(self) -> List[Dict]:
+        """Load metadata for every cached document"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), 'r') as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Ignoring unreadable report cache entry {name}: {e}")
+        return entries
+
+    def _generated_at(self, entry: Dict) -> float:
+        """When Amazon generated an entry's report (cache time for entries written without one)"""
+        return entry.get('generated_at', entry.get('cached_at', 0))
+
+    def _is_fresh(self, entry: Dict, max_age_seconds: Optional[float] = None) -> bool:
+        """Check whether an entry's report is within the TTL (or a tighter max age)"""
+        max_age = self.ttl_seconds if max_age_seconds is None else min(max_age_seconds, self.ttl_seconds)
+        return time.time() - self._generated_at(entry) <= max_age
+
+    def open(self, report_type: str, document_id: str) -> Optional[TextIO]:
+        """Open a cached document as text, or return None on a miss or expired entry"""
+        key = self._key(report_type, document_id)
+        data_path, meta_path = self._paths(key)
+
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+            if not self._is_fresh(entry):
+                self._remove(key)
+                return None
+            stream = gzip.open(data_path, 'rt', encoding='utf-8', newline='')
+        except (OSError, ValueError):
+            return None
+
+        logger.info(f"Report cache hit for {report_type} document {document_id}")
+        return stream
+
+    def latest(self, report_type: str, marketplace_id: str, max_age_seconds: float) -> Optional[str]:
+        """Return the document ID of the newest fresh cached report of a type and marketplace"""
+        candidates = [
+            entry for entry in self._entries()
+            if entry.get('report_type') == report_type
+            and entry.get('marketplace_id') == marketplace_id
+            and self._is_fresh(entry, max_age_seconds)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=self._generated_at)['document_id']
+
+    @contextmanager
+    def writer(self, report_type: str, document_id: str, marketplace_id: str,
+               generated_at: Optional[float] = None) -> Iterator[TextIO]:
+        """Write a document into the cache, aged from generated_at (when Amazon finished the report); visible only if the block completes"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = self._key(report_type, document_id)
+        data_path, meta_path = self._paths(key)
+        temp_path = f"{data_path}.{os.getpid()}.tmp"
+
+        try:
+            with gzip.open(temp_path, 'wt', encoding='utf-8', newline='') as f:
+                yield f
+        except BaseException:
+            # Partial download or early stop by the consumer - never cache a truncated document
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        os.replace(temp_path, data_path)
+        cached_at = time.time()
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'report_type': report_type,
+                'document_id': document_id,
+                'marketplace_id': marketplace_id,
+                'cached_at': cached_at,
+                'generated_at': cached_at if generated_at is None else generated_at,
+                'size_bytes': os.path.getsize(data_path)
+            }, f)
+
+        logger.info(f"Cached {report_type} document {document_id} ({os.path.getsize(data_path)} bytes compressed)")
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries and the oldest entries beyond max_entries"""
+        entries = sorted(self._entries(), key=self._generated_at, reverse=True)
+
+        for index, entry in enumerate(entries):
+            if index >= self.max_entries or not self._is_fresh(entry):
+                self._remove(self._key(entry.get('report_type', ''), entry.get('document_id', '')))
+
+    def _remove(self, key: str):
+        """Delete a cache entry's files"""
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove report cache file {path}: {e}")
+
+def tee_lines(lines: Iterator[str], sink: io.TextIOBase) -> Iterator[str]:
+    """Yield lines unchanged while copying each one into a sink"""
+    for line in lines:
+        sink.write(line)
+        yield line
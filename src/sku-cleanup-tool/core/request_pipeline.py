@@ -0,0 +1,181 @@
+"""
+Request middleware pipeline for SKU Cleanup Tool
+Composes auth, rate limiting, circuit breaking, retry, metrics and timing once per endpoint family
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, List, Sequence
+
+import requests
+
+from .concurrency import ConcurrencyController
+from .resilience import CircuitBreaker, RateLimiter, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class APIRequest:
+    """One SP-API request travelling through the pipeline"""
+    method: str
+    url: str
+    operation: str
+    family: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    expected_errors: Sequence[int] = ()
+
+Handler = Callable[[APIRequest], Any]
+Middleware = Callable[[APIRequest, Handler], Any]
+
+def compose(middlewares: List[Middleware], handler: Handler) -> Handler:
+    """Chain middlewares (outermost first) around a handler, once"""
+    pipeline = handler
+    for middleware in reversed(middlewares):
+        pipeline = _bind(middleware, pipeline)
+
+    # Keep the layers reachable so they can be inspected or measured
+    pipeline.middlewares = list(middlewares)
+    return pipeline
+
+def _bind(middleware: Middleware, next_handler: Handler) -> Handler:
+    """Bind one middleware to the handler it wraps"""
+    def handle(request: APIRequest) -> Any:
+        return middleware(request, next_handler)
+    return handle
+
+class RequestMetrics:
+    """Thread-safe per-operation request counts, errors and latency"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, operation: str, elapsed: float, error: bool):
+        """Record one completed request"""
+        with self._lock:
+            stats = self._stats.setdefault(operation, {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the current statistics with average latency per operation"""
+        with self._lock:
+            return {
+                operation: {**stats, 'avg_seconds': stats['total_seconds'] / stats['calls']}
+                for operation, stats in self._stats.items()
+            }
+
+class MetricsMiddleware:
+    """Time every request end to end (including retries) and count failures"""
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        start = time.perf_counter()
+        error = True
+        try:
+            result = next_handler(request)
+            error = False
+            return result
+        finally:
+            self.metrics.record(request.operation, time.perf_counter() - start, error)
+
+class CircuitBreakerMiddleware:
+    """Block requests while the endpoint family's circuit breaker is open"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self._guarded = breaker(self._invoke)
+
+    @staticmethod
+    def _invoke(request: APIRequest, next_handler: Handler) -> Any:
+        return next_handler(request)
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        return self._guarded(request, next_handler)
+
+class RetryMiddleware:
+    """Retry failed attempts according to the shared retry policy"""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        return self.policy.call(next_handler, request)
+
+class ResponseMiddleware:
+    """Turn HTTP responses into JSON payloads, expected error markers or raised HTTP errors"""
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        response = next_handler(request)
+
+        # Check for expected error codes that should not raise exceptions
+        if response.status_code in request.expected_errors:
+            return {'_status_code': response.status_code, '_response_text': response.text}
+
+        response.raise_for_status()
+        return response.json()
+
+class AuthMiddleware:
+    """Attach the LWA access token to each attempt"""
+
+    def __init__(self, token_provider: Callable[[], str]):
+        self.token_provider = token_provider
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        request.headers['x-amz-access-token'] = self.token_provider()
+        return next_handler(request)
+
+class RateLimitMiddleware:
+    """Pace each attempt to the operation's token bucket, adopt live rate headers and back off on 429s"""
+
+    def __init__(self, rate_limiter: RateLimiter):
+        self.rate_limiter = rate_limiter
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        self.rate_limiter.acquire(request.operation)
+        response = next_handler(request)
+        self.rate_limiter.update_from_headers(request.operation, response.headers)
+        if response.status_code == 429:
+            self.rate_limiter.record_throttle(request.operation)
+        return response
+
+class ConcurrencyMiddleware:
+    """Hold an adaptive per-operation concurrency slot while the request is on the wire"""
+
+    def __init__(self, controller: ConcurrencyController):
+        self.controller = controller
+
+    def __call__(self, request: APIRequest, next_handler: Handler) -> Any:
+        limiter = self.controller.limiter(request.operation)
+        limiter.acquire()
+        start = time.perf_counter()
+        try:
+            response = next_handler(request)
+        except Exception:
+            limiter.release(time.perf_counter() - start, failed=True)
+            raise
+
+        limiter.release(time.perf_counter() - start, throttled=response.status_code == 429)
+        return response
+
+class HTTPTransport:
+    """Send the request over a pooled requests session"""
+
+    def __init__(self, session_provider: Callable[[], requests.Session], timeout):
+        self.session_provider = session_provider
+        self.timeout = timeout
+
+    def __call__(self, request: APIRequest) -> requests.Response:
+        return self.session_provider().request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            timeout=self.timeout,
+            **request.kwargs
+        )
@@ -1,11 +1,15 @@
 """
 API Resilience utilities for handling Amazon API failures gracefully
-Implements exponential backoff, connection pooling, and circuit breaker patterns
+Implements exponential backoff, connection pooling, rate limiting, and circuit breaker patterns
 """
+import asyncio
 import time
 import logging
+import random
 import requests
-from typing import Dict, List, Optional, Any, Callable, TypeVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Tuple, TypeVar
 from functools import wraps
 from dataclasses import dataclass, field
 from enum import Enum
@@ -34,9 +38,13 @@ class CircuitBreakerState(Enum):
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker"""
-    failure_threshold: int = 5  # Number of failures before opening circuit
+    failure_threshold: int = 5  # Failures within the window before the error rate is considered
     recovery_timeout: int = 60  # Seconds before trying half-open
     expected_exception: Exception = requests.RequestException
+    error_rate_threshold: float = 0.5  # Open when this fraction of calls in the window failed
+    window_seconds: float = 60.0  # Only calls this recent count toward opening the circuit
+    window_buckets: int = 10  # Time buckets in the ring buffer (resolution = window_seconds / window_buckets)
+    half_open_max_calls: int = 1  # Concurrent probe calls allowed while half-open
 
 @dataclass
 class RetryConfig:
@@ -47,12 +55,322 @@ class RetryConfig:
     backoff_factor: float = 2.0  # Exponential backoff multiplier
     jitter: bool = True  # Add random jitter to prevent thundering herd
 
+@dataclass
+class RateLimit:
+    """Usage plan for a single SP-API operation"""
+    rate: float  # Sustained requests per second
+    burst: int  # Maximum requests allowed in a burst
+
+# Default SP-API usage plans (rate per second, burst) from the Selling Partner API documentation.
+# Live values from the x-amzn-RateLimit-Limit response header replace these rates at runtime.
+DEFAULT_RATE_LIMITS: Dict[str, RateLimit] = {
+    'getInventorySummaries': RateLimit(rate=2.0, burst=2),
+    'getListingsItem': RateLimit(rate=5.0, burst=10),
+    'deleteListingsItem': RateLimit(rate=5.0, burst=10),
+    'searchListingsItems': RateLimit(rate=5.0, burst=5),
+    'createReport': RateLimit(rate=0.0167, burst=15),
+    'getReport': RateLimit(rate=2.0, burst=15),
+    'getReports': RateLimit(rate=0.0222, burst=10),
+    'getReportDocument': RateLimit(rate=0.0167, burst=15),
+    'createReportSchedule': RateLimit(rate=0.0222, burst=10),
+    'getReportSchedules': RateLimit(rate=0.0222, burst=10),
+    'createFeedDocument': RateLimit(rate=0.5, burst=15),
+    'createFeed': RateLimit(rate=0.0083, burst=15),
+    'getFeed': RateLimit(rate=2.0, burst=15),
+    'getFeeds': RateLimit(rate=0.0222, burst=10),
+    'getFeedDocument': RateLimit(rate=0.0222, burst=10),
+    'token': RateLimit(rate=1.0, burst=5),  # LWA has no published plan - stay conservative
+}
+
+class TokenBucket:
+    """Thread-safe token bucket that paces callers to a sustained rate with bursts"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self):
+        """Add tokens accrued since the last refill (caller must hold the lock)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def reserve(self) -> float:
+        """Reserve one token and return how long the caller must wait before using it"""
+        with self._lock:
+            self._refill()
+            # Reserve the token up front so concurrent callers queue behind each other fairly
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update_rate(self, rate: float):
+        """Change the sustained rate, keeping tokens accrued at the old rate"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def drain(self):
+        """Discard any saved-up burst so the next caller waits for a freshly accrued token"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+class RateLimiter:
+    """Per-operation token buckets shared by every thread using the SP-API"""
+
+    RATE_LIMIT_HEADER = 'x-amzn-RateLimit-Limit'
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None, store=None):
+        self.limits = dict(DEFAULT_RATE_LIMITS, **(limits or {}))
+        self.store = store  # Optional SharedBucketStore coordinating buckets across processes
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def _get_bucket(self, operation: str) -> Optional[TokenBucket]:
+        """Get or create the bucket for an operation (None if the operation has no known plan)"""
+        with self._lock:
+            bucket = self._buckets.get(operation)
+            if bucket is None and operation in self.limits:
+                limit = self.limits[operation]
+                if self.store is not None:
+                    bucket = self._buckets[operation] = self.store.bucket(operation, limit.rate, limit.burst)
+                else:
+                    bucket = self._buckets[operation] = TokenBucket(limit.rate, limit.burst)
+            return bucket
+
+    def acquire(self, operation: str) -> float:
+        """Wait for permission to send one request for the operation. Returns seconds waited."""
+        bucket = self._get_bucket(operation)
+        if bucket is None:
+            return 0.0
+
+        waited = bucket.acquire()
+        if waited > 0:
+            logger.debug(f"Rate limiter delayed {operation} request by {waited:.2f}s")
+        return waited
+
+    async def acquire_async(self, operation: str) -> float:
+        """Coroutine version of acquire that waits without blocking the event loop"""
+        bucket = self._get_bucket(operation)
+        if bucket is None:
+            return 0.0
+
+        wait = bucket.reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiter delayed {operation} request by {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def update_from_headers(self, operation: str, headers) -> None:
+        """Adopt the rate reported in the x-amzn-RateLimit-Limit response header"""
+        try:
+            rate = float(headers.get(self.RATE_LIMIT_HEADER))
+        except (TypeError, ValueError, AttributeError):
+            return
+
+        bucket = self._get_bucket(operation)
+        if bucket is None or rate <= 0 or abs(bucket.rate - rate) < 1e-9:
+            return
+
+        logger.info(f"Updating {operation} rate limit from {bucket.rate:g} to {rate:g} requests/second")
+        bucket.update_rate(rate)
+
+    def record_throttle(self, operation: str) -> None:
+        """Treat a 429 as a pacing signal: drain the operation's bucket so every caller backs off"""
+        bucket = self._get_bucket(operation)
+        if bucket is None:
+            return
+
+        logger.debug(f"{operation} was throttled - draining its token bucket")
+        bucket.drain()
+
+def classify_error(error) -> ErrorType:
+    """Classify an exception from requests or aiohttp by status code or failure mode"""
+    status_code = None
+    if hasattr(error, 'response') and error.response is not None:
+        status_code = error.response.status_code
+    elif isinstance(getattr(error, 'status', None), int):
+        status_code = error.status  # aiohttp.ClientResponseError
+
+    if status_code is not None:
+        if status_code == 429:
+            return ErrorType.RATE_LIMIT
+        elif status_code >= 500:
+            return ErrorType.SERVER_ERROR
+        elif status_code == 401 or status_code == 403:
+            return ErrorType.AUTH
+        elif status_code == 404:
+            return ErrorType.NOT_FOUND
+        elif status_code >= 400:
+            return ErrorType.CLIENT_ERROR
+
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return ErrorType.NETWORK
+
+    # Check for common network errors
+    error_str = str(error).lower()
+    if any(term in error_str for term in ['connection', 'timeout', 'network']):
+        return ErrorType.NETWORK
+
+    return ErrorType.UNKNOWN
+
+def server_retry_delay(error) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After or the x-amzn-RateLimit-Limit rate"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) if response is not None else getattr(error, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after = headers.get('Retry-After')
+    if isinstance(retry_after, str) and retry_after.strip():
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    # SP-API throttling responses report the sustained rate - one token frees up after 1/rate seconds
+    try:
+        rate = float(headers.get(RateLimiter.RATE_LIMIT_HEADER))
+    except (TypeError, ValueError):
+        return None
+    return 1.0 / rate if rate > 0 else None
+
+class RetryBudget:
+    """Run-wide cap on retries as a fraction of first attempts, so a degraded API cannot multiply our load"""
+
+    def __init__(self, ratio: float = 0.1, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries  # Floor so short runs can still ride out a blip
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+        self._lock = Lock()
+
+    def record_request(self):
+        """Count one first attempt"""
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self) -> bool:
+        """Take permission for one retry, or return False once the budget is spent"""
+        with self._lock:
+            if self.retries < self.min_retries + self.ratio * self.requests:
+                self.retries += 1
+                return True
+
+            self.denied += 1
+            if self.denied == 1:
+                logger.warning(f"Retry budget exhausted ({self.retries} retries for {self.requests} requests) - failing fast")
+            return False
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current request, retry and denied-retry counts"""
+        with self._lock:
+            return {'requests': self.requests, 'retries': self.retries, 'denied': self.denied}
+
+class RetryPolicy:
+    """The single retry layer: classifies errors, honors Retry-After and draws on a retry budget"""
+
+    # Retrying these cannot change the outcome
+    NON_RETRYABLE = frozenset({ErrorType.CLIENT_ERROR, ErrorType.AUTH, ErrorType.NOT_FOUND})
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 backoff_factor: float = 2.0, jitter: bool = True, budget: Optional[RetryBudget] = None,
+                 retry_on: Tuple[type, ...] = (requests.exceptions.RequestException,)):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.budget = budget
+        self.retry_on = retry_on
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after a failed attempt, or None to give up"""
+        if attempt >= self.max_retries:
+            return None
+
+        error_type = classify_error(error)
+        if error_type in self.NON_RETRYABLE:
+            return None
+
+        delay = server_retry_delay(error) if error_type == ErrorType.RATE_LIMIT else None
+        if delay is None:
+            delay = _backoff_delay(attempt, self.base_delay, self.max_delay, self.backoff_factor, self.jitter)
+        elif delay > self.max_delay:
+            logger.warning(f"Server asked to retry after {delay:.1f}s (max delay {self.max_delay:.1f}s) - not retrying")
+            return None
+
+        if self.budget and not self.budget.try_acquire():
+            return None
+        return delay
+
+    def _give_up(self, error: Exception, attempt: int):
+        """Log a final failure once retries were attempted"""
+        if attempt > 0:
+            logger.error(f"All {attempt + 1} attempts failed. Last error: {error}")
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Call func, retrying retryable failures"""
+        if self.budget:
+            self.budget.record_request()
+
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except self.retry_on as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self._give_up(e, attempt)
+                    raise
+
+                logger.warning(f"API call failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Coroutine version of call that waits without blocking the event loop"""
+        if self.budget:
+            self.budget.record_request()
+
+        attempt = 0
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except self.retry_on as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self._give_up(e, attempt)
+                    raise
+
+                logger.warning(f"API call failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+                attempt += 1
+
 class ResilienceMetrics:
     """Track API call metrics for circuit breaker"""
 
     def __init__(self):
         self.call_count = 0
         self.error_count = 0
+        self.throttle_count = 0  # 429 responses - pacing signals, not failures
         self.last_error_time = None
         self.circuit_state = CircuitBreakerState.CLOSED
         self.last_state_change = time.time()
@@ -69,6 +387,11 @@ class ResilienceMetrics:
             self.error_count += 1
             self.last_error_time = time.time()
 
+    def record_throttle(self):
+        """Record a throttled (429) API call"""
+        with self._lock:
+            self.throttle_count += 1
+
     def get_error_rate(self) -> float:
         """Calculate current error rate"""
         with self._lock:
@@ -90,10 +413,53 @@ class ResilienceMetrics:
         with self._lock:
             self.call_count = 0
             self.error_count = 0
+            self.throttle_count = 0
             self.last_error_time = None
             self.circuit_state = CircuitBreakerState.CLOSED
             self.last_state_change = time.time()
 
+class SlidingWindowCounter:
+    """Time-bucketed ring buffer of successes and failures over the last window_seconds"""
+
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 10):
+        self.buckets = max(1, buckets)
+        self.bucket_seconds = window_seconds / self.buckets
+        self._successes = [0] * self.buckets
+        self._failures = [0] * self.buckets
+        self._epochs = [-1] * self.buckets  # Which time bucket each slot currently holds
+
+    def _epoch(self, now: Optional[float]) -> int:
+        """Index of the time bucket containing now"""
+        return int((time.monotonic() if now is None else now) // self.bucket_seconds)
+
+    def record(self, success: bool, now: Optional[float] = None):
+        """Count one call in the current bucket, recycling the slot if it holds an expired bucket"""
+        epoch = self._epoch(now)
+        slot = epoch % self.buckets
+        if self._epochs[slot] != epoch:
+            self._epochs[slot] = epoch
+            self._successes[slot] = 0
+            self._failures[slot] = 0
+
+        if success:
+            self._successes[slot] += 1
+        else:
+            self._failures[slot] += 1
+
+    def totals(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """(successes, failures) recorded within the window"""
+        oldest = self._epoch(now) - self.buckets
+        successes = failures = 0
+        for slot in range(self.buckets):
+            if self._epochs[slot] > oldest:
+                successes += self._successes[slot]
+                failures += self._failures[slot]
+        return successes, failures
+
+    def clear(self):
+        """Forget all recorded calls"""
+        self._epochs = [-1] * self.buckets
+
 class CircuitBreaker:
     """Circuit breaker implementation for API resilience"""
 
@@ -101,132 +467,195 @@ class CircuitBreaker:
         self.name = name
         self.config = config
         self.metrics = ResilienceMetrics()
+        self.window = SlidingWindowCounter(config.window_seconds, config.window_buckets)
+        self._half_open_calls = 0
         self._lock = Lock()
 
     def __call__(self, func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            # Check if we should allow the call
-            if not self._can_proceed():
-                raise Exception(f"Circuit breaker '{self.name}' is OPEN - blocking call to prevent cascade failure")
+            # Check if we should allow the call (raises while open)
+            probe = self._acquire()
 
             try:
                 # Execute the function
                 result = func(*args, **kwargs)
-                self.metrics.record_call()
-                return result
-
             except self.config.expected_exception as e:
-                self.metrics.record_error(self._classify_error(e))
-                self._check_circuit_state()
+                self._record_failure(e, probe)
                 raise
-            except Exception as e:
+            except Exception:
                 # Non-expected exceptions don't count toward circuit breaker
-                self.metrics.record_call()
+                self._record_success(probe)
+                raise
+            except BaseException:
+                # Cancelled or interrupted - free the probe slot without judging the service
+                self._release_probe(probe)
                 raise
 
+            self._record_success(probe)
+            return result
+
         return wrapper
 
-    def _can_proceed(self) -> bool:
-        """Check if call should be allowed through circuit breaker"""
+    def _acquire(self) -> bool:
+        """Admit a call, returning True if it is a half-open probe; raise if the circuit blocks it"""
         with self._lock:
-            if self.metrics.circuit_state == CircuitBreakerState.CLOSED:
-                return True
-            elif self.metrics.circuit_state == CircuitBreakerState.OPEN:
-                if self.metrics.should_attempt_reset(self.config):
-                    # Transition to half-open for testing
-                    self.metrics.circuit_state = CircuitBreakerState.HALF_OPEN
-                    logger.info(f"Circuit breaker '{self.name}' transitioning to HALF_OPEN")
-                    return True
+            state = self.metrics.circuit_state
+            if state == CircuitBreakerState.CLOSED:
                 return False
-            else:  # HALF_OPEN
-                return True
 
-    def _check_circuit_state(self):
-        """Check if circuit breaker should change state"""
+            if state == CircuitBreakerState.OPEN:
+                if not self.metrics.should_attempt_reset(self.config):
+                    raise Exception(f"Circuit breaker '{self.name}' is OPEN - blocking call to prevent cascade failure")
+
+                # Transition to half-open for testing
+                self._set_state(CircuitBreakerState.HALF_OPEN)
+                self._half_open_calls = 0
+                logger.info(f"Circuit breaker '{self.name}' transitioning to HALF_OPEN")
+
+            # HALF_OPEN - only a limited number of probes at a time
+            if self._half_open_calls >= self.config.half_open_max_calls:
+                raise Exception(f"Circuit breaker '{self.name}' is HALF_OPEN - blocking call while recovery is probed")
+            self._half_open_calls += 1
+            return True
+
+    def _set_state(self, state: CircuitBreakerState):
+        """Change state (caller must hold the lock)"""
+        self.metrics.circuit_state = state
+        self.metrics.last_state_change = time.time()
+
+    def _release_probe(self, probe: bool):
+        """Free a half-open probe slot"""
+        if probe:
+            with self._lock:
+                self._half_open_calls -= 1
+
+    def _record_success(self, probe: bool):
+        """Count a successful call, closing the circuit after a successful probe"""
+        self.metrics.record_call()
+        with self._lock:
+            self.window.record(True)
+            if probe:
+                self._half_open_calls -= 1
+                if self.metrics.circuit_state == CircuitBreakerState.HALF_OPEN:
+                    self._set_state(CircuitBreakerState.CLOSED)
+                    self.window.clear()
+                    logger.info(f"Circuit breaker '{self.name}' CLOSED after successful recovery probe")
+
+    def _record_failure(self, error: Exception, probe: bool):
+        """Count a failed call and open the circuit if recent failures cross the thresholds"""
+        error_type = self._classify_error(error)
+        if error_type == ErrorType.RATE_LIMIT:
+            # Throttling means the service is healthy but we are too fast - the rate limiter handles it
+            self.metrics.record_throttle()
+            self._release_probe(probe)
+            return
+
+        self.metrics.record_error(error_type)
         with self._lock:
-            error_rate = self.metrics.get_error_rate()
+            self.window.record(False)
+            if probe:
+                self._half_open_calls -= 1
 
             if self.metrics.circuit_state == CircuitBreakerState.HALF_OPEN:
                 # In half-open, single error sends us back to open
-                if self.metrics.error_count > 0:
-                    self.metrics.circuit_state = CircuitBreakerState.OPEN
-                    logger.warning(f"Circuit breaker '{self.name}' back to OPEN after error in half-open state")
-            elif error_rate >= 0.5:  # 50% error rate threshold
-                self.metrics.circuit_state = CircuitBreakerState.OPEN
-                logger.warning(f"Circuit breaker '{self.name}' opened due to high error rate: {error_rate:.2%}")
+                self._set_state(CircuitBreakerState.OPEN)
+                logger.warning(f"Circuit breaker '{self.name}' back to OPEN after error in half-open state")
+            elif self.metrics.circuit_state == CircuitBreakerState.CLOSED:
+                successes, failures = self.window.totals()
+                error_rate = failures / (successes + failures)
+                if failures >= self.config.failure_threshold and error_rate >= self.config.error_rate_threshold:
+                    self._set_state(CircuitBreakerState.OPEN)
+                    logger.warning(f"Circuit breaker '{self.name}' opened due to high error rate: "
+                                   f"{error_rate:.2%} of {successes + failures} calls in the last "
+                                   f"{self.config.window_seconds:g}s")
 
     def _classify_error(self, error) -> ErrorType:
         """Classify error type for appropriate handling"""
-        if hasattr(error, 'response') and error.response is not None:
-            status_code = error.response.status_code
-            if status_code == 429:
-                return ErrorType.RATE_LIMIT
-            elif status_code >= 500:
-                return ErrorType.SERVER_ERROR
-            elif status_code == 401 or status_code == 403:
-                return ErrorType.AUTH
-            elif status_code == 404:
-                return ErrorType.NOT_FOUND
-            elif status_code >= 400:
-                return ErrorType.CLIENT_ERROR
-
-        # Check for common network errors
-        error_str = str(error).lower()
-        if any(term in error_str for term in ['connection', 'timeout', 'network']):
-            return ErrorType.NETWORK
-
-        return ErrorType.UNKNOWN
+        return classify_error(error)
+
+class AsyncCircuitBreaker(CircuitBreaker):
+    """Circuit breaker for coroutine functions, sharing the synchronous state machine"""
+
+    def __call__(self, func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            # Check if we should allow the call (raises while open)
+            probe = self._acquire()
+
+            try:
+                result = await func(*args, **kwargs)
+            except self.config.expected_exception as e:
+                self._record_failure(e, probe)
+                raise
+            except Exception:
+                # Non-expected exceptions don't count toward circuit breaker
+                self._record_success(probe)
+                raise
+            except BaseException:
+                # Cancelled or interrupted - free the probe slot without judging the service
+                self._release_probe(probe)
+                raise
+
+            self._record_success(probe)
+            return result
+
+        return wrapper
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float, backoff_factor: float, jitter: bool) -> float:
+    """Calculate the retry delay for an attempt with optional jitter"""
+    delay = min(base_delay * (backoff_factor ** attempt), max_delay)
+
+    # Add jitter to prevent thundering herd
+    if jitter:
+        delay *= (0.5 + random.random() * 0.5)  # 50-100% of calculated delay
+
+    return delay
 
 def exponential_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
     max_delay: float = 60.0,
     backoff_factor: float = 2.0,
-    jitter: bool = True
+    jitter: bool = True,
+    budget: Optional[RetryBudget] = None
 ):
     """Decorator for exponential backoff retry strategy"""
+    policy = RetryPolicy(max_retries, base_delay, max_delay, backoff_factor, jitter, budget)
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            last_exception = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-
-                except requests.exceptions.RequestException as e:
-                    last_exception = e
+            return policy.call(func, *args, **kwargs)
 
-                    # Don't retry on the last attempt
-                    if attempt == max_retries:
-                        break
-
-                    # Calculate delay with exponential backoff
-                    delay = min(base_delay * (backoff_factor ** attempt), max_delay)
-
-                    # Add jitter to prevent thundering herd
-                    if jitter:
-                        import random
-                        delay *= (0.5 + random.random() * 0.5)  # 50-100% of calculated delay
-
-                    logger.warning(f"API call failed (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                    logger.info(f"Retrying in {delay:.1f} seconds...")
+        return wrapper
+    return decorator
 
-                    time.sleep(delay)
+def async_exponential_backoff(
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    backoff_factor: float = 2.0,
+    jitter: bool = True,
+    retry_on: Tuple[type, ...] = (Exception,),
+    budget: Optional[RetryBudget] = None
+):
+    """Decorator for exponential backoff retries of coroutine functions"""
+    policy = RetryPolicy(max_retries, base_delay, max_delay, backoff_factor, jitter, budget, retry_on)
 
-            # If we get here, all retries failed
-            logger.error(f"All {max_retries + 1} attempts failed. Last error: {last_exception}")
-            raise last_exception
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            return await policy.call_async(func, *args, **kwargs)
 
         return wrapper
     return decorator
 
-def create_session_with_pool(max_connections: int = 10, max_retries: int = 3) -> requests.Session:
+def create_session_with_pool(max_connections: int = 10, max_retries: int = 0) -> requests.Session:
     """Create a requests session with connection pooling configured"""
     session = requests.Session()
 
-    # Configure connection pooling
+    # Configure connection pooling; retries default to 0 because RetryPolicy is the only retry layer
     adapter = requests.adapters.HTTPAdapter(
         max_retries=max_retries,
         pool_connections=max_connections,
@@ -248,3 +677,31 @@ def get_api_session() -> requests.Session:
     if _api_session is None:
         _api_session = create_session_with_pool()
     return _api_session
+
+# Global rate limiters shared by all AmazonAPI instances and threads (one per shared state file)
+_rate_limiters: Dict[Optional[str], RateLimiter] = {}
+_rate_limiter_lock = Lock()
+
+# Global retry budget shared by every client for the whole run
+_retry_budget = None
+_retry_budget_lock = Lock()
+
+def get_retry_budget(ratio: float = 0.1, min_retries: int = 10) -> RetryBudget:
+    """Get or create the run-wide retry budget (settings apply on first creation)"""
+    global _retry_budget
+    with _retry_budget_lock:
+        if _retry_budget is None:
+            _retry_budget = RetryBudget(ratio, min_retries)
+    return _retry_budget
+
+def get_rate_limiter(shared_state_path: Optional[str] = None) -> RateLimiter:
+    """Get or create the global per-operation rate limiter, optionally coordinated across processes"""
+    with _rate_limiter_lock:
+        limiter = _rate_limiters.get(shared_state_path)
+        if limiter is None:
+            store = None
+            if shared_state_path:
+                from .shared_rate_limiter import SharedBucketStore
+                store = SharedBucketStore(shared_state_path)
+            limiter = _rate_limiters[shared_state_path] = RateLimiter(store=store)
+    return limiter
@@ -0,0 +1,146 @@
+"""
+Cross-process rate limit state for SKU Cleanup Tool
+SQLite-backed token buckets shared by every process using the same seller credentials
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .resilience import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+class SharedBucketStore:
+    """SQLite state file holding one token bucket row per SP-API operation"""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the state file once per process (caller must hold the lock)"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Autocommit mode - transactions are opened explicitly with BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            # Bucket state is disposable, so favour speed over durability
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'operation TEXT PRIMARY KEY, rate REAL NOT NULL, capacity REAL NOT NULL, '
+                'tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._connection = connection
+        return self._connection
+
+    def bucket(self, operation: str, rate: float, burst: int) -> 'SharedTokenBucket':
+        """Token bucket for an operation backed by this store"""
+        return SharedTokenBucket(self, operation, rate, burst)
+
+    def update(self, operation: str, rate: float, capacity: float, change) -> float:
+        """Refill a bucket and apply change(tokens, rate) -> (tokens, rate) atomically; returns the refilled tokens"""
+        with self._lock:
+            connection = self._connect()
+            # BEGIN IMMEDIATE takes the database write lock, serialising every process on this seller account
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute(
+                    'SELECT rate, capacity, tokens, updated FROM buckets WHERE operation = ?', (operation,)
+                ).fetchone()
+                now = time.time()
+                if row is None:
+                    tokens = float(capacity)
+                else:
+                    rate, capacity, tokens, updated = row
+                    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+
+                new_tokens, new_rate = change(tokens, rate)
+                connection.execute(
+                    'INSERT OR REPLACE INTO buckets (operation, rate, capacity, tokens, updated) VALUES (?, ?, ?, ?, ?)',
+                    (operation, new_rate, capacity, new_tokens, now)
+                )
+                connection.execute('COMMIT')
+                return tokens
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        """Close the state file"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in a SharedBucketStore, with the same interface as TokenBucket"""
+
+    def __init__(self, store: SharedBucketStore, operation: str, rate: float, burst: int):
+        self.store = store
+        self.operation = operation
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._fallback: Optional[TokenBucket] = None  # Process-local bucket if the state file is unusable
+
+    def _local(self, error: Exception) -> TokenBucket:
+        """Switch to a process-local bucket after a state file error"""
+        if self._fallback is None:
+            logger.warning(f"Shared rate limit state {self.store.path} unavailable for {self.operation}, "
+                           f"pacing this process only: {error}")
+            self._fallback = TokenBucket(self.rate, self.capacity)
+        return self._fallback
+
+    def reserve(self) -> float:
+        """Reserve one token and return how long the caller must wait before using it"""
+        if self._fallback is not None:
+            return self._fallback.reserve()
+
+        def take(tokens: float, rate: float):
+            # Another process may have adopted a newer rate from the response headers
+            self.rate = rate
+            return tokens - 1, rate
+
+        try:
+            tokens = self.store.update(self.operation, self.rate, self.capacity, take) - 1
+        except sqlite3.Error as e:
+            return self._local(e).reserve()
+        return -tokens / self.rate if tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update_rate(self, rate: float):
+        """Change the sustained rate for every process, keeping tokens accrued at the old rate"""
+        self.rate = rate
+        if self._fallback is not None:
+            self._fallback.update_rate(rate)
+            return
+
+        try:
+            self.store.update(self.operation, rate, self.capacity, lambda tokens, _: (tokens, rate))
+        except sqlite3.Error as e:
+            self._local(e).update_rate(rate)
+
+    def drain(self):
+        """Discard any saved-up burst so the next caller in any process waits for a fresh token"""
+        if self._fallback is not None:
+            self._fallback.drain()
+            return
+
+        try:
+            self.store.update(self.operation, self.rate, self.capacity, lambda tokens, rate: (min(tokens, 0.0), rate))
+        except sqlite3.Error as e:
+            self._local(e).drain()
@@ -0,0 +1,228 @@
+"""
+Columnar SKU storage for SKU Cleanup Tool
+Holds the catalog as one list per field with interned strings instead of one dict per SKU
+"""
+import sys
+from collections.abc import MutableMapping, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+# Report fields the cleanup decision logic reads
+SKU_FIELDS = ('sku', 'asin', 'created_date', 'fulfillment_channel', 'quantity')
+
+# Fields DataProcessor sets while deciding deletion eligibility
+RESULT_FIELDS = ('age_days', 'is_old_enough', 'fba_inventory_check', 'listing_inventory_check', 'is_eligible_for_deletion')
+
+FIELDS = SKU_FIELDS + RESULT_FIELDS
+
+# Text columns whose values repeat across the catalog, so rows share one string object
+INTERNED_FIELDS = frozenset(('created_date', 'fulfillment_channel'))
+
+class _Missing:
+    """Marker for a field a row does not have"""
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+MISSING = _Missing()
+
+# Loads the fields a table does not keep, e.g. item names and descriptions, for a set of SKUs
+DetailLoader = Callable[[Set[str]], Dict[str, Dict]]
+
+class SkuRow(MutableMapping):
+    """Dict-like view of one SkuTable row; reads and writes go straight to the table's columns"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'SkuTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, field: str):
+        value = self._table._get(self._index, field)
+        if value is MISSING:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field: str, value):
+        self._table._set(self._index, field, value)
+
+    def __delitem__(self, field: str):
+        if field not in self:
+            raise KeyError(field)
+        self._table._set(self._index, field, MISSING)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table._keys(self._index))
+
+    def __len__(self) -> int:
+        return len(self._table._keys(self._index))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def copy(self) -> Dict:
+        """Plain dict of the row's fields"""
+        return dict(self)
+
+    def details(self) -> Dict:
+        """Full report record for this row, loading the fields the table does not keep"""
+        return self._table.details([self._index]).get(self['sku'], dict(self))
+
+class SkuTable(Sequence):
+    """SKU records stored column by column; indexing yields SkuRow views, slicing yields sub-tables"""
+
+    def __init__(self, detail_loader: Optional[DetailLoader] = None, keep_details: bool = True):
+        self.detail_loader = detail_loader
+        # Fields outside FIELDS are kept per row only when they cannot be reloaded on demand
+        self.keep_details = keep_details
+        self._size = 0
+        self._columns: Dict[str, List] = {}  # Created on first value, so unused fields cost nothing
+        self._extras: Optional[List[Optional[Dict]]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], detail_loader: Optional[DetailLoader] = None,
+                     keep_details: bool = True) -> 'SkuTable':
+        """Build a table from dict-like records, e.g. parsed report rows"""
+        table = cls(detail_loader, keep_details)
+        table.extend(records)
+        return table
+
+    @classmethod
+    def coerce(cls, skus: Iterable[Dict]) -> 'SkuTable':
+        """Return skus unchanged if it is already a table, otherwise build one from its records"""
+        return skus if isinstance(skus, SkuTable) else cls.from_records(skus)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(self._size)[index])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('SkuTable index out of range')
+        return SkuRow(self, index)
+
+    def __iter__(self) -> Iterator[SkuRow]:
+        return (SkuRow(self, index) for index in range(self._size))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (SkuTable, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(row == record for row, record in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SkuTable({self._size} SKUs, columns={list(self._columns)})"
+
+    def append(self, record: Dict):
+        """Add one record, keeping FIELDS as columns and other fields only when keep_details is set"""
+        index = self._size
+        self._size += 1
+
+        for field, column in self._columns.items():
+            column.append(self._store_value(field, record.get(field, MISSING)))
+        for field in FIELDS:
+            if field not in self._columns and record.get(field, MISSING) is not MISSING:
+                self._set(index, field, record[field])
+
+        if self._extras is not None:
+            self._extras.append(None)
+        if self.keep_details:
+            extras = {key: value for key, value in record.items() if key not in FIELDS}
+            if extras:
+                self._set_extras(index, extras)
+
+    def extend(self, records: Iterable[Dict]):
+        """Add many records; another SkuTable is appended column by column (its extra fields only when keep_details is set)"""
+        if not isinstance(records, SkuTable):
+            for record in records:
+                self.append(record)
+            return
+
+        start = self._size
+        self._size += len(records)
+        for field in set(self._columns) | set(records._columns):
+            column = self._columns.setdefault(field, [MISSING] * start)
+            column.extend(records._columns.get(field) or [MISSING] * len(records))
+        if self.keep_details and records._extras is not None or self._extras is not None:
+            if self._extras is None:
+                self._extras = [None] * start
+            self._extras.extend(records._extras if self.keep_details and records._extras else [None] * len(records))
+
+    def take(self, indices: Iterable[int]) -> 'SkuTable':
+        """New table holding the given rows in the given order (values are shared, not copied)"""
+        indices = list(indices)
+        table = SkuTable(self.detail_loader, self.keep_details)
+        table._size = len(indices)
+        table._columns = {field: [column[i] for i in indices] for field, column in self._columns.items()}
+        if self._extras is not None:
+            table._extras = [self._extras[i] for i in indices]
+        return table
+
+    def column(self, field: str, default=None) -> List:
+        """All values of one field, with default where a row does not have it"""
+        column = self._columns.get(field)
+        if column is None:
+            return [default] * self._size
+        return [default if value is MISSING else value for value in column]
+
+    def set_column(self, field: str, values: Iterable):
+        """Replace every value of one field; MISSING leaves a row without the field"""
+        column = [self._store_value(field, value) for value in values]
+        if len(column) != self._size:
+            raise ValueError(f"Column '{field}' has {len(column)} values for {self._size} rows")
+        self._columns[field] = column
+
+    def details(self, indices: Iterable[int]) -> Dict[str, Dict]:
+        """Full records for the given rows keyed by SKU, via the detail loader when the table has one"""
+        rows = [SkuRow(self, index) for index in indices]
+        records = {row['sku']: dict(row) for row in rows if row.get('sku')}
+        if self.detail_loader and records:
+            for sku, loaded in self.detail_loader(set(records)).items():
+                records[sku] = {**loaded, **records[sku]}
+        return records
+
+    def _store_value(self, field: str, value):
+        """Intern repeated text values so rows share one string object"""
+        if field in INTERNED_FIELDS and type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def _get(self, index: int, field: str):
+        column = self._columns.get(field)
+        if column is not None:
+            return column[index]
+        if self._extras is not None and self._extras[index]:
+            return self._extras[index].get(field, MISSING)
+        return MISSING
+
+    def _set(self, index: int, field: str, value):
+        if field not in FIELDS:
+            extras = dict(self._extras[index] or {}) if self._extras is not None else {}
+            if value is MISSING:
+                extras.pop(field, None)
+            else:
+                extras[field] = value
+            self._set_extras(index, extras or None)
+            return
+
+        column = self._columns.get(field)
+        if column is None:
+            if value is MISSING:
+                return
+            column = self._columns[field] = [MISSING] * self._size
+        column[index] = self._store_value(field, value)
+
+    def _set_extras(self, index: int, extras: Optional[Dict]):
+        if self._extras is None:
+            self._extras = [None] * self._size
+        self._extras[index] = extras
+
+    def _keys(self, index: int) -> List[str]:
+        keys = [field for field, column in self._columns.items() if column[index] is not MISSING]
+        if self._extras is not None and self._extras[index]:
+            keys.extend(self._extras[index])
+        return keys
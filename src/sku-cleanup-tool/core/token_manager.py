@@ -0,0 +1,181 @@
+"""
+LWA access token management for SKU Cleanup Tool
+Single-flight refresh, proactive background refresh and a private on-disk token cache
+"""
+import hashlib
+import json
+import logging
+import os
+import stat
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Background refresh runs this long before callers would start refreshing on demand
+BACKGROUND_REFRESH_LEAD_SECONDS = 60
+
+def token_cache_key(client_id: str, refresh_token: str) -> str:
+    """Key cached tokens by LWA application and grant without storing the refresh token itself"""
+    return hashlib.sha256(f"{client_id}:{refresh_token}".encode('utf-8')).hexdigest()[:32]
+
+class TokenCache:
+    """Owner-only (0600) JSON file of access tokens shared by runs and worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (access_token, expires_at) for a key, or None if nothing is cached"""
+        try:
+            mode = os.stat(self.path).st_mode
+            if mode & (stat.S_IRWXG | stat.S_IRWXO):
+                logger.warning(f"Token cache {self.path} was readable by other users - restricting to owner")
+                os.chmod(self.path, 0o600)
+
+            with open(self.path, 'r') as f:
+                entry = json.load(f).get(key)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug(f"Ignoring unreadable token cache {self.path}: {e}")
+            return None
+
+        if not entry or 'access_token' not in entry:
+            return None
+        return entry['access_token'], float(entry.get('expires_at', 0))
+
+    def save(self, key: str, access_token: str, expires_at: float):
+        """Store a token atomically, keeping other keys' entries"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            try:
+                with open(self.path, 'r') as f:
+                    entries = json.load(f)
+                if not isinstance(entries, dict):
+                    entries = {}
+            except (OSError, ValueError):
+                entries = {}
+
+            # Drop tokens that have already expired so the file does not grow
+            now = time.time()
+            entries = {k: v for k, v in entries.items() if isinstance(v, dict) and v.get('expires_at', 0) > now}
+            entries[key] = {'access_token': access_token, 'expires_at': expires_at}
+
+            # Create the temp file owner-only from the start so the token is never world-readable
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist access token to {self.path}: {e}")
+
+class AccessTokenManager:
+    """Thread-safe access token holder that refreshes once for all concurrent callers"""
+
+    def __init__(self, fetch_token: Callable[[], Dict], cache: Optional[TokenCache] = None, cache_key: str = '',
+                 refresh_margin_seconds: float = 300, background_refresh: bool = True):
+        self._fetch_token = fetch_token
+        self.cache = cache
+        self.cache_key = cache_key
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.background_refresh = background_refresh
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._token: Tuple[Optional[str], float] = (None, 0.0)  # (access_token, expires_at) swapped as one value
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Current access token, if any"""
+        return self._token[0]
+
+    @property
+    def expires_at(self) -> float:
+        """Epoch time the current token expires at"""
+        return self._token[1]
+
+    def _is_usable(self, token: Tuple[Optional[str], float]) -> bool:
+        """Check whether a token is still outside the refresh margin"""
+        access_token, expires_at = token
+        return bool(access_token) and time.time() < expires_at - self.refresh_margin_seconds
+
+    def usable_token(self) -> Optional[str]:
+        """Current access token if it is still outside the refresh margin, without refreshing or locking"""
+        token = self._token
+        return token[0] if self._is_usable(token) else None
+
+    def get_token(self) -> str:
+        """Return a valid access token, refreshing it at most once across threads"""
+        token = self._token
+        if self._is_usable(token):
+            return token[0]
+
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._is_usable(self._token):
+                return self._token[0]
+
+            if not self._adopt_cached():
+                self._refresh()
+            return self._token[0]
+
+    def _adopt_cached(self) -> bool:
+        """Use a token persisted by a previous run or another process if it is still usable"""
+        if not self.cache:
+            return False
+
+        cached = self.cache.load(self.cache_key)
+        if not cached or not self._is_usable(cached) or cached[1] <= self._token[1]:
+            return False
+
+        logger.info("Using cached access token")
+        self._token = cached
+        self._schedule_refresh()
+        return True
+
+    def _refresh(self):
+        """Fetch a new token from LWA (caller holds the lock)"""
+        token_data = self._fetch_token()
+        self._token = (token_data['access_token'], time.time() + token_data['expires_in'])
+
+        if self.cache:
+            self.cache.save(self.cache_key, *self._token)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        """Refresh in the background shortly before callers would have to wait for it"""
+        if not self.background_refresh:
+            return
+
+        if self._timer:
+            self._timer.cancel()
+
+        delay = self._token[1] - self.refresh_margin_seconds - BACKGROUND_REFRESH_LEAD_SECONDS - time.time()
+        if delay <= 0:
+            # Token too short-lived to refresh ahead of time - leave it to on-demand refresh
+            return
+
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        """Timer callback - failures are left to the next on-demand refresh"""
+        try:
+            with self._lock:
+                if not self._adopt_cached():
+                    logger.info("Proactively refreshing access token...")
+                    self._refresh()
+        except Exception as e:
+            logger.warning(f"Background access token refresh failed, will refresh on demand: {e}")
+
+    def close(self):
+        """Stop the background refresh timer"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
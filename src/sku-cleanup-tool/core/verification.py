@@ -0,0 +1,90 @@
+"""
+Post-deletion verification for SKU Cleanup Tool
+Checks only the deleted SKUs instead of pulling a second full listings report
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+
+logger = logging.getLogger(__name__)
+
+class DeletionVerifier:
+    """Confirm deleted SKUs are gone using getListingsItem or searchListingsItems"""
+
+    def __init__(self, amazon_api, max_workers: int = 1, search_threshold: int = 5):
+        self.amazon_api = amazon_api
+        self.max_workers = max(1, max_workers)
+        self.search_threshold = search_threshold
+
+    def verify(self, deleted_skus: List[str]) -> List[str]:
+        """Return the deleted SKUs confirmed gone from Amazon listings, in input order"""
+        if not deleted_skus:
+            return []
+
+        if len(deleted_skus) > self.search_threshold:
+            still_listed = self._search_remaining(deleted_skus)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sku-verify') as executor:
+                exists = list(executor.map(self._listing_exists, deleted_skus))
+            still_listed = {sku for sku, listed in zip(deleted_skus, exists) if listed}
+
+        return self._match(deleted_skus, still_listed)
+
+    async def verify_async(self, deleted_skus: List[str]) -> List[str]:
+        """Coroutine version of verify for use with AsyncAmazonAPI"""
+        if not deleted_skus:
+            return []
+
+        if len(deleted_skus) > self.search_threshold:
+            try:
+                still_listed = await self.amazon_api.search_listings_items(deleted_skus)
+            except Exception as e:
+                logger.error(f"Could not search listings to verify deletions: {e}")
+                still_listed = set()
+        else:
+            semaphore = asyncio.Semaphore(self.max_workers)
+
+            async def exists(sku: str) -> bool:
+                async with semaphore:
+                    try:
+                        return await self.amazon_api.listing_exists(sku)
+                    except Exception as e:
+                        return self._log_check_error(sku, e)
+
+            results = await asyncio.gather(*(exists(sku) for sku in deleted_skus))
+            still_listed = {sku for sku, listed in zip(deleted_skus, results) if listed}
+
+        return self._match(deleted_skus, still_listed)
+
+    def _listing_exists(self, sku: str) -> bool:
+        """Check one SKU, treating lookup failures as not listed"""
+        try:
+            return self.amazon_api.listing_exists(sku)
+        except Exception as e:
+            return self._log_check_error(sku, e)
+
+    def _search_remaining(self, deleted_skus: List[str]) -> Set[str]:
+        """Find deleted SKUs that still have listings with batched searches"""
+        try:
+            return self.amazon_api.search_listings_items(deleted_skus)
+        except Exception as e:
+            logger.error(f"Could not search listings to verify deletions: {e}")
+            return set()
+
+    def _log_check_error(self, sku: str, error: Exception) -> bool:
+        """Log a failed check - assume the deletion worked if Amazon accepted it"""
+        logger.error(f"Could not verify deletion of {sku}: {error}")
+        return False
+
+    def _match(self, deleted_skus: List[str], still_listed: Set[str]) -> List[str]:
+        """Split deleted SKUs into verified and still-listed, logging each"""
+        verified_deleted = []
+        for sku in deleted_skus:
+            if sku not in still_listed:
+                verified_deleted.append(sku)
+                logger.info(f"✅ Verified deletion: {sku} no longer in Amazon listings")
+            else:
+                logger.warning(f"⚠️ Deletion not verified: {sku} still appears in Amazon listings")
+
+        return verified_deleted
@@ -3,24 +3,41 @@
 Simple SKU Cleanup Tool - Main Entry Point
 Automated cleanup of old Amazon FBA SKUs that aren't selling
 """
+import asyncio
 import logging
 import sys
 import time
 import os
-from datetime import datetime
-from typing import Dict, List, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set
 
 try:
     # Try relative imports (when run as part of package)
     from .core.config import config
-    from .core.amazon_api import AmazonAPI
+    from .core.amazon_api import AmazonAPI, FBA_INVENTORY_REPORT_TYPE, MERCHANT_LISTINGS_REPORT_TYPE
+    from .core.async_amazon_api import AsyncAmazonAPI
     from .core.data_processor import DataProcessor
+    from .core.deletion import DeletionExecutor, FeedDeletionExecutor
+    from .core.verification import DeletionVerifier
+    from .core.inventory_snapshot import InventorySnapshotStore
+    from .core.request_pipeline import RequestMetrics
+    from .core.concurrency import ConcurrencyController
+    from .core.sku_table import SkuTable
+    from .core.pipeline import Stage, StreamingPipeline
     from .lib.report_generator import ReportGenerator
 except ImportError:
     # Fall back to absolute imports (when run as script)
     from core.config import config
-    from core.amazon_api import AmazonAPI
+    from core.amazon_api import AmazonAPI, FBA_INVENTORY_REPORT_TYPE, MERCHANT_LISTINGS_REPORT_TYPE
+    from core.async_amazon_api import AsyncAmazonAPI
     from core.data_processor import DataProcessor
+    from core.deletion import DeletionExecutor, FeedDeletionExecutor
+    from core.verification import DeletionVerifier
+    from core.inventory_snapshot import InventorySnapshotStore
+    from core.request_pipeline import RequestMetrics
+    from core.concurrency import ConcurrencyController
+    from core.sku_table import SkuTable
+    from core.pipeline import Stage, StreamingPipeline
     from lib.report_generator import ReportGenerator
 
 # Configure logging - use absolute paths to ensure correct location
@@ -45,9 +62,14 @@ class SKUCleanupTool:
 
     def __init__(self):
         self.amazon_api = AmazonAPI(config.credentials)
-        self.data_processor = DataProcessor(amazon_api=self.amazon_api)  # Pass API for FBA checks
+        self.data_processor = DataProcessor(
+            amazon_api=self.amazon_api,  # Pass API for FBA checks
+            max_workers=self._worker_count(config.settings.resilience.max_workers),
+            age_threshold_days=config.settings.age_threshold_days
+        )
         self.report_generator = ReportGenerator()
         self.processed_skus_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'processed_skus.txt')
+        self.fba_snapshot_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'fba_inventory_snapshot.json')
 
     def run_cleanup(self) -> Dict[str, Any]:
         """
@@ -57,34 +79,24 @@ class SKUCleanupTool:
             Dict containing cleanup results and statistics
         """
         logger.info("Starting SKU cleanup process...")
-
-        # Show test mode status
-        if config.settings.test_mode:
-            logger.info("🧪 TEST MODE ENABLED")
-            logger.info(f"   Sample size: {config.settings.test_sample_size}")
-            if config.settings.test_seed_skus:
-                logger.info(f"   Test seed SKUs: {config.settings.test_seed_skus}")
-
-            # Safety check: In test mode, warn about dry run setting
-            if not config.settings.dry_run:
-                logger.warning("🔒 SAFETY WARNING: TEST_MODE enabled but DRY_RUN=false detected!")
-                logger.warning("🔒 This will perform ACTUAL DELETIONS on sample SKUs")
-                logger.warning("🔒 Are you sure you want to delete SKUs in test mode?")
-                logger.warning("🔒 Consider using TEST_MODE=true with DRY_RUN=true for safe testing")
-                # Don't force dry_run - let user make explicit choice
-        else:
-            logger.info("🔄 PRODUCTION MODE - Processing all SKUs")
+        self._log_run_mode()
+        self._ensure_report_schedules()
 
         try:
             # Step 1: Get all SKUs (or sample in test mode)
             logger.info("Step 1: Retrieving merchant listings...")
-            raw_skus = self.amazon_api.get_merchant_listings()
-            logger.info(f"Retrieved {len(raw_skus)} SKUs from Amazon")
+            if config.settings.fba_inventory_mode == 'report':
+                # Generate the FBA inventory report alongside merchant listings and join the two locally
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix='fba-report') as executor:
+                    inventory_report = executor.submit(self._load_fba_inventory_report)
+                    raw_skus = self._prepare_raw_skus(self.amazon_api.get_merchant_listings())
+                    inventory_report.result()
+            else:
+                raw_skus = self._prepare_raw_skus(self.amazon_api.get_merchant_listings())
 
-            # Apply test mode filtering if enabled
-            if config.settings.test_mode:
-                raw_skus = self._apply_test_mode_filter(raw_skus)
-                logger.info(f"Test mode: Using {len(raw_skus)} SKUs for testing")
+            # Load the full-catalog FBA inventory snapshot once instead of per-SKU lookups
+            if config.settings.fba_inventory_mode in ('snapshot', 'incremental'):
+                self._load_fba_inventory_snapshot()
 
             # Step 2: Process and filter SKUs (with batching for performance)
             logger.info("Step 2: Processing SKU data...")
@@ -99,69 +111,19 @@ class SKUCleanupTool:
 
             # Step 3: Identify SKUs for deletion (FBA verification already done during processing)
             logger.info("Step 3: Identifying SKUs for deletion...")
+            new_skus_to_delete, skus_to_reverify = self._select_deletion_candidates(raw_skus, processed_skus)
 
-            # Load previously processed SKUs with timestamps
-            processed_skus_with_timestamps = self._load_processed_skus_with_timestamps()
-            logger.info(f"Found {len(processed_skus_with_timestamps)} previously processed SKUs")
-
-            # Get current SKUs from Amazon listings
-            current_sku_ids = {sku.get('sku') for sku in raw_skus if sku.get('sku')}
-
-            # Clean up processed SKUs file - remove SKUs no longer in Amazon listings or expired cooldowns
-            import time
-            current_time = int(time.time())
-            skus_to_remove = []
-            active_processed_skus = set()
-
-            for sku, timestamp in processed_skus_with_timestamps.items():
-                if sku not in current_sku_ids:
-                    # SKU no longer in Amazon listings - can be removed
-                    skus_to_remove.append(sku)
-                elif timestamp <= current_time:
-                    # Cooldown expired - can retry deletion
-                    active_processed_skus.add(sku)
-                # If timestamp > current_time, keep in cooldown (don't add to active_processed_skus)
-
-            if skus_to_remove:
-                logger.info(f"Cleaning up {len(skus_to_remove)} obsolete processed SKUs (no longer in Amazon listings)")
-                for sku in skus_to_remove:
-                    del processed_skus_with_timestamps[sku]
-                self._save_processed_skus_with_timestamps(processed_skus_with_timestamps)
-                logger.info(f"Processed SKUs file updated - now contains {len(processed_skus_with_timestamps)} entries")
-
-            logger.info(f"Active processed SKUs (cooldown expired): {len(active_processed_skus)}")
-
-            # Get SKUs that are in cooldown (have future timestamps)
-            import time
-            current_time = int(time.time())
-            cooldown_skus = {sku for sku, timestamp in processed_skus_with_timestamps.items() if timestamp > current_time}
-
-            # Get new SKUs that haven't been processed before and passed FBA verification
-            new_skus_to_delete = [sku for sku in processed_skus if sku.get('is_eligible_for_deletion', False) and sku.get('sku') not in cooldown_skus]
-            logger.info(f"Found {len(new_skus_to_delete)} NEW SKUs eligible for deletion (FBA-verified)")
-
-            # Check previously processed SKUs that are still in current listings and re-verify FBA status
-            previously_processed_still_eligible = []
-            for sku in processed_skus:
-                sku_id = sku.get('sku')
-                if sku_id in active_processed_skus and sku_id in processed_skus_with_timestamps:
-                    # This SKU was processed before but is still in current listings and cooldown expired
-                    # We need to re-verify FBA inventory status before considering for deletion
-                    logger.info(f"Re-verifying FBA status for previously processed SKU: {sku_id}")
-
-                    # Re-process this SKU to get current FBA status
-                    reprocessed_skus = self.data_processor.process_sku_data([sku])
-                    if reprocessed_skus and len(reprocessed_skus) > 0:
-                        rechecked_sku = reprocessed_skus[0]
-                        if rechecked_sku.get('is_eligible_for_deletion', False):
-                            logger.info(f"SKU {sku_id} passed re-verification and is still eligible for deletion")
-                            previously_processed_still_eligible.append(rechecked_sku)
-                        else:
-                            logger.info(f"SKU {sku_id} failed re-verification - no longer eligible for deletion")
-                    else:
-                        logger.warning(f"Could not re-process SKU {sku_id} for FBA verification")
+            # Re-process previously processed SKUs to get current FBA status
+            previously_processed_still_eligible = self._filter_reverified_skus(
+                self.data_processor.process_sku_data(skus_to_reverify) if skus_to_reverify else []
+            )
 
-            logger.info(f"Found {len(previously_processed_still_eligible)} previously processed SKUs that passed FBA re-verification")
+            # Report data can lag behind live stock, so confirm the small candidate set with the FBA API
+            if self._uses_inventory_report(self.data_processor):
+                new_skus_to_delete = self.data_processor.confirm_fba_candidates(new_skus_to_delete)
+                previously_processed_still_eligible = self.data_processor.confirm_fba_candidates(
+                    previously_processed_still_eligible
+                )
 
             # Combine both lists for deletion
             all_skus_to_delete = new_skus_to_delete + previously_processed_still_eligible
@@ -171,117 +133,498 @@ class SKUCleanupTool:
             logger.info(f"Processing {len(all_skus_to_delete)} pre-verified SKUs ({len(new_skus_to_delete)} new + {len(previously_processed_still_eligible)} previously processed)...")
             deletion_results = self._execute_deletions(all_skus_to_delete)
 
-            # Step 5: Generate report
-            logger.info("Step 5: Generating cleanup report...")
-            report_data = {
-                'total_processed': len(processed_skus),
-                'eligible_for_deletion': len(all_skus_to_delete),
-                'new_eligible': len(new_skus_to_delete),
-                'previously_processed_eligible': len(previously_processed_still_eligible),
-                'deleted': deletion_results['deleted'],
-                'skipped': deletion_results['skipped'],
-                'errors': deletion_results['errors'],
-                'execution_time': deletion_results['execution_time']
-            }
+            return self._finish_run(len(processed_skus), new_skus_to_delete, previously_processed_still_eligible, deletion_results)
 
-            self.report_generator.generate_report(report_data)
+        except Exception as e:
+            logger.error(f"Critical error during cleanup: {str(e)}")
+            raise
 
-            # Write current run's deleted SKUs for email notifications
-            self._write_current_run_deleted_skus(deletion_results['deleted'])
+    async def run_cleanup_async(self) -> Dict[str, Any]:
+        """
+        Execute the complete SKU cleanup process using the asyncio SP-API client
 
-            logger.info("SKU cleanup process completed successfully")
-            return report_data
+        Returns:
+            Dict containing cleanup results and statistics
+        """
+        logger.info("Starting SKU cleanup process (async)...")
+        self._log_run_mode()
+        self._ensure_report_schedules()
+
+        try:
+            # Share the sync client's token and AIMD limits so both clients follow one LWA token and one quota
+            async with AsyncAmazonAPI(config.credentials, token_manager=self.amazon_api.token_manager,
+                                      concurrency=self.amazon_api.concurrency) as async_api:
+                data_processor = DataProcessor(amazon_api=async_api, age_threshold_days=config.settings.age_threshold_days,
+                                               age_engine=self.data_processor.age_engine)
+
+                # Step 1: Get all SKUs (or sample in test mode)
+                logger.info("Step 1: Retrieving merchant listings...")
+                if config.settings.fba_inventory_mode == 'report':
+                    # The FBA inventory report is generated by the synchronous client off the event loop
+                    inventory_report = asyncio.get_running_loop().run_in_executor(None, self._load_fba_inventory_report)
+                    raw_skus = self._prepare_raw_skus(await async_api.get_merchant_listings())
+                    await inventory_report
+                    data_processor.inventory_index = self.data_processor.inventory_index
+                else:
+                    raw_skus = self._prepare_raw_skus(await async_api.get_merchant_listings())
+
+                # Snapshot modes use the synchronous client off the event loop
+                if config.settings.fba_inventory_mode in ('snapshot', 'incremental'):
+                    await asyncio.get_running_loop().run_in_executor(None, self._load_fba_inventory_snapshot)
+                    data_processor.inventory_index = self.data_processor.inventory_index
+
+                # Step 2: Process and filter SKUs - every inventory request is in flight at once
+                logger.info("Step 2: Processing SKU data...")
+                processed_skus = await data_processor.process_sku_data_async(raw_skus)
+                logger.info(f"Processed {len(processed_skus)} valid SKUs")
+
+                # Step 3: Identify SKUs for deletion
+                logger.info("Step 3: Identifying SKUs for deletion...")
+                new_skus_to_delete, skus_to_reverify = self._select_deletion_candidates(raw_skus, processed_skus)
+                previously_processed_still_eligible = self._filter_reverified_skus(
+                    await data_processor.process_sku_data_async(skus_to_reverify) if skus_to_reverify else []
+                )
+                if self._uses_inventory_report(data_processor):
+                    new_skus_to_delete = await data_processor.confirm_fba_candidates_async(new_skus_to_delete)
+                    previously_processed_still_eligible = await data_processor.confirm_fba_candidates_async(
+                        previously_processed_still_eligible
+                    )
+                all_skus_to_delete = new_skus_to_delete + previously_processed_still_eligible
+
+                # Step 4: Execute deletions (if not dry run)
+                logger.info("Step 4: Executing deletions...")
+                logger.info(f"Processing {len(all_skus_to_delete)} pre-verified SKUs ({len(new_skus_to_delete)} new + {len(previously_processed_still_eligible)} previously processed)...")
+                deletion_results = await self._execute_deletions_async(all_skus_to_delete, async_api)
+
+            return self._finish_run(len(processed_skus), new_skus_to_delete, previously_processed_still_eligible, deletion_results)
 
         except Exception as e:
             logger.error(f"Critical error during cleanup: {str(e)}")
             raise
 
-    def _execute_deletions(self, skus_to_delete: List[Dict]) -> Dict[str, Any]:
-        """Execute SKU deletions with safety checks"""
-        results = {
-            'deleted': [],
-            'skipped': [],
-            'errors': [],
-            'execution_time': 0
-        }
+    def run_cleanup_streaming(self) -> Dict[str, Any]:
+        """
+        Execute the SKU cleanup as a streaming pipeline so deletions start while the report is still being parsed
 
-        if not skus_to_delete:
-            logger.info("No SKUs to delete")
-            return results
+        Returns:
+            Dict containing cleanup results and statistics
+        """
+        if config.settings.test_mode:
+            # Test mode samples from the whole catalog, which a stream never holds
+            logger.info("Test mode enabled - using the batch cleanup process")
+            return self.run_cleanup()
 
-        start_time = datetime.now()
+        logger.info("Starting SKU cleanup process (streaming)...")
+        self._log_run_mode()
+        self._ensure_report_schedules()
 
-        for sku_data in skus_to_delete:
-            sku = sku_data['sku']
+        try:
+            # Snapshot modes answer inventory checks from an index that must exist before the first check
+            if config.settings.fba_inventory_mode in ('snapshot', 'incremental'):
+                self._load_fba_inventory_snapshot()
+
+            run = {
+                'listed_skus': set(),
+                'total_processed': 0,
+                'new_eligible': SkuTable(keep_details=False),
+                'previously_processed_eligible': SkuTable(keep_details=False),
+                'deletion_results': {'deleted': [], 'skipped': [], 'errors': [], 'execution_time': 0}
+            }
 
-            try:
-                # Final safety check
-                if self._should_skip_sku(sku):
-                    logger.info(f"Skipping SKU {sku} (in skip list)")
-                    results['skipped'].append({'sku': sku, 'reason': 'in_skip_list'})
-                    continue
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='fba-report') as executor:
+                inventory_report = None
+                if config.settings.fba_inventory_mode == 'report':
+                    inventory_report = executor.submit(self._load_fba_inventory_report)
+
+                pipeline = StreamingPipeline(self._cleanup_stages(run, inventory_report),
+                                             queue_size=config.settings.pipeline_queue_size)
+                start_time = time.perf_counter()
+                source_error = None
+                try:
+                    stats = pipeline.run(self._iter_listing_batches(run['listed_skus']))
+                except Exception as e:
+                    # Batches parsed before the failure have been deleted, so the run is still reported
+                    source_error = e
+                    stats = pipeline.stats
+                elapsed = time.perf_counter() - start_time
+
+            for name, stage_stats in stats.items():
+                logger.info(f"Pipeline {name}: {stage_stats.batches_in} batches in, {stage_stats.batches_out} out, "
+                            f"{stage_stats.errors} errors, busy {stage_stats.busy_seconds:.1f}s "
+                            f"on {stage_stats.workers} workers")
+            logger.info(f"Pipeline finished in {elapsed:.1f}s "
+                        f"(stages busy {sum(item.busy_seconds for item in stats.values()):.1f}s in total)")
+
+            if source_error is not None:
+                logger.error(f"Listings report failed part-way - reporting the {run['total_processed']} SKUs processed so far")
+                self._finish_run(run['total_processed'], run['new_eligible'],
+                                 run['previously_processed_eligible'], run['deletion_results'])
+                raise source_error
+
+            deletion_results = run['deletion_results']
+            if config.settings.deletion_backend == 'feed':
+                # A listings feed is one bulk submission, so it is sent once the stream has been decided
+                deletion_results = self._execute_deletions([*run['new_eligible'], *run['previously_processed_eligible']])
+
+            # The full listing has now been seen, so processed SKUs that are no longer listed can be dropped
+            self._prune_processed_skus(run['listed_skus'])
+
+            return self._finish_run(run['total_processed'], run['new_eligible'],
+                                    run['previously_processed_eligible'], deletion_results)
 
-                # FBA verification already done during processing phase
-                # If SKU made it here, it passed both age and FBA inventory checks
+        except Exception as e:
+            logger.error(f"Critical error during cleanup: {str(e)}")
+            raise
 
-                # Execute deletion (unless dry run)
-                if not config.settings.dry_run:
-                    self.amazon_api.delete_sku(sku)
-                    logger.info(f"Successfully deleted SKU: {sku}")
-                    results['deleted'].append(sku)
+    def _iter_listing_batches(self, listed_skus: Set[str]) -> Iterator[SkuTable]:
+        """Group streamed report rows into batch_size SkuTables, noting every listed SKU"""
+        batch = SkuTable(keep_details=False)
+        for record in self.amazon_api.iter_merchant_listings():
+            if record.get('sku'):
+                listed_skus.add(record['sku'])
+            batch.append(record)
+            if len(batch) >= config.settings.batch_size:
+                yield batch
+                batch = SkuTable(keep_details=False)
+
+        if len(batch):
+            yield batch
+
+    def _cleanup_stages(self, run: Dict[str, Any], inventory_report: Optional[Future]) -> List[Stage]:
+        """Build the age -> inventory -> cooldown -> delete -> record stages of a streaming run"""
+        # Only the inventory stage has several workers; run state is updated by single-worker stages
+        processed_skus_with_timestamps = self._load_processed_skus_with_timestamps()
+        current_time = int(time.time())
+        cooldown_skus = {sku for sku, timestamp in processed_skus_with_timestamps.items() if timestamp > current_time}
+
+        def filter_age(batch: SkuTable) -> SkuTable:
+            run['total_processed'] += sum(1 for sku in batch.column('sku') if sku)
+            return self.data_processor.filter_by_age(batch, config.settings.age_threshold_days)
+
+        def check_inventory(batch: SkuTable) -> List[Dict]:
+            if inventory_report is not None:
+                inventory_report.result()  # Join with the FBA inventory report once it has loaded
+            # The stage's workers already run batches in parallel, so each batch is looked up sequentially
+            eligible = self.data_processor.identify_deletable_skus(
+                self.data_processor.process_sku_data(batch, max_workers=1)
+            )
+            if self._uses_inventory_report(self.data_processor):
+                eligible = self.data_processor.confirm_fba_candidates(eligible)
+            return eligible
+
+        def filter_cooldown(candidates: List[Dict]) -> List[Dict]:
+            ready = []
+            for candidate in candidates:
+                sku = candidate['sku']
+                if sku in cooldown_skus:
+                    continue
+                if sku in processed_skus_with_timestamps:
+                    # Cooldown expired - the inventory stage has just re-verified it
+                    logger.info(f"SKU {sku} passed re-verification and is still eligible for deletion")
+                    run['previously_processed_eligible'].append(candidate)
                 else:
-                    logger.info(f"DRY RUN: Would delete SKU: {sku}")
-                    results['deleted'].append(sku)  # Still count in dry run
+                    run['new_eligible'].append(candidate)
+                ready.append(candidate)
+            return ready
+
+        stages = [
+            Stage('age', filter_age),
+            Stage('inventory', check_inventory, workers=self.data_processor.max_workers),
+            Stage('cooldown', filter_cooldown)
+        ]
+        if config.settings.deletion_backend == 'feed':
+            return stages
+
+        deletion_executor = self._create_deletion_executor(should_skip=self._skip_check(cooldown_skus))
+
+        def delete(candidates: List[Dict]) -> List[str]:
+            results = deletion_executor.execute(candidates)
+            for key in ('deleted', 'skipped', 'errors'):
+                run['deletion_results'][key].extend(results[key])
+            run['deletion_results']['execution_time'] += results['execution_time']
+            return results['deleted']
+
+        def record(deleted_skus: List[str]):
+            self._verify_deletions(deleted_skus)
+
+        return stages + [Stage('delete', delete), Stage('record', record)]
+
+    def _log_run_mode(self):
+        """Log test/production mode status and safety warnings"""
+        # Show test mode status
+        if config.settings.test_mode:
+            logger.info("🧪 TEST MODE ENABLED")
+            logger.info(f"   Sample size: {config.settings.test_sample_size}")
+            if config.settings.test_seed_skus:
+                logger.info(f"   Test seed SKUs: {config.settings.test_seed_skus}")
 
-            except Exception as e:
-                logger.error(f"Error processing SKU {sku}: {str(e)}")
-                results['errors'].append({'sku': sku, 'error': str(e)})
+            # Safety check: In test mode, warn about dry run setting
+            if not config.settings.dry_run:
+                logger.warning("🔒 SAFETY WARNING: TEST_MODE enabled but DRY_RUN=false detected!")
+                logger.warning("🔒 This will perform ACTUAL DELETIONS on sample SKUs")
+                logger.warning("🔒 Are you sure you want to delete SKUs in test mode?")
+                logger.warning("🔒 Consider using TEST_MODE=true with DRY_RUN=true for safe testing")
+                # Don't force dry_run - let user make explicit choice
+        else:
+            logger.info("🔄 PRODUCTION MODE - Processing all SKUs")
+
+    def _ensure_report_schedules(self):
+        """Keep Amazon generating this run's reports ahead of the next cron window"""
+        if not config.settings.report_schedule_enabled:
+            return
+
+        self.amazon_api.ensure_report_schedule(MERCHANT_LISTINGS_REPORT_TYPE)
+        if config.settings.fba_inventory_mode == 'report':
+            self.amazon_api.ensure_report_schedule(FBA_INVENTORY_REPORT_TYPE)
+
+    def _prepare_raw_skus(self, raw_skus: SkuTable) -> SkuTable:
+        """Log the retrieved listings and apply test mode sampling"""
+        raw_skus = SkuTable.coerce(raw_skus)
+        logger.info(f"Retrieved {len(raw_skus)} SKUs from Amazon")
+
+        # Apply test mode filtering if enabled
+        if config.settings.test_mode:
+            raw_skus = self._apply_test_mode_filter(raw_skus)
+            logger.info(f"Test mode: Using {len(raw_skus)} SKUs for testing")
+
+        return raw_skus
+
+    def _select_deletion_candidates(self, raw_skus: SkuTable, processed_skus: SkuTable):
+        """
+        Split processed SKUs into new deletion candidates and previously processed SKUs to re-verify
+
+        Returns:
+            Tuple of (new SKUs eligible for deletion, previously processed SKUs needing re-verification)
+        """
+        # Load previously processed SKUs, dropping those no longer in Amazon listings
+        processed_skus_with_timestamps = self._prune_processed_skus({sku for sku in raw_skus.column('sku') if sku})
+
+        # Cooldown expired - can retry deletion (a future timestamp keeps the SKU in cooldown)
+        current_time = int(time.time())
+        active_processed_skus = {sku for sku, timestamp in processed_skus_with_timestamps.items()
+                                 if timestamp <= current_time}
 
-        results['execution_time'] = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Active processed SKUs (cooldown expired): {len(active_processed_skus)}")
+
+        # Get SKUs that are in cooldown (have future timestamps)
+        cooldown_skus = {sku for sku, timestamp in processed_skus_with_timestamps.items() if timestamp > current_time}
+
+        # Get new SKUs that haven't been processed before and passed FBA verification
+        new_skus_to_delete = [sku for sku in processed_skus if sku.get('is_eligible_for_deletion', False) and sku.get('sku') not in cooldown_skus]
+        logger.info(f"Found {len(new_skus_to_delete)} NEW SKUs eligible for deletion (FBA-verified)")
+
+        # Previously processed SKUs that are still in current listings with an expired cooldown
+        # need their FBA inventory status re-verified before being considered for deletion
+        skus_to_reverify = []
+        for sku in processed_skus:
+            sku_id = sku.get('sku')
+            if sku_id in active_processed_skus and sku_id in processed_skus_with_timestamps:
+                logger.info(f"Re-verifying FBA status for previously processed SKU: {sku_id}")
+                skus_to_reverify.append(sku)
+
+        return new_skus_to_delete, skus_to_reverify
+
+    def _prune_processed_skus(self, current_sku_ids: Set[str]) -> dict:
+        """Load processed SKUs with timestamps, removing SKUs no longer in Amazon listings from the file"""
+        processed_skus_with_timestamps = self._load_processed_skus_with_timestamps()
+        logger.info(f"Found {len(processed_skus_with_timestamps)} previously processed SKUs")
+
+        # SKUs no longer in Amazon listings can be removed
+        skus_to_remove = [sku for sku in processed_skus_with_timestamps if sku not in current_sku_ids]
+
+        if skus_to_remove:
+            logger.info(f"Cleaning up {len(skus_to_remove)} obsolete processed SKUs (no longer in Amazon listings)")
+            for sku in skus_to_remove:
+                del processed_skus_with_timestamps[sku]
+            self._save_processed_skus_with_timestamps(processed_skus_with_timestamps)
+            logger.info(f"Processed SKUs file updated - now contains {len(processed_skus_with_timestamps)} entries")
+
+        return processed_skus_with_timestamps
+
+    def _filter_reverified_skus(self, reprocessed_skus: List[Dict]) -> List[Dict]:
+        """Keep the re-processed SKUs that are still eligible for deletion"""
+        previously_processed_still_eligible = []
+        for rechecked_sku in reprocessed_skus:
+            sku_id = rechecked_sku.get('sku')
+            if rechecked_sku.get('is_eligible_for_deletion', False):
+                logger.info(f"SKU {sku_id} passed re-verification and is still eligible for deletion")
+                previously_processed_still_eligible.append(rechecked_sku)
+            else:
+                logger.info(f"SKU {sku_id} failed re-verification - no longer eligible for deletion")
+
+        logger.info(f"Found {len(previously_processed_still_eligible)} previously processed SKUs that passed FBA re-verification")
+        return previously_processed_still_eligible
+
+    def _finish_run(self, total_processed: int, new_skus_to_delete: Sequence[Dict],
+                    previously_processed_still_eligible: Sequence[Dict], deletion_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the cleanup report and notification files for a completed run"""
+        # Step 5: Generate report
+        logger.info("Step 5: Generating cleanup report...")
+        report_data = {
+            'total_processed': total_processed,
+            'eligible_for_deletion': len(new_skus_to_delete) + len(previously_processed_still_eligible),
+            'new_eligible': len(new_skus_to_delete),
+            'previously_processed_eligible': len(previously_processed_still_eligible),
+            'deleted': deletion_results['deleted'],
+            'skipped': deletion_results['skipped'],
+            'errors': deletion_results['errors'],
+            'execution_time': deletion_results['execution_time']
+        }
+
+        self.report_generator.generate_report(report_data, candidates=[*new_skus_to_delete, *previously_processed_still_eligible])
+
+        # Write current run's deleted SKUs for email notifications
+        self._write_current_run_deleted_skus(deletion_results['deleted'])
+
+        # Per-operation request statistics from the request pipeline
+        request_metrics = getattr(self.amazon_api, 'request_metrics', None)
+        if isinstance(request_metrics, RequestMetrics):
+            for operation, stats in sorted(request_metrics.snapshot().items()):
+                logger.info(f"API {operation}: {stats['calls']} calls, {stats['errors']} errors, "
+                            f"avg {stats['avg_seconds']:.2f}s, max {stats['max_seconds']:.2f}s")
+
+        # Concurrency each operation converged to under adaptive control
+        concurrency = getattr(self.amazon_api, 'concurrency', None)
+        if isinstance(concurrency, ConcurrencyController):
+            for operation, stats in sorted(concurrency.snapshot().items()):
+                trend = ' -> '.join(str(limit) for _, limit in stats['history'][-10:])
+                logger.info(f"Concurrency {operation}: settled at {stats['limit']} "
+                            f"(range {stats['min']}-{stats['max']}, recent {trend})")
+
+        logger.info("SKU cleanup process completed successfully")
+        return report_data
+
+    def _load_fba_inventory_snapshot(self):
+        """Load the FBA inventory snapshot index, falling back to batched lookups on failure"""
+        try:
+            if config.settings.fba_inventory_mode == 'incremental':
+                store = InventorySnapshotStore(self.fba_snapshot_file, config.credentials.marketplace_id)
+                self.data_processor.inventory_index = self.amazon_api.sync_fba_inventory_snapshot(
+                    store, max_age_hours=config.settings.fba_snapshot_max_age_hours
+                )
+            else:
+                self.data_processor.inventory_index = self.amazon_api.get_fba_inventory_snapshot()
+            logger.info(f"Using FBA inventory snapshot with {len(self.data_processor.inventory_index)} SKUs")
+        except Exception as e:
+            logger.warning(f"Could not build FBA inventory snapshot, falling back to batched lookups: {e}")
+            self.data_processor.inventory_index = None
+
+    def _load_fba_inventory_report(self):
+        """Load the FBA inventory report index, falling back to batched lookups on failure"""
+        try:
+            self.data_processor.inventory_index = self.amazon_api.get_fba_inventory_report()
+            logger.info(f"Joining merchant listings with FBA inventory report ({len(self.data_processor.inventory_index)} SKUs)")
+        except Exception as e:
+            logger.warning(f"Could not load FBA inventory report, falling back to batched lookups: {e}")
+            self.data_processor.inventory_index = None
+
+    def _uses_inventory_report(self, data_processor: DataProcessor) -> bool:
+        """Check whether inventory decisions came from the FBA inventory report rather than live API calls"""
+        return config.settings.fba_inventory_mode == 'report' and data_processor.inventory_index is not None
+
+    def _execute_deletions(self, skus_to_delete: List[Dict]) -> Dict[str, Any]:
+        """Execute SKU deletions with safety checks"""
+        results = self._create_deletion_executor().execute(skus_to_delete)
 
         # Verify deletions actually worked before marking as processed
         # This prevents infinite loops when deletions are accepted but SKUs still appear
-        verified_deleted = []
-        successfully_deleted = results['deleted']
+        self._verify_deletions(results['deleted'])
 
-        if successfully_deleted:
-            logger.info(f"Verifying {len(successfully_deleted)} deletions actually removed SKUs from Amazon...")
+        return results
 
-            # Get fresh inventory to verify deletions worked
-            try:
-                fresh_inventory = self.amazon_api.get_merchant_listings()
-                fresh_sku_ids = {sku.get('sku') for sku in fresh_inventory if sku.get('sku')}
+    def _verify_deletions(self, successfully_deleted: List[str]):
+        """Check that accepted deletions removed the SKUs, then record them with a cooldown"""
+        if not successfully_deleted:
+            return
+
+        logger.info(f"Verifying {len(successfully_deleted)} deletions actually removed SKUs from Amazon...")
 
-                for sku in successfully_deleted:
-                    if sku not in fresh_sku_ids:
-                        verified_deleted.append(sku)
-                        logger.info(f"✅ Verified deletion: {sku} no longer in Amazon listings")
-                    else:
-                        logger.warning(f"⚠️ Deletion not verified: {sku} still appears in Amazon listings")
+        # Check just the deleted SKUs instead of pulling a fresh full listings report
+        try:
+            verified_deleted = self._create_deletion_verifier(self.amazon_api).verify(successfully_deleted)
+        except Exception as e:
+            logger.error(f"Could not verify deletions: {e}")
+            # Fallback: assume deletions worked if Amazon accepted them
+            verified_deleted = successfully_deleted
+
+        self._record_verified_deletions(verified_deleted)
+
+    def _worker_count(self, configured: int, amazon_api=None) -> int:
+        """Size a worker pool - with adaptive concurrency the API layer decides how many calls are in flight"""
+        if getattr(amazon_api or self.amazon_api, 'concurrency', None) is not None:
+            return max(configured, config.settings.resilience.concurrency_max_limit)
+        return configured
+
+    def _create_deletion_executor(self, should_skip: Optional[Callable[[str], bool]] = None):
+        """Build the configured deletion backend"""
+        should_skip = should_skip or self._should_skip_sku
+        if config.settings.deletion_backend == 'feed':
+            return FeedDeletionExecutor(
+                self.amazon_api,
+                dry_run=config.settings.dry_run,
+                should_skip=should_skip
+            )
+
+        return DeletionExecutor(
+            self.amazon_api,
+            max_workers=self._worker_count(config.settings.resilience.deletion_workers),
+            dry_run=config.settings.dry_run,
+            should_skip=should_skip
+        )
+
+    async def _execute_deletions_async(self, skus_to_delete: List[Dict], async_api) -> Dict[str, Any]:
+        """Execute SKU deletions concurrently on the event loop with the same safety checks"""
+        if config.settings.deletion_backend == 'feed':
+            # A single feed submission gains nothing from the event loop - run the sync backend off-loop
+            return await asyncio.get_running_loop().run_in_executor(None, self._execute_deletions, skus_to_delete)
+
+        # Same skip list, listings circuit breaker stop and AIMD-limited concurrency as the threaded backend
+        results = await DeletionExecutor(
+            async_api,
+            max_workers=self._worker_count(config.settings.resilience.deletion_workers, async_api),
+            dry_run=config.settings.dry_run,
+            should_skip=self._should_skip_sku
+        ).execute_async(skus_to_delete)
 
+        successfully_deleted = results['deleted']
+        if successfully_deleted:
+            logger.info(f"Verifying {len(successfully_deleted)} deletions actually removed SKUs from Amazon...")
+            try:
+                verified_deleted = await self._create_deletion_verifier(async_api).verify_async(successfully_deleted)
             except Exception as e:
                 logger.error(f"Could not verify deletions: {e}")
-                # Fallback: assume deletions worked if Amazon accepted them
                 verified_deleted = successfully_deleted
 
-            if verified_deleted:
-                # Add verified deletions with timestamp to prevent immediate re-attempts
-                import time
-                current_time = int(time.time())
+            self._record_verified_deletions(verified_deleted)
 
-                # Load existing processed SKUs with timestamps
-                existing_skus = self._load_processed_skus_with_timestamps()
+        return results
 
-                # Add verified deleted SKUs with current timestamp (1 hour cooldown for testing)
-                cooldown_seconds = 1 * 60 * 60  # 1 hour
-                for sku in verified_deleted:
-                    existing_skus[sku] = current_time + cooldown_seconds
+    def _create_deletion_verifier(self, amazon_api) -> DeletionVerifier:
+        """Build the targeted post-deletion verifier from configuration"""
+        return DeletionVerifier(
+            amazon_api,
+            max_workers=self._worker_count(config.settings.resilience.deletion_workers, amazon_api),
+            search_threshold=config.settings.verification_search_threshold
+        )
 
-                # Save back to file
-                self._save_processed_skus_with_timestamps(existing_skus)
-                logger.info(f"Saved {len(verified_deleted)} verified deletions with cooldown timestamps")
+    def _record_verified_deletions(self, verified_deleted: List[str]):
+        """Add verified deletions with a cooldown timestamp to prevent immediate re-attempts"""
+        if not verified_deleted:
+            return
 
-        return results
+        current_time = int(time.time())
+
+        # Load existing processed SKUs with timestamps
+        existing_skus = self._load_processed_skus_with_timestamps()
+
+        # Add verified deleted SKUs with current timestamp (1 hour cooldown for testing)
+        cooldown_seconds = 1 * 60 * 60  # 1 hour
+        for sku in verified_deleted:
+            existing_skus[sku] = current_time + cooldown_seconds
+
+        # Save back to file
+        self._save_processed_skus_with_timestamps(existing_skus)
+        logger.info(f"Saved {len(verified_deleted)} verified deletions with cooldown timestamps")
 
     def _should_skip_sku(self, sku: str) -> bool:
         """Check if SKU should be skipped based on configuration or cooldown"""
@@ -302,6 +645,11 @@ class SKUCleanupTool:
 
         return False
 
+    def _skip_check(self, cooldown_skus: Set[str]) -> Callable[[str], bool]:
+        """Skip check against a cooldown set loaded once, instead of re-reading the processed SKUs file per SKU"""
+        skip_skus = set(config.settings.skip_skus)
+        return lambda sku: sku in skip_skus or sku in cooldown_skus
+
     def _load_processed_skus(self) -> set:
         """Load set of SKUs that have already been processed for deletion (legacy method)"""
         try:
@@ -353,21 +701,25 @@ class SKUCleanupTool:
 
             # Save back to file
             os.makedirs(os.path.dirname(self.processed_skus_file), exist_ok=True)
-            with open(self.processed_skus_file, 'w') as f:
+            temp_path = f"{self.processed_skus_file}.tmp"
+            with open(temp_path, 'w') as f:
                 for sku in sorted(existing_skus):
                     f.write(f"{sku}\n")
+            os.replace(temp_path, self.processed_skus_file)
 
             logger.info(f"Saved {len(sku_list)} newly processed SKUs (total: {len(existing_skus)})")
         except Exception as e:
             logger.error(f"Could not save processed SKUs: {e}")
 
     def _save_processed_skus_with_timestamps(self, sku_timestamps: dict):
-        """Save dict of SKUs with their deletion timestamps"""
+        """Atomically save dict of SKUs with their deletion timestamps so readers never see a truncated file"""
         try:
             os.makedirs(os.path.dirname(self.processed_skus_file), exist_ok=True)
-            with open(self.processed_skus_file, 'w') as f:
+            temp_path = f"{self.processed_skus_file}.tmp"
+            with open(temp_path, 'w') as f:
                 for sku, timestamp in sorted(sku_timestamps.items()):
                     f.write(f"{sku},{timestamp}\n")
+            os.replace(temp_path, self.processed_skus_file)
 
             logger.info(f"Saved {len(sku_timestamps)} processed SKUs with timestamps")
         except Exception as e:
@@ -388,7 +740,7 @@ class SKUCleanupTool:
         except Exception as e:
             logger.error(f"Could not save current run deleted SKUs: {e}")
 
-    def _apply_test_mode_filter(self, raw_skus: List[Dict]) -> List[Dict]:
+    def _apply_test_mode_filter(self, raw_skus: SkuTable) -> SkuTable:
         """Apply test mode filtering to reduce dataset size for testing"""
         if not config.settings.test_mode:
             return raw_skus
@@ -399,7 +751,7 @@ class SKUCleanupTool:
         if config.settings.test_seed_skus:
             logger.info(f"Using {len(config.settings.test_seed_skus)} seed SKUs for testing")
             seed_skus = set(config.settings.test_seed_skus)
-            filtered_skus = [sku for sku in raw_skus if sku.get('sku') in seed_skus]
+            filtered_skus = raw_skus.take(i for i, sku in enumerate(raw_skus.column('sku')) if sku in seed_skus)
 
             if len(filtered_skus) == 0:
                 logger.warning("No seed SKUs found in dataset, falling back to random sampling")
@@ -416,14 +768,14 @@ class SKUCleanupTool:
 
         # Use deterministic sampling for reproducible tests
         random.seed(42)  # Fixed seed for reproducible results
-        sampled_skus = random.sample(raw_skus, sample_size)
+        sampled_skus = raw_skus.take(random.sample(range(len(raw_skus)), sample_size))
 
         logger.info(f"Randomly sampled {len(sampled_skus)} SKUs for testing")
         logger.debug(f"Sample SKUs: {[sku.get('sku') for sku in sampled_skus[:5]]}{'...' if len(sampled_skus) > 5 else ''}")
 
         return sampled_skus
 
-    def _process_skus_in_batches(self, raw_skus: List[Dict]) -> List[Dict]:
+    def _process_skus_in_batches(self, raw_skus: SkuTable) -> SkuTable:
         """Process SKUs in batches for better performance and memory management"""
         total_skus = len(raw_skus)
         batch_size = config.settings.batch_size
@@ -434,7 +786,7 @@ class SKUCleanupTool:
 
         logger.info(f"Processing {total_skus} SKUs in batches of {batch_size}")
 
-        all_processed_skus = []
+        all_processed_skus = SkuTable(raw_skus.detail_loader, keep_details=raw_skus.keep_details)
         total_batches = (total_skus + batch_size - 1) // batch_size  # Ceiling division
 
         for i in range(0, total_skus, batch_size):
@@ -445,14 +797,10 @@ class SKUCleanupTool:
             logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch_skus)} SKUs) - {len(all_processed_skus)}/{total_skus} completed")
 
             try:
+                # Request pacing is handled by the API layer's per-operation rate limiter
                 batch_processed = self.data_processor.process_sku_data(batch_skus)
                 all_processed_skus.extend(batch_processed)
 
-                # Reduced delay between batches for faster processing
-                if batch_num < total_batches:
-                    logger.debug(f"Brief pause before next batch...")
-                    time.sleep(0.5)
-
             except Exception as e:
                 logger.error(f"Error processing batch {batch_num}: {e}")
                 logger.warning(f"Continuing with next batch despite error in batch {batch_num}")
@@ -479,6 +827,10 @@ def main():
     logger.info(f"  Batch Size: {config.settings.batch_size}")
     logger.info(f"  Marketplace: {config.credentials.marketplace_id}")
     logger.info(f"  Skip SKUs: {len(config.settings.skip_skus)}")
+    logger.info(f"  Async Mode: {config.settings.async_mode}")
+    logger.info(f"  Streaming Pipeline: {config.settings.streaming_pipeline} (queue {config.settings.pipeline_queue_size} batches)")
+    logger.info(f"  FBA Inventory Mode: {config.settings.fba_inventory_mode}")
+    logger.info(f"  Report Schedule: {config.settings.report_schedule_enabled} ({config.settings.report_schedule_period})")
 
     # Resilience configuration
     logger.info("Resilience Settings:")
@@ -486,11 +838,20 @@ def main():
     logger.info(f"  Base Delay: {config.settings.resilience.base_delay}s")
     logger.info(f"  Circuit Breaker Threshold: {config.settings.resilience.circuit_breaker_failure_threshold}")
     logger.info(f"  Connection Pool: {config.settings.resilience.max_connections} connections")
+    logger.info(f"  Inventory Workers: {config.settings.resilience.max_workers}")
+    logger.info(f"  Deletion Workers: {config.settings.resilience.deletion_workers}")
+    logger.info(f"  Adaptive Concurrency: {config.settings.resilience.adaptive_concurrency} (max {config.settings.resilience.concurrency_max_limit})")
+    logger.info(f"  Deletion Backend: {config.settings.deletion_backend}")
 
     try:
         # Initialize and run cleanup tool
         cleanup_tool = SKUCleanupTool()
-        results = cleanup_tool.run_cleanup()
+        if config.settings.async_mode:
+            results = asyncio.run(cleanup_tool.run_cleanup_async())
+        elif config.settings.streaming_pipeline:
+            results = cleanup_tool.run_cleanup_streaming()
+        else:
+            results = cleanup_tool.run_cleanup()
 
         # Show results summary
         logger.info("=" * 60)
@@ -5,7 +5,7 @@ Creates markdown reports with cleanup results and statistics
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterable, List, Mapping, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -17,14 +17,16 @@ class ReportGenerator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate_report(self, results: Dict[str, Any]) -> str:
-        """Generate a comprehensive cleanup report"""
+    def generate_report(self, results: Dict[str, Any], candidates: Optional[Iterable[Mapping]] = None) -> str:
+        """Generate a comprehensive cleanup report, listing deletion candidates when given"""
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"sku-cleanup-report-{timestamp}.md"
         filepath = self.output_dir / filename
 
         # Generate report content
         report_content = self._build_report_content(results)
+        if candidates is not None:
+            report_content += self._build_candidates_section(candidates)
 
         # Write report file
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -116,6 +118,21 @@ class ReportGenerator:
 
         return report
 
+    def _build_candidates_section(self, candidates: Iterable[Mapping]) -> str:
+        """Build the deletion candidates table from SkuTable rows or SKU dicts"""
+        rows = [
+            f"| {sku.get('sku', 'unknown')} | {sku.get('age_days', '')} | {sku.get('fulfillment_channel', '')} |\n"
+            for sku in candidates
+        ]
+
+        section = f"\n## Deletion Candidates ({len(rows)})\n\n"
+        if not rows:
+            return section + "_No SKUs were eligible for deletion in this run._\n"
+
+        section += "| SKU | Age (days) | Fulfillment |\n"
+        section += "|-----|------------|-------------|\n"
+        return section + ''.join(rows)
+
     def generate_summary_report(self, daily_reports: List[str]) -> str:
         """Generate a summary report from multiple daily reports"""
         # This could aggregate data from multiple report files
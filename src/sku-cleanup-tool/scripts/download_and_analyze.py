@@ -2,7 +2,6 @@
 """
 Download the actual report and run full analysis
 """
-import time
 from core.amazon_api import AmazonAPI
 from core.data_processor import DataProcessor
 from report_generator import ReportGenerator
@@ -17,63 +16,9 @@ def download_and_analyze():
     report_gen = ReportGenerator()
 
     try:
-        # Step 1: Create report
-        print("📋 Step 1: Creating merchant listings report...")
-        report_response = api._make_api_request('POST', '/reports/2021-06-30/reports', json={
-            "reportType": "GET_MERCHANT_LISTINGS_ALL_DATA",
-            "marketplaceIds": [config.credentials.marketplace_id]
-        })
-        report_id = report_response['reportId']
-        print(f"✅ Report created: {report_id}")
-
-        # Step 2: Wait for report completion
-        print("⏳ Step 2: Waiting for report processing...")
-        for i in range(24):  # Wait up to 2 minutes
-            status_response = api._make_api_request('GET', f'/reports/2021-06-30/reports/{report_id}')
-            status = status_response.get('processingStatus')
-
-            if status == 'DONE':
-                print(f"✅ Report completed after {i*5} seconds")
-                break
-            elif status in ['FATAL', 'CANCELLED']:
-                print(f"❌ Report failed: {status}")
-                return
-
-            time.sleep(5)
-
-        # Step 3: Download report
-        print("📥 Step 3: Downloading report...")
-        document_id = status_response['reportDocumentId']
-        document_response = api._make_api_request('GET', f'/reports/2021-06-30/documents/{document_id}')
-        download_url = document_response['url']
-
-        import requests
-        response = requests.get(download_url)
-        report_content = response.text
-
-        print(f"✅ Downloaded {len(report_content.split(chr(10)))} lines of data")
-
-        # Step 4: Parse and analyze
-        print("🔍 Step 4: Analyzing SKU data...")
-        import csv
-        import io
-
-        reader = csv.DictReader(io.StringIO(report_content), delimiter='\t')
-        skus = []
-
-        for row in reader:
-            sku_data = {
-                'sku': row.get('seller-sku', '').strip(),
-                'asin': row.get('asin1', '').strip(),
-                'created_date': row.get('open-date', '').strip(),
-                'fulfillment_channel': row.get('fulfillment-channel', '').strip(),
-                'quantity': int(row.get('quantity', 0) or 0),
-                'item_name': row.get('item-name', '').strip(),
-                'listing_id': row.get('listing-id', '').strip(),
-                'status': row.get('status', '').strip()
-            }
-            if sku_data['sku']:
-                skus.append(sku_data)
+        # Steps 1-4: Get (or reuse a recent/cached) merchant listings report and parse it
+        print("📋 Step 1-4: Retrieving merchant listings report...")
+        skus = [sku_data for sku_data in api.iter_merchant_listings() if sku_data['sku']]
 
         print(f"📊 Found {len(skus)} valid SKUs")
 
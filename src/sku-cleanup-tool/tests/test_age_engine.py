@@ -0,0 +1,65 @@
+"""
+Unit tests for batch SKU age calculation
+Tests timezone-aware parsing, memoization and the vectorized age threshold mask
+"""
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import numpy as np
+
+from core.age_engine import AgeEngine
+from core.data_processor import DataProcessor
+
+
+class TestAgeEngine:
+    """Test AgeEngine functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.engine = AgeEngine(reference_time=datetime(2024, 7, 31, 12, 0, tzinfo=timezone.utc))
+
+    def test_parses_bst_as_utc_plus_one(self):
+        """Test that a BST open-date resolves to the UTC instant an hour earlier"""
+        assert self.engine.parse('01/07/2024 00:30:00 BST') == np.datetime64('2024-06-30T23:30:00')
+        assert self.engine.parse('01/07/2024 00:30:00 UTC') == np.datetime64('2024-07-01T00:30:00')
+
+    def test_timezone_shifts_age_across_day_boundary(self):
+        """Test that the timezone decides which side of a whole day an open-date falls"""
+        ages = self.engine.ages(['01/07/2024 12:30:00 BST', '01/07/2024 12:30:00 PDT'])
+
+        # 11:30 UTC is 30 days and 30 minutes old; 19:30 UTC is not yet 30 days old
+        assert ages.tolist() == [30.0, 29.0]
+
+    def test_threshold_mask_for_catalog(self):
+        """Test that ages and the threshold mask cover every row, with invalid dates never old enough"""
+        dates = ['01/01/2024 10:00:00 GMT', '25/07/2024 10:00:00 GMT', 'invalid-date', '', None]
+
+        ages, old_enough = self.engine.evaluate(dates, threshold_days=30)
+
+        assert ages[0] == 212
+        assert np.isnan(ages[2:]).all()
+        assert old_enough.tolist() == [True, False, False, False, False]
+
+    def test_repeated_dates_parsed_once(self):
+        """Test that each distinct date string is parsed once across calls"""
+        dates = ['01/01/2024 10:00:00 GMT'] * 500 + ['02/01/2024 10:00:00 GMT'] * 500
+
+        with patch.object(self.engine, '_parse', wraps=self.engine._parse) as mock_parse:
+            self.engine.ages(dates)
+            self.engine.ages(dates)
+
+        assert mock_parse.call_count == 2
+
+    def test_data_processor_uses_configured_threshold(self):
+        """Test that DataProcessor marks SKUs old enough from its threshold, not a fixed 30 days"""
+        processor = DataProcessor(age_threshold_days=200, age_engine=self.engine)
+        skus = [
+            {'sku': 'OLD', 'created_date': '01/01/2024 10:00:00 GMT', 'fulfillment_channel': 'MERCHANT'},
+            {'sku': 'MIDDLE', 'created_date': '01/06/2024 10:00:00 GMT', 'fulfillment_channel': 'MERCHANT'}
+        ]
+
+        result = processor.process_sku_data(skus)
+
+        assert [sku['is_old_enough'] for sku in result] == [True, False]
+        assert [sku['age_days'] for sku in result] == [212, 60]
+        assert processor.filter_by_age(skus, threshold_days=200) == skus[:1]
@@ -2,6 +2,8 @@
 Unit tests for Amazon API integration
 Tests API calls, error handling, and response parsing
 """
+import gzip
+import io
 import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
@@ -244,3 +246,387 @@ class TestAmazonAPIBatchOperations:
         assert sku_001_result['fulfillableQuantity'] == 10
         assert sku_002_result['fulfillableQuantity'] == 0
         assert sku_003_result['fulfillableQuantity'] == 10
+
+    def _inventory_page(self, skus, fulfillable=0, next_token=None):
+        """Build a getInventorySummaries response page for the given SKUs"""
+        page = {
+            'payload': {
+                'inventorySummaries': [
+                    {
+                        'sellerSku': sku,
+                        'inventoryDetails': {
+                            'fulfillableQuantity': fulfillable,
+                            'inboundWorkingQuantity': 0,
+                            'inboundShippedQuantity': 0,
+                            'inboundReceivingQuantity': 0,
+                            'reservedQuantity': {'totalReservedQuantity': 0}
+                        }
+                    }
+                    for sku in skus
+                ]
+            }
+        }
+        if next_token:
+            page['pagination'] = {'nextToken': next_token}
+        return page
+
+    def test_batch_inventory_check_packs_50_skus_per_request(self):
+        """Test that batched checks use sellerSkus with at most 50 SKUs per call"""
+        sku_list = [f'SKU-{i:03d}' for i in range(120)]
+
+        with patch.object(self.api, '_make_api_request') as mock_request:
+            mock_request.side_effect = lambda method, endpoint, **kwargs: self._inventory_page([])
+            results = self.api.check_fba_inventory_batch(sku_list)
+
+        assert mock_request.call_count == 3
+        first_endpoint = mock_request.call_args_list[0][0][1]
+        assert 'sellerSkus=SKU-000,SKU-001' in first_endpoint
+        assert first_endpoint.count(',') == 49
+        assert len(results) == 120
+        assert results['SKU-119']['fulfillableQuantity'] == 0
+
+    def test_batch_inventory_check_follows_next_token(self):
+        """Test that batched checks follow nextToken and map results per SKU"""
+        pages = [
+            self._inventory_page(['SKU-001'], fulfillable=4, next_token='token/1'),
+            self._inventory_page(['SKU-002'], fulfillable=0)
+        ]
+
+        with patch.object(self.api, '_make_api_request', side_effect=pages) as mock_request:
+            results = self.api.check_fba_inventory_batch(['SKU-001', 'SKU-002', 'SKU-003'])
+
+        assert mock_request.call_count == 2
+        assert 'nextToken=token%2F1' in mock_request.call_args_list[1][0][1]
+        assert results['SKU-001']['fulfillableQuantity'] == 4
+        assert results['SKU-002']['fulfillableQuantity'] == 0
+        # SKUs missing from the response get the same safe defaults as single lookups
+        assert results['SKU-003'] == {
+            'sellerSku': 'SKU-003',
+            'fulfillableQuantity': 0,
+            'inboundQuantity': 0,
+            'reservedQuantity': 0
+        }
+
+    def test_batch_inventory_check_error_returns_safe_defaults(self):
+        """Test that a failed batch returns safe defaults with the error for every SKU"""
+        with patch.object(self.api, '_make_api_request', side_effect=RequestException("API Error")):
+            results = self.api.check_fba_inventory_batch(['SKU-001', 'SKU-002'])
+
+        assert set(results) == {'SKU-001', 'SKU-002'}
+        assert results['SKU-001']['fulfillableQuantity'] == 0
+        assert results['SKU-002']['error'] == 'API Error'
+
+    def test_batch_inventory_check_later_page_failure_marks_unresolved_skus(self):
+        """Test that a rejected later page (e.g. expired nextToken) never yields zero inventory"""
+        pages = [
+            self._inventory_page(['SKU-001'], fulfillable=4, next_token='expired'),
+            {'_status_code': 400, '_response_text': 'Invalid nextToken'}
+        ]
+
+        with patch.object(self.api, '_make_api_request', side_effect=pages):
+            results = self.api.check_fba_inventory_batch(['SKU-001', 'SKU-002'])
+
+        assert results['SKU-001']['fulfillableQuantity'] == 4
+        assert 'error' not in results['SKU-001']
+        assert 'error' in results['SKU-002']
+
+    def test_batch_inventory_check_rejected_batch_falls_back_to_single_lookups(self):
+        """Test that a 400 for a multi-SKU batch re-checks each SKU on its own"""
+        def fake_request(method, endpoint, **kwargs):
+            if 'sellerSkus=' in endpoint:
+                return {'_status_code': 400, '_response_text': 'Invalid sellerSkus'}
+            return self._inventory_page(['SKU-001'], fulfillable=2) if 'SKU-001' in endpoint else {'_status_code': 400}
+
+        with patch.object(self.api, '_make_api_request', side_effect=fake_request) as mock_request:
+            results = self.api.check_fba_inventory_batch(['SKU-001', 'BAD SKU'])
+
+        assert mock_request.call_count == 3
+        assert results['SKU-001']['fulfillableQuantity'] == 2
+        assert results['BAD SKU']['fulfillableQuantity'] == 0
+
+    def test_inventory_snapshot_indexes_all_pages(self):
+        """Test that the full-catalog snapshot pages through all summaries without a SKU filter"""
+        pages = [
+            self._inventory_page(['SKU-001', 'SKU-002'], next_token='token-1'),
+            self._inventory_page(['SKU-003'], fulfillable=7)
+        ]
+
+        with patch.object(self.api, '_make_api_request', side_effect=pages) as mock_request:
+            snapshot = self.api.get_fba_inventory_snapshot()
+
+        assert mock_request.call_count == 2
+        assert 'sellerSku' not in mock_request.call_args_list[0][0][1]
+        assert set(snapshot) == {'SKU-001', 'SKU-002', 'SKU-003'}
+        assert snapshot['SKU-003']['fulfillableQuantity'] == 7
+
+    def test_inventory_snapshot_raises_on_rejected_page(self):
+        """Test that a rejected page fails the snapshot rather than returning a partial index"""
+        pages = [
+            self._inventory_page(['SKU-001'], next_token='token-1'),
+            {'_status_code': 400, '_response_text': 'Invalid nextToken'}
+        ]
+
+        with patch.object(self.api, '_make_api_request', side_effect=pages):
+            with pytest.raises(Exception, match='snapshot failed'):
+                self.api.get_fba_inventory_snapshot()
+
+
+class TestAmazonAPIRateLimiting:
+    """Test rate limiting integration in Amazon API"""
+
+    def setup_method(self):
+        """Set up rate limiting test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'A1F83G8C2ARO7P'
+        self.credentials.seller_id = 'SELLER'
+
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+
+    def test_operation_mapping(self):
+        """Test that endpoints map to their SP-API operation names"""
+        assert self.api._get_operation_for_request('GET', '/fba/inventory/v1/summaries?details=true') == 'getInventorySummaries'
+        assert self.api._get_operation_for_request('POST', '/reports/2021-06-30/reports') == 'createReport'
+        assert self.api._get_operation_for_request('GET', '/reports/2021-06-30/reports/123') == 'getReport'
+        assert self.api._get_operation_for_request('GET', '/reports/2021-06-30/documents/abc') == 'getReportDocument'
+        assert self.api._get_operation_for_request('DELETE', '/listings/2021-08-01/items/S/SKU') == 'deleteListingsItem'
+        assert self.api._get_operation_for_request('GET', '/listings/2021-08-01/items/S/SKU') == 'getListingsItem'
+        assert self.api._get_operation_for_request('GET', '/listings/2021-08-01/items/S?identifiers=A') == 'searchListingsItems'
+
+    def test_request_acquires_rate_limit_and_reads_header(self):
+        """Test that every request acquires a token and adopts the live rate header"""
+        self.api.rate_limiter = Mock()
+        self.api._build_pipelines()
+        response = Mock(status_code=200, headers={'x-amzn-RateLimit-Limit': '10.0'})
+        response.json.return_value = {'status': 'ACCEPTED'}
+
+        with patch.object(self.api, '_get_access_token', return_value='token'), \
+             patch.object(self.api.session, 'request', return_value=response):
+            self.api._make_api_request('DELETE', '/listings/2021-08-01/items/SELLER/SKU-001')
+
+        self.api.rate_limiter.acquire.assert_called_once_with('deleteListingsItem')
+        self.api.rate_limiter.update_from_headers.assert_called_once_with('deleteListingsItem', response.headers)
+
+
+class TestAmazonAPIReports:
+    """Test merchant listings report reuse and adaptive polling"""
+
+    def setup_method(self):
+        """Set up report test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'ATVPDKIKX0DER'
+
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+        self.api.report_cache = None
+
+    def test_reuses_recent_done_report(self):
+        """Test that a recent DONE report is downloaded instead of creating a new one"""
+        recent = {'reports': [
+            {'reportId': '1', 'processingStatus': 'DONE', 'reportDocumentId': 'doc-old',
+             'processingStartTime': '2024-01-01T10:00:00+00:00', 'processingEndTime': '2024-01-01T10:00:20+00:00'},
+            {'reportId': '2', 'processingStatus': 'DONE', 'reportDocumentId': 'doc-new',
+             'processingStartTime': '2024-01-01T11:00:00+00:00', 'processingEndTime': '2024-01-01T11:00:40+00:00'}
+        ]}
+
+        with patch.object(self.api, '_make_api_request', return_value=recent) as mock_request, \
+             patch.object(self.api, '_download_report', return_value=[{'sku': 'A'}]) as mock_download:
+            listings = self.api.get_merchant_listings()
+
+        assert listings == [{'sku': 'A'}]
+        mock_download.assert_called_once_with('doc-new')
+        assert mock_request.call_count == 1
+        assert 'processingStatuses=DONE' in mock_request.call_args[0][1]
+        assert list(self.api._report_durations) == [20.0, 40.0]
+
+    def test_creates_report_when_reuse_disabled(self):
+        """Test that reuse_recent=False always requests a fresh report"""
+        responses = [{'reportId': 'r1'}, {'processingStatus': 'DONE', 'reportDocumentId': 'doc-fresh'}]
+
+        with patch.object(self.api, '_make_api_request', side_effect=responses) as mock_request, \
+             patch.object(self.api, '_download_report', return_value=[]) as mock_download:
+            self.api.get_merchant_listings(reuse_recent=False)
+
+        assert mock_request.call_args_list[0][0][0] == 'POST'
+        mock_download.assert_called_once_with('doc-fresh')
+
+    def test_ensure_report_schedule_creates_schedule_before_run(self):
+        """Test that a missing schedule is created to generate the report ahead of the cron start"""
+        responses = [{'reportSchedules': []}, {'reportScheduleId': 'sched-1'}]
+
+        with patch('core.amazon_api.config') as mock_config, \
+             patch.object(self.api, '_make_api_request', side_effect=responses) as mock_request:
+            mock_config.settings.report_schedule_period = 'P1D'
+            mock_config.settings.report_schedule_run_time = '02:00'
+            mock_config.settings.report_schedule_lead_minutes = 30
+            assert self.api.ensure_report_schedule() == 'sched-1'
+
+        assert mock_request.call_args_list[0][0][1] == '/reports/2021-06-30/schedules?reportTypes=GET_MERCHANT_LISTINGS_ALL_DATA'
+        payload = mock_request.call_args_list[1][1]['json']
+        assert payload['period'] == 'P1D'
+        assert payload['nextReportCreationTime'].endswith('T01:30:00Z')
+
+    def test_ensure_report_schedule_keeps_matching_schedule(self):
+        """Test that an active schedule with the same period is not recreated"""
+        existing = {'reportSchedules': [
+            {'reportScheduleId': 'sched-1', 'marketplaceIds': ['ATVPDKIKX0DER'], 'period': 'P1D'}
+        ]}
+
+        with patch('core.amazon_api.config') as mock_config, \
+             patch.object(self.api, '_make_api_request', return_value=existing) as mock_request:
+            mock_config.settings.report_schedule_period = 'P1D'
+            assert self.api.ensure_report_schedule() == 'sched-1'
+
+        mock_request.assert_called_once()
+
+    def test_scheduling_widens_reuse_window(self):
+        """Test that scheduled reports generated before the run fall inside the reuse window"""
+        with patch('core.amazon_api.config') as mock_config:
+            mock_config.settings.report_reuse_max_age_minutes = 60
+            mock_config.settings.report_schedule_max_age_minutes = 180
+            mock_config.settings.report_schedule_enabled = False
+            assert self.api._report_reuse_max_age_minutes() == 60
+
+            mock_config.settings.report_schedule_enabled = True
+            assert self.api._report_reuse_max_age_minutes() == 180
+
+    def test_poll_delays_follow_observed_generation_time(self):
+        """Test that the first poll waits about as long as recent reports took, then grows to the cap"""
+        with patch('core.amazon_api.config') as mock_config:
+            mock_config.settings.report_poll_initial_interval = 5.0
+            mock_config.settings.report_poll_max_interval = 30.0
+
+            self.api._report_durations.extend([12.0, 14.0, 100.0])
+            delays = self.api._report_poll_delays()
+            assert [next(delays) for _ in range(6)] == [14.0, 5.0, 7.5, 11.25, 16.875, 25.3125]
+            assert next(delays) == 30.0
+
+    def test_poll_uses_short_interval_for_fast_reports(self):
+        """Test that a report ready within seconds is not held back by a fixed 30s sleep"""
+        responses = [{'processingStatus': 'IN_PROGRESS'}, {'processingStatus': 'DONE', 'reportDocumentId': 'doc'}]
+
+        with patch.object(self.api, '_make_api_request', side_effect=responses), \
+             patch('core.amazon_api.time.sleep') as mock_sleep:
+            assert self.api._poll_report_completion('r1') == 'doc'
+
+        assert mock_sleep.call_args[0][0] <= 5.0
+
+    def _stream_response(self, body, encoding='utf-8'):
+        """Build a streamed download response over raw bytes"""
+        download = MagicMock()
+        download.__enter__.return_value = download
+        download.raw = io.BytesIO(body)
+        download.encoding = encoding
+        return download
+
+    def test_streams_gzip_report_row_by_row(self):
+        """Test that a GZIP report document is decompressed and parsed incrementally"""
+        tsv = "seller-sku\tasin1\topen-date\tfulfillment-channel\tquantity\n"
+        tsv += "".join(f"SKU-{i}\tB00{i}\t01/01/2020\tAMAZON_NA\t{i}\n" for i in range(3))
+        document = {'url': 'https://example.com/doc', 'compressionAlgorithm': 'GZIP'}
+
+        with patch.object(self.api, '_make_api_request', return_value=document), \
+             patch.object(self.api.session, 'get', return_value=self._stream_response(gzip.compress(tsv.encode()))) as mock_get:
+            records = self.api._iter_report_document('doc-1')
+            first = next(records)
+            rest = list(records)
+
+        assert mock_get.call_args[1]['stream'] is True
+        assert first['sku'] == 'SKU-0'
+        assert [record['sku'] for record in rest] == ['SKU-1', 'SKU-2']
+        assert rest[-1]['quantity'] == 2
+
+    def test_iter_merchant_listings_decodes_report_charset(self):
+        """Test that uncompressed reports are decoded with the response charset"""
+        tsv = "seller-sku\titem-name\nSKU-1\tCaf\u00e9 mug\n"
+        document = {'url': 'https://example.com/doc'}
+
+        with patch.object(self.api, '_find_reusable_report', return_value='doc-1'), \
+             patch.object(self.api, '_make_api_request', return_value=document), \
+             patch.object(self.api.session, 'get', return_value=self._stream_response(tsv.encode('cp1252'), 'cp1252')):
+            records = list(self.api.iter_merchant_listings())
+
+        assert records[0]['item_name'] == 'Caf\u00e9 mug'
+
+    def test_fba_inventory_report_indexed_by_sku(self):
+        """Test that the FBA inventory report is requested by type and indexed with FBA result quantities"""
+        tsv = ("sku\tasin\tafn-fulfillable-quantity\tafn-inbound-working-quantity\t"
+               "afn-inbound-shipped-quantity\tafn-inbound-receiving-quantity\tafn-reserved-quantity\n"
+               "SKU-1\tB001\t0\t0\t3\t0\t1\n"
+               "SKU-2\tB002\t5\t0\t0\t0\t0\n")
+        document = {'url': 'https://example.com/doc'}
+
+        with patch.object(self.api, '_find_reusable_report', return_value='doc-1') as mock_find, \
+             patch.object(self.api, '_make_api_request', return_value=document), \
+             patch.object(self.api.session, 'get', return_value=self._stream_response(tsv.encode())):
+            index = self.api.get_fba_inventory_report()
+
+        assert mock_find.call_args[0][0] == 'GET_FBA_MYI_ALL_INVENTORY_DATA'
+        assert index['SKU-1']['inboundShippedQuantity'] == 3
+        assert index['SKU-1']['inboundQuantity'] == 3
+        assert index['SKU-1']['reservedQuantity'] == 1
+        assert index['SKU-2']['fulfillableQuantity'] == 5
+
+
+class TestAmazonAPIListingsVerification:
+    """Test Listings API lookups used for post-deletion verification"""
+
+    def setup_method(self):
+        """Set up listings test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'ATVPDKIKX0DER'
+        self.credentials.seller_id = 'SELLER'
+
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+
+    def test_listing_exists(self):
+        """Test that a 404 from getListingsItem means the listing is gone"""
+        with patch.object(self.api, '_make_api_request', side_effect=[{'sku': 'A'}, {'_status_code': 404}]) as mock_request:
+            assert self.api.listing_exists('A') is True
+            assert self.api.listing_exists('B/2') is False
+
+        assert mock_request.call_args[0][1] == '/listings/2021-08-01/items/SELLER/B%2F2'
+        assert mock_request.call_args[1]['expected_errors'] == [404]
+
+    def test_search_listings_items_batches_by_20(self):
+        """Test that searchListingsItems is called with up to 20 SKU identifiers"""
+        skus = [f'SKU-{i}' for i in range(25)]
+        responses = [{'items': [{'sku': 'SKU-3'}]}, {'items': []}]
+
+        with patch.object(self.api, '_make_api_request', side_effect=responses) as mock_request:
+            found = self.api.search_listings_items(skus)
+
+        assert found == {'SKU-3'}
+        assert mock_request.call_count == 2
+        first_endpoint = mock_request.call_args_list[0][0][1]
+        assert 'identifiersType=SKU' in first_endpoint
+        assert first_endpoint.split('identifiers=')[1].split('&')[0].count(',') == 19
+
+    def test_check_listing_inventory_batch(self):
+        """Test that batch results match the per-SKU shape and absent SKUs count as delisted"""
+        skus = [f'SKU-{i}' for i in range(21)]
+        responses = [
+            {'items': [{'sku': 'SKU-0', 'fulfillmentAvailability': [
+                {'fulfillmentChannelCode': 'AMAZON_NA', 'quantity': 0},
+                {'fulfillmentChannelCode': 'DEFAULT', 'quantity': 4}
+            ]}]},
+            {'items': []}
+        ]
+
+        with patch.object(self.api, '_make_api_request', side_effect=responses) as mock_request:
+            results = self.api.check_listing_inventory_batch(skus)
+
+        assert mock_request.call_count == 2
+        assert 'includedData=summaries,fulfillmentAvailability' in mock_request.call_args_list[0][0][1]
+        assert results['SKU-0'] == self.api._build_listing_inventory_result('SKU-0', responses[0]['items'][0])
+        assert results['SKU-0']['fba_quantity'] == 4
+        assert results['SKU-20'] == self.api._listing_not_found_result('SKU-20')
+
+    def test_check_listing_inventory_batch_error_is_conservative(self):
+        """Test that a failed search marks every SKU in its chunk as having inventory"""
+        with patch.object(self.api, '_make_api_request', side_effect=Exception('search failed')):
+            results = self.api.check_listing_inventory_batch(['A', 'B'])
+
+        assert all(result['has_inventory'] and result['total_quantity'] == 999 for result in results.values())
+        assert results['A']['error'] == 'search failed'
@@ -0,0 +1,308 @@
+"""
+Unit tests for the asyncio Amazon API client
+Tests batched inventory checks, request execution and deletion handling
+"""
+import asyncio
+import gzip
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.async_amazon_api import AsyncAmazonAPI
+from core.concurrency import ConcurrencyController
+from core.data_processor import DataProcessor
+from core.token_manager import AccessTokenManager
+
+
+def _inventory_page(skus, next_token=None, fulfillable=0):
+    """Build a getInventorySummaries response page for the given SKUs"""
+    response = {
+        'payload': {
+            'inventorySummaries': [
+                {
+                    'sellerSku': sku,
+                    'inventoryDetails': {
+                        'fulfillableQuantity': fulfillable,
+                        'inboundWorkingQuantity': 0,
+                        'inboundShippedQuantity': 0,
+                        'inboundReceivingQuantity': 0
+                    },
+                    'totalQuantity': fulfillable
+                }
+                for sku in skus
+            ]
+        }
+    }
+    if next_token:
+        response['pagination'] = {'nextToken': next_token}
+    return response
+
+
+class TestAsyncAmazonAPI:
+    """Test asyncio Amazon API functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'ATVPDKIKX0DER'
+        self.credentials.seller_id = 'SELLER'
+        self.api = AsyncAmazonAPI(self.credentials)
+        self.api.rate_limiter = None
+        self.api.report_cache = None
+
+    def test_batch_splits_into_concurrent_chunks(self):
+        """Test that 120 SKUs become three sellerSkus requests"""
+        skus = [f'SKU-{i}' for i in range(120)]
+
+        async def fake_request(method, endpoint, **kwargs):
+            requested = endpoint.split('sellerSkus=')[1].split('&')[0].split(',')
+            return _inventory_page(requested, fulfillable=1)
+
+        with patch.object(self.api, '_make_api_request', side_effect=fake_request) as mock_request:
+            results = asyncio.run(self.api.check_fba_inventory_batch(skus))
+
+        assert mock_request.call_count == 3
+        assert set(results) == set(skus)
+        assert all(result['fulfillableQuantity'] == 1 for result in results.values())
+
+    def test_batch_follows_next_token(self):
+        """Test that a chunk keeps paging until nextToken is absent"""
+        pages = [_inventory_page(['A'], next_token='tok+1'), _inventory_page(['B'])]
+
+        with patch.object(self.api, '_make_api_request', AsyncMock(side_effect=pages)) as mock_request:
+            results = asyncio.run(self.api.check_fba_inventory_batch(['A', 'B', 'C']))
+
+        assert mock_request.call_count == 2
+        assert 'nextToken=tok%2B1' in mock_request.call_args_list[1][0][1]
+        assert results['C']['fulfillableQuantity'] == 0
+
+    def test_batch_failure_returns_error_results(self):
+        """Test that a failed chunk marks its SKUs with an error instead of raising"""
+        with patch.object(self.api, '_make_api_request', AsyncMock(side_effect=Exception('boom'))):
+            results = asyncio.run(self.api.check_fba_inventory_batch(['A', 'B']))
+
+        assert results['A']['error'] == 'boom'
+        assert results['B']['fulfillableQuantity'] == 0
+
+    def test_batch_later_page_failure_marks_unresolved_skus(self):
+        """Test that a rejected later page leaves unresolved SKUs with an error, not zero inventory"""
+        pages = [_inventory_page(['A'], fulfillable=3, next_token='expired'), {'_status_code': 400}]
+
+        with patch.object(self.api, '_make_api_request', AsyncMock(side_effect=pages)):
+            results = asyncio.run(self.api.check_fba_inventory_batch(['A', 'B']))
+
+        assert results['A']['fulfillableQuantity'] == 3
+        assert 'error' in results['B']
+
+    def test_listing_inventory_batch_isolates_failed_chunk(self):
+        """Test that one failed search chunk does not affect the others"""
+        skus = [f'SKU-{i}' for i in range(21)]
+
+        with patch.object(self.api, '_make_api_request', AsyncMock(side_effect=[{'items': []}, Exception('boom')])):
+            results = asyncio.run(self.api.check_listing_inventory_batch(skus))
+
+        assert results['SKU-0']['has_inventory'] is False
+        assert results['SKU-20']['has_inventory'] is True
+        assert results['SKU-20']['error'] == 'boom'
+
+    def test_delete_not_found_is_not_an_error(self):
+        """Test that deleting an already removed SKU returns not_found"""
+        error = aiohttp.ClientResponseError(Mock(real_url='x'), (), status=404, message='Not Found')
+
+        with patch.object(self.api, '_make_api_request', AsyncMock(side_effect=error)):
+            result = asyncio.run(self.api.delete_sku('GONE'))
+
+        assert result == {'sku': 'GONE', 'status': 'not_found'}
+
+    def test_send_request_against_local_server(self):
+        """Test request execution, expected errors and raised HTTP errors over a real connection"""
+        async def summaries(request):
+            return web.json_response(_inventory_page(['A']))
+
+        async def missing(request):
+            return web.Response(status=404, text='not found')
+
+        async def broken(request):
+            return web.Response(status=500)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/ok', summaries)
+            app.router.add_get('/missing', missing)
+            app.router.add_get('/broken', broken)
+
+            async with TestServer(app) as server:
+                async with self.api:
+                    ok = await self.api._send_request('GET', str(server.make_url('/ok')), 'getInventorySummaries', [])
+                    not_found = await self.api._send_request('GET', str(server.make_url('/missing')), 'getInventorySummaries', [404])
+                    with pytest.raises(aiohttp.ClientResponseError):
+                        await self.api._send_request('GET', str(server.make_url('/broken')), 'getInventorySummaries', [])
+                return ok, not_found
+
+        ok, not_found = asyncio.run(run())
+
+        assert ok['payload']['inventorySummaries'][0]['sellerSku'] == 'A'
+        assert not_found == {'_status_code': 404, '_response_text': 'not found'}
+        assert self.api.session is None
+
+    def test_streams_gzip_report_from_local_server(self):
+        """Test that a GZIP report document is streamed and parsed row by row"""
+        tsv = "seller-sku\tquantity\nSKU-1\t1\nSKU-2\t0\n"
+
+        async def document(request):
+            return web.Response(body=gzip.compress(tsv.encode()), content_type='text/plain', charset='utf-8')
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/doc', document)
+
+            async with TestServer(app) as server:
+                metadata = {'url': str(server.make_url('/doc')), 'compressionAlgorithm': 'GZIP'}
+                with patch.object(self.api, '_make_api_request', AsyncMock(return_value=metadata)), \
+                     patch.object(self.api, '_find_reusable_report', AsyncMock(return_value='doc-1')):
+                    async with self.api:
+                        return [sku async for sku in self.api.iter_merchant_listings()]
+
+        records = asyncio.run(run())
+
+        assert [record['sku'] for record in records] == ['SKU-1', 'SKU-2']
+        assert records[0]['quantity'] == 1
+
+    def test_report_rows_parsed_off_loop_while_downloading(self):
+        """Test that rows are parsed in a worker thread before the rest of the document has arrived"""
+        import threading
+
+        first_row_seen = None
+        parse_threads = set()
+        parse_row = self.api._parse_report_row
+
+        def tracking_parse_row(row):
+            parse_threads.add(threading.current_thread())
+            return parse_row(row)
+
+        async def document(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(b"seller-sku\tquantity\nSKU-1\t1\n")
+            # Hold back the rest until the consumer has received the first row
+            await asyncio.wait_for(first_row_seen.wait(), timeout=5)
+            await response.write(b"SKU-2\t0\n")
+            await response.write_eof()
+            return response
+
+        async def run():
+            nonlocal first_row_seen
+            first_row_seen = asyncio.Event()
+            app = web.Application()
+            app.router.add_get('/doc', document)
+
+            records = []
+            async with TestServer(app) as server:
+                metadata = {'url': str(server.make_url('/doc'))}
+                with patch.object(self.api, '_make_api_request', AsyncMock(return_value=metadata)), \
+                     patch.object(self.api, '_parse_report_row', tracking_parse_row), \
+                     patch('core.async_amazon_api.REPORT_PARSE_BATCH_ROWS', 1):
+                    async with self.api:
+                        async for record in self.api._iter_report_document('doc-1'):
+                            records.append(record)
+                            first_row_seen.set()
+            return records
+
+        records = asyncio.run(run())
+
+        assert [record['sku'] for record in records] == ['SKU-1', 'SKU-2']
+        assert threading.main_thread() not in parse_threads
+
+    def test_token_refresh_runs_once_off_the_event_loop(self):
+        """Test that concurrent coroutines share one LWA refresh made by a worker thread"""
+        import threading
+
+        fetch_threads = []
+
+        def fetch_token():
+            fetch_threads.append(threading.current_thread())
+            return {'access_token': 'fresh', 'expires_in': 3600}
+
+        self.api.token_manager = AccessTokenManager(fetch_token, background_refresh=False)
+
+        async def run():
+            return await asyncio.gather(*(self.api._get_access_token() for _ in range(5)))
+
+        assert asyncio.run(run()) == ['fresh'] * 5
+        assert len(fetch_threads) == 1
+        assert fetch_threads[0] is not threading.main_thread()
+
+    def test_shares_token_manager_with_sync_client(self):
+        """Test that a token held by a shared manager is used without another refresh"""
+        fetch_token = Mock(return_value={'access_token': 'shared', 'expires_in': 3600})
+        manager = AccessTokenManager(fetch_token, background_refresh=False)
+        manager.get_token()
+
+        api = AsyncAmazonAPI(self.credentials, token_manager=manager)
+
+        assert asyncio.run(api._get_access_token()) == 'shared'
+        fetch_token.assert_called_once()
+
+    def test_requests_follow_shared_aimd_limit(self):
+        """Test that a shared controller caps requests in flight and a 429 lowers its limit"""
+        controller = ConcurrencyController(initial_limit=2, max_limit=2)
+        api = AsyncAmazonAPI(self.credentials, concurrency=controller)
+        api.rate_limiter = None
+        in_flight = []
+        peak = []
+
+        async def summaries(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.remove(request)
+            return web.json_response(_inventory_page(['A']))
+
+        async def throttled(request):
+            return web.Response(status=429)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/ok', summaries)
+            app.router.add_get('/throttled', throttled)
+
+            async with TestServer(app) as server:
+                async with api:
+                    url = str(server.make_url('/ok'))
+                    await asyncio.gather(*(api._send_request('GET', url, 'getInventorySummaries', []) for _ in range(6)))
+                    await api._send_request('GET', str(server.make_url('/throttled')), 'getInventorySummaries', [429])
+
+        asyncio.run(run())
+
+        limiter = controller.limiter('getInventorySummaries')
+        assert api.concurrency is controller
+        assert max(peak) == 2
+        assert limiter.limit == 1
+        assert limiter._in_flight == 0
+
+
+class TestAsyncDataProcessor:
+    """Test the async DataProcessor entry point"""
+
+    def test_process_sku_data_async_uses_batch_results(self):
+        """Test that async processing awaits one batched inventory lookup"""
+        api = Mock()
+        api.check_fba_inventory_batch = AsyncMock(return_value={
+            'OLD-EMPTY': {'sellerSku': 'OLD-EMPTY', 'fulfillableQuantity': 0, 'inboundQuantity': 0},
+            'OLD-STOCKED': {'sellerSku': 'OLD-STOCKED', 'fulfillableQuantity': 3, 'inboundQuantity': 0}
+        })
+        processor = DataProcessor(amazon_api=api)
+
+        raw_skus = [
+            {'sku': 'OLD-EMPTY', 'fulfillment_channel': 'AMAZON', 'created_date': '01/01/2020'},
+            {'sku': 'OLD-STOCKED', 'fulfillment_channel': 'AMAZON', 'created_date': '01/01/2020'}
+        ]
+
+        results = {sku['sku']: sku for sku in asyncio.run(processor.process_sku_data_async(raw_skus))}
+
+        api.check_fba_inventory_batch.assert_awaited_once()
+        assert results['OLD-EMPTY']['is_eligible_for_deletion'] is True
+        assert results['OLD-STOCKED']['is_eligible_for_deletion'] is False
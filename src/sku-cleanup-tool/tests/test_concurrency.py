@@ -0,0 +1,145 @@
+"""
+Unit tests for adaptive concurrency control
+Tests AIMD limit changes, thread and coroutine slot gating and the request pipeline middleware
+"""
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from core.concurrency import AIMDLimiter, ConcurrencyController
+from core.request_pipeline import APIRequest, ConcurrencyMiddleware
+
+
+class TestAIMDLimiter:
+    """Test AIMDLimiter functionality"""
+
+    def test_additive_increase_while_healthy(self):
+        """Test that the limit grows by about one per limit's worth of fast calls"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=2, max_limit=10)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(0.1)
+
+        assert limiter.limit == 3
+
+    def test_multiplicative_decrease_on_throttle(self):
+        """Test that a 429 halves the limit"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=8)
+
+        limiter.acquire()
+        limiter.release(0.1, throttled=True)
+
+        assert limiter.limit == 4
+
+    def test_burst_of_429s_cuts_once(self):
+        """Test that throttles inside the cooldown only cut the limit once"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=8, decrease_cooldown=60)
+
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release(0.1, throttled=True)
+
+        assert limiter.limit == 4
+
+    def test_limit_stays_within_bounds(self):
+        """Test that the limit never leaves [min_limit, max_limit]"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=2, min_limit=1, max_limit=3, decrease_cooldown=0)
+
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 3
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.1, throttled=True)
+        assert limiter.limit == 1
+
+    def test_slow_responses_stop_growth(self):
+        """Test that latency far above the baseline does not raise the limit"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=2, latency_tolerance=2.0)
+        limiter.acquire()
+        limiter.release(0.1)
+        grown = limiter._limit
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(5.0)
+
+        assert limiter._limit == grown
+
+    def test_acquire_blocks_at_limit(self):
+        """Test that callers beyond the limit wait for a slot"""
+        limiter = AIMDLimiter('getListingsItem', initial_limit=1, max_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def second_caller():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=second_caller)
+        thread.start()
+        assert not acquired.wait(0.05)
+
+        limiter.release(0.1)
+        assert acquired.wait(1)
+        thread.join()
+
+    def test_acquire_async_waits_for_release_from_thread(self):
+        """Test that a coroutine beyond the limit waits without blocking the loop until a thread frees a slot"""
+        limiter = AIMDLimiter('deleteListingsItem', initial_limit=1, max_limit=1)
+        limiter.acquire()
+
+        async def run():
+            waiter = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0.05)
+            blocked = not waiter.done()
+
+            threading.Thread(target=limiter.release, args=(0.1,)).start()
+            await asyncio.wait_for(waiter, timeout=1)
+            return blocked
+
+        assert asyncio.run(run()) is True
+        assert limiter._in_flight == 1
+
+    def test_history_records_changes(self):
+        """Test that limit changes are recorded over time"""
+        controller = ConcurrencyController(initial_limit=4)
+        limiter = controller.limiter('deleteListingsItem')
+        limiter.acquire()
+        limiter.release(0.1, throttled=True)
+
+        stats = controller.snapshot()['deleteListingsItem']
+        assert [limit for _, limit in stats['history']] == [4, 2]
+        assert stats['limit'] == 2
+        assert (stats['min'], stats['max']) == (2, 4)
+
+
+class TestConcurrencyMiddleware:
+    """Test the pipeline middleware around the controller"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.controller = ConcurrencyController(initial_limit=8)
+        self.middleware = ConcurrencyMiddleware(self.controller)
+        self.request = APIRequest(method='GET', url='https://example.test', operation='getInventorySummaries',
+                                  family='fba_inventory')
+
+    def test_throttled_response_reduces_limit(self):
+        """Test that a 429 response feeds back into the operation's limit"""
+        self.middleware(self.request, lambda request: Mock(status_code=429))
+
+        assert self.controller.limiter('getInventorySummaries').limit == 4
+
+    def test_exception_releases_slot(self):
+        """Test that a failed request frees its slot without changing the limit"""
+        with pytest.raises(ConnectionError):
+            self.middleware(self.request, Mock(side_effect=ConnectionError('reset')))
+
+        limiter = self.controller.limiter('getInventorySummaries')
+        assert limiter._in_flight == 0
+        assert limiter.limit == 8
@@ -28,6 +28,7 @@ class TestCleanupSettings:
         assert settings.log_level == 'INFO'
         assert settings.test_mode is False
         assert settings.test_sample_size == 10
+        assert settings.fba_inventory_mode == 'batch'
 
     def test_custom_values(self):
         """Test that custom values are set correctly"""
@@ -2,9 +2,10 @@
 Unit tests for data processing logic
 Tests SKU data validation, age calculation, and deletion eligibility
 """
+import asyncio
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from core.data_processor import DataProcessor
 
@@ -43,11 +44,13 @@ class TestDataProcessor:
         }]
 
         # Mock FBA API to return no inventory (returns safe defaults)
-        self.mock_api.check_fba_inventory.return_value = {
-            'sellerSku': 'TEST-SKU-001',
-            'fulfillableQuantity': 0,
-            'inboundQuantity': 0,
-            'reservedQuantity': 0
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'TEST-SKU-001': {
+                'sellerSku': 'TEST-SKU-001',
+                'fulfillableQuantity': 0,
+                'inboundQuantity': 0,
+                'reservedQuantity': 0
+            }
         }
 
         result = self.processor.process_sku_data(sku_data)
@@ -69,11 +72,13 @@ class TestDataProcessor:
         }]
 
         # Mock FBA API to return inventory
-        self.mock_api.check_fba_inventory.return_value = {
-            'sellerSku': 'TEST-SKU-WITH-INVENTORY',
-            'fulfillableQuantity': 5,
-            'inboundQuantity': 0,
-            'reservedQuantity': 0
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'TEST-SKU-WITH-INVENTORY': {
+                'sellerSku': 'TEST-SKU-WITH-INVENTORY',
+                'fulfillableQuantity': 5,
+                'inboundQuantity': 0,
+                'reservedQuantity': 0
+            }
         }
 
         result = self.processor.process_sku_data(sku_data)
@@ -124,11 +129,13 @@ class TestDataProcessor:
             }
         ]
 
-        self.mock_api.check_fba_inventory.return_value = {
-            'sellerSku': 'AMAZON-SKU',
-            'fulfillableQuantity': 0,
-            'inboundQuantity': 0,
-            'reservedQuantity': 0
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'AMAZON-SKU': {
+                'sellerSku': 'AMAZON-SKU',
+                'fulfillableQuantity': 0,
+                'inboundQuantity': 0,
+                'reservedQuantity': 0
+            }
         }
 
         result = self.processor.process_sku_data(sku_data)
@@ -155,11 +162,13 @@ class TestDataProcessor:
             'fulfillment_channel': 'AMAZON'
         }]
 
-        self.mock_api.check_fba_inventory.return_value = {
-            'sellerSku': 'EXACTLY-30-DAYS',
-            'fulfillableQuantity': 0,
-            'inboundQuantity': 0,
-            'reservedQuantity': 0
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'EXACTLY-30-DAYS': {
+                'sellerSku': 'EXACTLY-30-DAYS',
+                'fulfillableQuantity': 0,
+                'inboundQuantity': 0,
+                'reservedQuantity': 0
+            }
         }
 
         result = self.processor.process_sku_data(sku_data)
@@ -182,6 +191,108 @@ class TestDataProcessor:
             # If processed, should indicate the error
             assert 'error' in result[0] or not result[0]['is_eligible_for_deletion']
 
+    def test_old_fba_skus_checked_in_one_batch(self):
+        """Test that all old FBA SKUs in a batch share one batched inventory lookup"""
+        old_date = (datetime.now() - timedelta(days=60)).strftime('%d/%m/%Y')
+        young_date = (datetime.now() - timedelta(days=5)).strftime('%d/%m/%Y')
+        sku_data = [
+            {'sku': 'OLD-FBA-1', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'},
+            {'sku': 'YOUNG-FBA', 'created_date': young_date, 'fulfillment_channel': 'AMAZON'},
+            {'sku': 'OLD-FBA-2', 'created_date': old_date, 'fulfillment_channel': 'AMAZON_EU'},
+            {'sku': 'OLD-MERCHANT', 'created_date': old_date, 'fulfillment_channel': 'DEFAULT'}
+        ]
+
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'OLD-FBA-1': {'sellerSku': 'OLD-FBA-1', 'fulfillableQuantity': 0, 'inboundQuantity': 0},
+            'OLD-FBA-2': {'sellerSku': 'OLD-FBA-2', 'fulfillableQuantity': 3, 'inboundQuantity': 0}
+        }
+
+        result = self.processor.process_sku_data(sku_data)
+
+        self.mock_api.check_fba_inventory_batch.assert_called_once_with(['OLD-FBA-1', 'OLD-FBA-2'])
+        self.mock_api.check_fba_inventory.assert_not_called()
+        assert [sku['sku'] for sku in result] == ['OLD-FBA-1', 'YOUNG-FBA', 'OLD-FBA-2', 'OLD-MERCHANT']
+        assert result[0]['is_eligible_for_deletion'] is True
+        assert result[2]['is_eligible_for_deletion'] is False
+
+    def test_inventory_index_answers_without_api_calls(self):
+        """Test that a loaded FBA inventory snapshot replaces per-SKU API lookups"""
+        old_date = (datetime.now() - timedelta(days=60)).strftime('%d/%m/%Y')
+        sku_data = [
+            {'sku': 'IN-SNAPSHOT', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'},
+            {'sku': 'NOT-IN-SNAPSHOT', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'}
+        ]
+        self.processor.inventory_index = {
+            'IN-SNAPSHOT': {'sellerSku': 'IN-SNAPSHOT', 'fulfillableQuantity': 2, 'inboundQuantity': 0}
+        }
+
+        result = self.processor.process_sku_data(sku_data)
+
+        self.mock_api.check_fba_inventory_batch.assert_not_called()
+        self.mock_api.check_fba_inventory.assert_not_called()
+        assert result[0]['is_eligible_for_deletion'] is False
+        assert result[1]['is_eligible_for_deletion'] is True
+        assert result[1]['fba_inventory_check']['fulfillable_quantity'] == 0
+
+    def test_confirm_fba_candidates_drops_live_stock_and_errors(self):
+        """Test that report-based candidates are kept only when the live FBA check shows no stock"""
+        candidates = [
+            {'sku': 'EMPTY', 'fulfillment_channel': 'AMAZON', 'is_eligible_for_deletion': True},
+            {'sku': 'RESTOCKED', 'fulfillment_channel': 'AMAZON', 'is_eligible_for_deletion': True},
+            {'sku': 'INBOUND', 'fulfillment_channel': 'AMAZON_EU', 'is_eligible_for_deletion': True},
+            {'sku': 'FAILED', 'fulfillment_channel': 'AMAZON', 'is_eligible_for_deletion': True},
+            {'sku': 'MERCHANT', 'fulfillment_channel': 'DEFAULT', 'is_eligible_for_deletion': True}
+        ]
+        self.mock_api.check_fba_inventory_batch.return_value = {
+            'EMPTY': {'fulfillableQuantity': 0, 'inboundQuantity': 0},
+            'RESTOCKED': {'fulfillableQuantity': 4, 'inboundQuantity': 0},
+            'INBOUND': {'fulfillableQuantity': 0, 'inboundShippedQuantity': 2},
+            'FAILED': {'fulfillableQuantity': 0, 'error': 'timeout'}
+        }
+
+        confirmed = self.processor.confirm_fba_candidates(candidates)
+
+        self.mock_api.check_fba_inventory_batch.assert_called_once_with(['EMPTY', 'RESTOCKED', 'INBOUND', 'FAILED'])
+        assert [candidate['sku'] for candidate in confirmed] == ['EMPTY', 'MERCHANT']
+        assert candidates[1]['is_eligible_for_deletion'] is False
+
+    def _unresolved_batch_skus(self):
+        """Old FBA SKUs whose batch result carries an error next to zero quantities"""
+        old_date = (datetime.now() - timedelta(days=60)).strftime('%d/%m/%Y')
+        sku_data = [
+            {'sku': 'EMPTY', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'},
+            {'sku': 'UNRESOLVED', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'}
+        ]
+        batch_results = {
+            'EMPTY': {'sellerSku': 'EMPTY', 'fulfillableQuantity': 0, 'inboundQuantity': 0},
+            'UNRESOLVED': {'sellerSku': 'UNRESOLVED', 'fulfillableQuantity': 0, 'inboundQuantity': 0,
+                           'error': 'Invalid nextToken'}
+        }
+        return sku_data, batch_results
+
+    def test_failed_batch_result_is_not_eligible(self):
+        """Test that a batch result marked with an error is kept, not read as zero inventory"""
+        sku_data, batch_results = self._unresolved_batch_skus()
+        self.mock_api.check_fba_inventory_batch.return_value = batch_results
+
+        result = self.processor.process_sku_data(sku_data)
+
+        assert result[0]['is_eligible_for_deletion'] is True
+        assert result[1]['is_eligible_for_deletion'] is False
+        assert result[1]['fba_inventory_check']['error'] == 'Invalid nextToken'
+        assert result[1]['fba_inventory_check']['safe_decision'] is True
+
+    def test_failed_batch_result_is_not_eligible_async(self):
+        """Test that process_sku_data_async keeps SKUs whose batch result is marked with an error"""
+        sku_data, batch_results = self._unresolved_batch_skus()
+        self.mock_api.check_fba_inventory_batch = AsyncMock(return_value=batch_results)
+
+        result = asyncio.run(self.processor.process_sku_data_async(sku_data))
+
+        assert result[0]['is_eligible_for_deletion'] is True
+        assert result[1]['is_eligible_for_deletion'] is False
+        assert result[1]['fba_inventory_check']['error'] == 'Invalid nextToken'
+
 
 class TestDataProcessorIntegration:
     """Integration tests for data processor with real dependencies"""
@@ -192,7 +303,7 @@ class TestDataProcessorIntegration:
 
         # Simulate API failure
         processor.amazon_api = Mock()
-        processor.amazon_api.check_fba_inventory.side_effect = Exception("API Error")
+        processor.amazon_api.check_fba_inventory_batch.side_effect = Exception("API Error")
 
         sku_data = [{
             'sku': 'API-ERROR-SKU',
@@ -206,3 +317,72 @@ class TestDataProcessorIntegration:
         assert len(result) == 1
         assert result[0]['is_eligible_for_deletion'] is False  # Conservative approach
         assert 'error' in result[0]['fba_inventory_check']
+
+
+class TestConcurrentInventoryChecks:
+    """Test concurrent FBA inventory checking"""
+
+    def _old_fba_skus(self, count):
+        old_date = (datetime.now() - timedelta(days=60)).strftime('%d/%m/%Y')
+        return [{'sku': f'FBA-{i:04d}', 'created_date': old_date, 'fulfillment_channel': 'AMAZON'}
+                for i in range(count)]
+
+    def test_concurrent_mode_fans_out_chunks_and_keeps_order(self):
+        """Test that concurrent mode checks 50-SKU chunks in parallel and preserves output order"""
+        import threading
+
+        thread_names = set()
+
+        def check_batch(skus):
+            thread_names.add(threading.current_thread().name)
+            return {sku: {'sellerSku': sku, 'fulfillableQuantity': 1 if sku == 'FBA-0149' else 0} for sku in skus}
+
+        api = Mock()
+        api.check_fba_inventory_batch.side_effect = check_batch
+        processor = DataProcessor(amazon_api=api, max_workers=4)
+
+        result = processor.process_sku_data(self._old_fba_skus(150))
+
+        assert api.check_fba_inventory_batch.call_count == 3
+        assert all(len(call[0][0]) == 50 for call in api.check_fba_inventory_batch.call_args_list)
+        assert all(name.startswith('fba-inventory') for name in thread_names)
+        assert [sku['sku'] for sku in result] == [f'FBA-{i:04d}' for i in range(150)]
+        assert result[149]['is_eligible_for_deletion'] is False
+        assert sum(sku['is_eligible_for_deletion'] for sku in result) == 149
+
+    def test_failed_chunk_only_affects_its_skus(self):
+        """Test that a failing chunk keeps only its own SKUs conservative"""
+        def check_batch(skus):
+            if 'FBA-0060' in skus:
+                raise Exception("Connection timeout")
+            return {sku: {'sellerSku': sku, 'fulfillableQuantity': 0} for sku in skus}
+
+        api = Mock()
+        api.check_fba_inventory_batch.side_effect = check_batch
+        processor = DataProcessor(amazon_api=api, max_workers=2)
+
+        result = processor.process_sku_data(self._old_fba_skus(100))
+
+        assert all(sku['is_eligible_for_deletion'] for sku in result[:50])
+        assert not any(sku['is_eligible_for_deletion'] for sku in result[50:])
+        assert result[75]['fba_inventory_check']['error_type'] == 'network'
+
+    def test_sequential_mode_uses_single_call(self):
+        """Test that max_workers=1 leaves chunking to the API layer"""
+        api = Mock()
+        api.check_fba_inventory_batch.side_effect = lambda skus: {sku: {'fulfillableQuantity': 0} for sku in skus}
+        processor = DataProcessor(amazon_api=api)
+
+        processor.process_sku_data(self._old_fba_skus(120))
+
+        api.check_fba_inventory_batch.assert_called_once()
+
+    def test_max_workers_override_keeps_lookup_sequential(self):
+        """Test that callers already running batches in parallel can turn off the inner fan-out"""
+        api = Mock()
+        api.check_fba_inventory_batch.side_effect = lambda skus: {sku: {'fulfillableQuantity': 0} for sku in skus}
+        processor = DataProcessor(amazon_api=api, max_workers=4)
+
+        processor.process_sku_data(self._old_fba_skus(120), max_workers=1)
+
+        api.check_fba_inventory_batch.assert_called_once()
@@ -0,0 +1,116 @@
+"""
+Unit tests for concurrent SKU deletion
+Tests ordering, dry run, skip list and circuit breaker handling
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
+
+from core.deletion import DeletionExecutor
+from core.resilience import CircuitBreaker, CircuitBreakerConfig, CircuitBreakerState
+
+
+class TestDeletionExecutor:
+    """Test DeletionExecutor functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.api = Mock()
+        self.api.circuit_breakers = {'listings': CircuitBreaker('listings_api', CircuitBreakerConfig())}
+        self.skus = [{'sku': f'SKU-{i}'} for i in range(10)]
+
+    def test_results_keep_input_order(self):
+        """Test that concurrent deletions are collected in input order"""
+        def slow_delete(sku):
+            # Later SKUs finish first
+            time.sleep(0.001 * (10 - int(sku.split('-')[1])))
+            return {'status': 'ACCEPTED'}
+
+        self.api.delete_sku.side_effect = slow_delete
+        executor = DeletionExecutor(self.api, max_workers=4, dry_run=False)
+
+        results = executor.execute(self.skus)
+
+        assert results['deleted'] == [f'SKU-{i}' for i in range(10)]
+        assert self.api.delete_sku.call_count == 10
+
+    def test_deletions_run_concurrently(self):
+        """Test that several delete calls are in flight at once"""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def tracking_delete(sku):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+
+        self.api.delete_sku.side_effect = tracking_delete
+        DeletionExecutor(self.api, max_workers=4, dry_run=False).execute(self.skus)
+
+        assert 1 < peak <= 4
+
+    def test_dry_run_does_not_call_api(self):
+        """Test that dry run counts SKUs as deleted without deleting them"""
+        results = DeletionExecutor(self.api, max_workers=4, dry_run=True).execute(self.skus)
+
+        assert len(results['deleted']) == 10
+        self.api.delete_sku.assert_not_called()
+
+    def test_skip_list_and_errors(self):
+        """Test that skipped SKUs and failed deletions are reported separately"""
+        def delete(sku):
+            if sku == 'SKU-2':
+                raise Exception('HTTP 500')
+            return {}
+
+        self.api.delete_sku.side_effect = delete
+        executor = DeletionExecutor(self.api, max_workers=4, dry_run=False, should_skip=lambda sku: sku == 'SKU-1')
+
+        results = executor.execute(self.skus[:4])
+
+        assert results['deleted'] == ['SKU-0', 'SKU-3']
+        assert results['skipped'] == [{'sku': 'SKU-1', 'reason': 'in_skip_list'}]
+        assert results['errors'] == [{'sku': 'SKU-2', 'error': 'HTTP 500'}]
+
+    def test_stops_when_listings_circuit_opens(self):
+        """Test that remaining SKUs are skipped once the listings circuit breaker opens"""
+        breaker = self.api.circuit_breakers['listings']
+
+        def failing_delete(sku):
+            breaker.metrics.circuit_state = CircuitBreakerState.OPEN
+            raise Exception('HTTP 503')
+
+        self.api.delete_sku.side_effect = failing_delete
+        results = DeletionExecutor(self.api, max_workers=1, dry_run=False).execute(self.skus)
+
+        assert self.api.delete_sku.call_count == 1
+        assert results['errors'] == [{'sku': 'SKU-0', 'error': 'HTTP 503'}]
+        assert len(results['skipped']) == 9
+        assert all(item['reason'] == 'circuit_breaker_open' for item in results['skipped'])
+
+    def test_async_stops_when_listings_circuit_opens(self):
+        """Test that the event loop backend stops deleting once the listings circuit breaker opens"""
+        breaker = self.api.circuit_breakers['listings']
+
+        async def failing_delete(sku):
+            breaker.metrics.circuit_state = CircuitBreakerState.OPEN
+            raise Exception('HTTP 503')
+
+        self.api.delete_sku = AsyncMock(side_effect=failing_delete)
+        results = asyncio.run(DeletionExecutor(self.api, max_workers=2, dry_run=False).execute_async(self.skus))
+
+        assert self.api.delete_sku.await_count == 1
+        assert results['errors'] == [{'sku': 'SKU-0', 'error': 'HTTP 503'}]
+        assert len(results['skipped']) == 9
+        assert all(item['reason'] == 'circuit_breaker_open' for item in results['skipped'])
+
+    def test_empty_input(self):
+        """Test that no SKUs returns empty results"""
+        results = DeletionExecutor(self.api).execute([])
+        assert results == {'deleted': [], 'skipped': [], 'errors': [], 'execution_time': 0}
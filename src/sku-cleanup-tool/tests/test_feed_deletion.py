@@ -0,0 +1,136 @@
+"""
+Tests for bulk deletion through the Feeds API
+Runs the full feed flow against a local SP-API/S3 stub server
+"""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+from core.amazon_api import AmazonAPI
+from core.deletion import FeedDeletionExecutor
+
+
+class _FeedStubHandler(BaseHTTPRequestHandler):
+    """Minimal Feeds API and pre-signed S3 stub"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        server = self.server
+        self._read_body()
+        if self.path == '/feeds/2021-06-30/documents':
+            self._send_json({'feedDocumentId': 'in-1', 'url': f'{server.base_url}/upload/in-1'})
+        elif self.path == '/feeds/2021-06-30/feeds':
+            self._send_json({'feedId': 'F1'})
+        else:
+            self._send_json({}, status=404)
+
+    def do_PUT(self):
+        server = self.server
+        server.uploaded = json.loads(self._read_body().decode('utf-8'))
+        server.upload_content_type = self.headers.get('Content-Type')
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/feeds/2021-06-30/feeds/F1':
+            server.polls += 1
+            status = 'DONE' if server.polls > 1 else 'IN_PROGRESS'
+            self._send_json({'feedId': 'F1', 'processingStatus': status, 'resultFeedDocumentId': 'out-1'})
+        elif self.path == '/feeds/2021-06-30/documents/out-1':
+            self._send_json({'feedDocumentId': 'out-1', 'url': f'{server.base_url}/result/out-1',
+                             'compressionAlgorithm': 'GZIP'})
+        elif self.path == '/result/out-1':
+            issues = [
+                {'messageId': message['messageId'], 'code': '4000000', 'severity': 'ERROR',
+                 'message': 'SKU not found'}
+                for message in server.uploaded['messages'] if message['sku'].startswith('BAD')
+            ]
+            body = gzip.compress(json.dumps({'header': {'feedId': 'F1'}, 'issues': issues}).encode('utf-8'))
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json({}, status=404)
+
+
+class TestFeedDeletion:
+    """Test the JSON_LISTINGS_FEED deletion backend"""
+
+    def setup_method(self):
+        """Start the stub server and point an AmazonAPI at it"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _FeedStubHandler)
+        self.server.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.server.polls = 0
+        self.server.uploaded = None
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'ATVPDKIKX0DER'
+        self.credentials.seller_id = 'SELLER'
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+        self.api.rate_limiter = None
+        self.api.base_url = self.server.base_url
+        self.api._build_pipelines()
+
+    def teardown_method(self):
+        """Stop the stub server"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_feed_flow_against_local_stub(self):
+        """Test upload, feed creation, polling and processing report parsing end to end"""
+        with patch.object(self.api, '_get_access_token', return_value='token'), \
+             patch('core.amazon_api.time.sleep'):
+            outcomes = self.api.delete_skus_via_feed(['GOOD-1', 'BAD-2', 'GOOD-3'])
+
+        assert outcomes == {'GOOD-1': None, 'BAD-2': '4000000: SKU not found', 'GOOD-3': None}
+        assert self.server.upload_content_type == 'application/json; charset=UTF-8'
+        assert self.server.uploaded['header']['sellerId'] == 'SELLER'
+        assert self.server.uploaded['messages'][1] == {'messageId': 2, 'sku': 'BAD-2', 'operationType': 'DELETE'}
+        assert self.server.polls == 2
+
+    def test_executor_maps_outcomes_to_results(self):
+        """Test that feed outcomes fill the existing deleted/skipped/errors structure"""
+        with patch.object(self.api, '_get_access_token', return_value='token'), \
+             patch('core.amazon_api.time.sleep'):
+            executor = FeedDeletionExecutor(self.api, dry_run=False, should_skip=lambda sku: sku == 'KEEP')
+            results = executor.execute([{'sku': 'GOOD-1'}, {'sku': 'KEEP'}, {'sku': 'BAD-2'}])
+
+        assert results['deleted'] == ['GOOD-1']
+        assert results['skipped'] == [{'sku': 'KEEP', 'reason': 'in_skip_list'}]
+        assert results['errors'] == [{'sku': 'BAD-2', 'error': '4000000: SKU not found'}]
+
+    def test_feed_failure_marks_every_sku_as_error(self):
+        """Test that a failed submission reports each SKU in the feed as an error"""
+        with patch.object(self.api, '_make_api_request', side_effect=Exception('HTTP 503')):
+            outcomes = self.api.delete_skus_via_feed(['A', 'B'])
+
+        assert outcomes == {'A': 'HTTP 503', 'B': 'HTTP 503'}
+
+    def test_dry_run_submits_nothing(self):
+        """Test that dry run counts SKUs as deleted without submitting a feed"""
+        api = Mock()
+        results = FeedDeletionExecutor(api, dry_run=True).execute([{'sku': 'A'}, {'sku': 'B'}])
+
+        assert results['deleted'] == ['A', 'B']
+        api.delete_skus_via_feed.assert_not_called()
@@ -0,0 +1,159 @@
+"""
+Unit tests for the persisted FBA inventory snapshot
+Tests snapshot persistence, delta sync merging, and inbound re-checks
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from core.amazon_api import AmazonAPI
+from core.inventory_snapshot import InventorySnapshotStore, has_inbound_inventory
+
+
+class TestInventorySnapshotStore:
+    """Test snapshot persistence"""
+
+    def test_load_missing_snapshot(self, tmp_path):
+        """Test that a missing snapshot file loads as empty"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        assert store.load() == (None, None)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that a saved snapshot loads back with its sync time"""
+        store = InventorySnapshotStore(str(tmp_path / 'logs' / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        synced_at = datetime(2025, 10, 14, 6, 0, 0)
+        inventory = {'SKU-001': {'sellerSku': 'SKU-001', 'fulfillableQuantity': 3}}
+
+        store.save(inventory, synced_at)
+
+        assert store.load() == (inventory, synced_at)
+        assert not (tmp_path / 'logs' / 'snapshot.json.tmp').exists()
+
+    def test_snapshot_for_other_marketplace_is_ignored(self, tmp_path):
+        """Test that a snapshot taken for another marketplace is not reused"""
+        path = str(tmp_path / 'snapshot.json')
+        InventorySnapshotStore(path, 'ATVPDKIKX0DER').save({'SKU-001': {}}, datetime(2025, 10, 14))
+
+        assert InventorySnapshotStore(path, 'A1F83G8C2ARO7P').load() == (None, None)
+
+    def test_corrupted_snapshot_is_ignored(self, tmp_path):
+        """Test that an unreadable snapshot falls back to a full sync"""
+        path = tmp_path / 'snapshot.json'
+        path.write_text('{not json')
+
+        assert InventorySnapshotStore(str(path), 'A1F83G8C2ARO7P').load() == (None, None)
+
+    def test_has_inbound_inventory(self):
+        """Test inbound detection across basic and detailed quantity fields"""
+        assert has_inbound_inventory({'inboundShippedQuantity': 2}) is True
+        assert has_inbound_inventory({'inboundQuantity': 1}) is True
+        assert has_inbound_inventory({'fulfillableQuantity': 5, 'inboundWorkingQuantity': 0}) is False
+
+
+class TestInventorySnapshotSync:
+    """Test delta sync of the persisted snapshot through AmazonAPI"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'A1F83G8C2ARO7P'
+
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+
+    def test_full_snapshot_when_nothing_persisted(self, tmp_path):
+        """Test that the first run takes and persists a full snapshot"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        full = {'SKU-001': {'sellerSku': 'SKU-001', 'fulfillableQuantity': 1}}
+
+        with patch.object(self.api, 'get_fba_inventory_snapshot', return_value=full), \
+             patch.object(self.api, 'get_fba_inventory_changes') as mock_changes:
+            snapshot = self.api.sync_fba_inventory_snapshot(store)
+
+        mock_changes.assert_not_called()
+        assert snapshot == full
+        assert store.load()[0] == full
+
+    def test_delta_sync_merges_changes_and_rechecks_inbound(self, tmp_path):
+        """Test that a delta sync merges changes and re-checks only SKUs with inbound stock"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        last_sync = datetime.utcnow() - timedelta(hours=24)
+        store.save({
+            'CHANGED': {'sellerSku': 'CHANGED', 'fulfillableQuantity': 5},
+            'INBOUND': {'sellerSku': 'INBOUND', 'fulfillableQuantity': 0, 'inboundShippedQuantity': 4},
+            'STABLE': {'sellerSku': 'STABLE', 'fulfillableQuantity': 2}
+        }, last_sync)
+
+        changes = {'CHANGED': {'sellerSku': 'CHANGED', 'fulfillableQuantity': 0}}
+        rechecked = {'INBOUND': {'sellerSku': 'INBOUND', 'fulfillableQuantity': 4, 'inboundShippedQuantity': 0}}
+
+        with patch.object(self.api, 'get_fba_inventory_snapshot') as mock_full, \
+             patch.object(self.api, 'get_fba_inventory_changes', return_value=changes) as mock_changes, \
+             patch.object(self.api, 'check_fba_inventory_batch', return_value=rechecked) as mock_batch:
+            snapshot = self.api.sync_fba_inventory_snapshot(store)
+
+        mock_full.assert_not_called()
+        mock_changes.assert_called_once_with(last_sync)
+        mock_batch.assert_called_once_with(['INBOUND'])
+        assert snapshot['CHANGED']['fulfillableQuantity'] == 0
+        assert snapshot['INBOUND']['fulfillableQuantity'] == 4
+        assert snapshot['STABLE']['fulfillableQuantity'] == 2
+        assert store.load()[1] > last_sync
+
+    def test_failed_inbound_recheck_keeps_previous_entry(self, tmp_path):
+        """Test that an errored re-check does not overwrite the conservative previous entry"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        previous = {'sellerSku': 'INBOUND', 'fulfillableQuantity': 0, 'inboundWorkingQuantity': 6}
+        store.save({'INBOUND': previous}, datetime.utcnow() - timedelta(hours=1))
+
+        failed = {'INBOUND': {'sellerSku': 'INBOUND', 'fulfillableQuantity': 0, 'error': 'API Error'}}
+
+        with patch.object(self.api, 'get_fba_inventory_changes', return_value={}), \
+             patch.object(self.api, 'check_fba_inventory_batch', return_value=failed):
+            snapshot = self.api.sync_fba_inventory_snapshot(store)
+
+        assert snapshot['INBOUND'] == previous
+
+    def test_rejected_inbound_recheck_page_keeps_previous_entry(self, tmp_path):
+        """Test that a re-check page rejected by the API is not saved as zero inventory"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        previous = {
+            'A': {'sellerSku': 'A', 'fulfillableQuantity': 0, 'inboundShippedQuantity': 3},
+            'B': {'sellerSku': 'B', 'fulfillableQuantity': 0, 'inboundWorkingQuantity': 6}
+        }
+        store.save(previous, datetime.utcnow() - timedelta(hours=1))
+
+        first_page = {
+            'payload': {'inventorySummaries': [{'sellerSku': 'A', 'inventoryDetails': {'fulfillableQuantity': 3}}]},
+            'pagination': {'nextToken': 'expired'}
+        }
+
+        with patch.object(self.api, 'get_fba_inventory_changes', return_value={}), \
+             patch.object(self.api, '_make_api_request', side_effect=[first_page, {'_status_code': 400}]):
+            snapshot = self.api.sync_fba_inventory_snapshot(store)
+
+        assert snapshot['A']['fulfillableQuantity'] == 3
+        assert snapshot['B'] == previous['B']
+        assert store.load()[0]['B'] == previous['B']
+
+    def test_stale_snapshot_forces_full_sync(self, tmp_path):
+        """Test that a snapshot older than max_age_hours is replaced by a full one"""
+        store = InventorySnapshotStore(str(tmp_path / 'snapshot.json'), 'A1F83G8C2ARO7P')
+        store.save({'OLD': {'sellerSku': 'OLD'}}, datetime.utcnow() - timedelta(days=30))
+
+        with patch.object(self.api, 'get_fba_inventory_snapshot', return_value={}) as mock_full, \
+             patch.object(self.api, 'get_fba_inventory_changes') as mock_changes:
+            snapshot = self.api.sync_fba_inventory_snapshot(store, max_age_hours=168)
+
+        mock_full.assert_called_once()
+        mock_changes.assert_not_called()
+        assert snapshot == {}
+
+    def test_changes_request_uses_start_date_time(self):
+        """Test that the delta request passes startDateTime in ISO8601 UTC"""
+        page = {'payload': {'inventorySummaries': []}}
+
+        with patch.object(self.api, '_make_api_request', return_value=page) as mock_request:
+            self.api.get_fba_inventory_changes(datetime(2025, 10, 14, 6, 30, 0))
+
+        assert 'startDateTime=2025-10-14T06%3A30%3A00Z' in mock_request.call_args[0][1]
@@ -179,6 +179,30 @@ class TestPerformanceMetrics:
         variance = (max_time - min_time) / avg_time
         assert variance < 0.5, f"Inconsistent processing times: {variance*100}% variance"
 
+    def test_steady_state_processing_speed(self):
+        """Test that per-SKU cost is linear once the one-time first-call cost is paid"""
+        processor = DataProcessor()
+        small_data = self._generate_test_sku_data(1000)
+        large_data = self._generate_test_sku_data(5000)
+
+        # The first call in a process pays a fixed ~0.5ms for NumPy datetime setup and
+        # interpreter warm-up. That is accepted per run, so it is left out of this measurement.
+        # Sizes start at 1000 so the fixed per-call logging does not hide the per-SKU cost.
+        processor.process_sku_data(small_data)
+
+        def best_time(sku_data):
+            times = []
+            for _ in range(5):
+                start_time = time.perf_counter()
+                processor.process_sku_data(sku_data)
+                times.append(time.perf_counter() - start_time)
+            return min(times)
+
+        actual_ratio = best_time(large_data) / best_time(small_data)
+
+        # 5x more data - allow the same ±50% variance as the benchmark above
+        assert 3 <= actual_ratio <= 7.5, f"Steady-state scaling issue: expected ~5x, got {actual_ratio}x"
+
     def _generate_test_sku_data(self, count):
         """Generate test SKU data for performance testing"""
         sku_data = []
@@ -0,0 +1,108 @@
+"""
+Unit tests for the streaming cleanup pipeline
+Tests stage overlap, bounded queues, per-stage concurrency and error handling
+"""
+import threading
+import time
+
+import pytest
+
+from core.pipeline import Stage, StreamingPipeline
+
+
+class TestStreamingPipeline:
+    """Test StreamingPipeline functionality"""
+
+    def test_last_stage_starts_before_source_finishes(self):
+        """Test that the first batch reaches the last stage while the source is still producing"""
+        delivered = threading.Event()
+
+        def source():
+            yield 1
+            # Keep parsing until the first batch has been "deleted"
+            assert delivered.wait(timeout=5)
+            yield 2
+
+        seen = []
+        stages = [
+            Stage('double', lambda batch: batch * 2),
+            Stage('delete', lambda batch: seen.append(batch) or delivered.set())
+        ]
+
+        StreamingPipeline(stages).run(source())
+
+        assert seen == [2, 4]
+
+    def test_queues_bound_how_far_the_source_runs_ahead(self):
+        """Test that a blocked stage stops the source once the queues between them are full"""
+        release = threading.Event()
+        produced = []
+
+        def source():
+            for batch in range(1, 21):
+                produced.append(batch)
+                yield batch
+
+        def blocked(batch):
+            release.wait(timeout=5)
+            return batch
+
+        pipeline = StreamingPipeline([Stage('blocked', blocked)], queue_size=2)
+        runner = threading.Thread(target=pipeline.run, args=(source(),))
+        runner.start()
+        time.sleep(0.2)
+
+        # One batch in the stage, two queued and one waiting to be put
+        assert len(produced) <= 4
+        release.set()
+        runner.join(timeout=5)
+        assert len(produced) == 20
+
+    def test_stage_workers_run_concurrently(self):
+        """Test that a stage with several workers processes batches at the same time"""
+        barrier = threading.Barrier(3, timeout=5)
+        results = []
+
+        def check(batch):
+            # Only passes once all three batches are in flight together
+            barrier.wait()
+            return batch
+
+        stages = [Stage('inventory', check, workers=3), Stage('collect', results.append)]
+
+        stats = StreamingPipeline(stages).run(iter([1, 2, 3]))
+
+        assert sorted(results) == [1, 2, 3]
+        assert stats['inventory'].workers == 3
+        assert stats['inventory'].batches_out == 3
+
+    def test_failed_batch_is_dropped(self):
+        """Test that a stage error drops that batch and later batches keep flowing"""
+        results = []
+
+        def check(batch):
+            if batch == 2:
+                raise ValueError("inventory lookup failed")
+            return batch
+
+        stats = StreamingPipeline([Stage('inventory', check), Stage('collect', results.append)]).run(iter([1, 2, 3]))
+
+        assert results == [1, 3]
+        assert stats['inventory'].errors == 1
+        assert stats['inventory'].batches_in == 3
+
+    def test_source_error_raised_after_draining(self):
+        """Test that batches parsed before a report failure still finish before the error is raised"""
+        results = []
+
+        def source():
+            yield 1
+            raise IOError("report download interrupted")
+
+        pipeline = StreamingPipeline([Stage('collect', results.append)])
+
+        with pytest.raises(IOError):
+            pipeline.run(source())
+
+        assert results == [1]
+        assert pipeline.stats['parse'].errors == 1
@@ -0,0 +1,176 @@
+"""
+Unit tests for the on-disk report document cache
+Tests hits, TTL expiry, eviction and AmazonAPI integration
+"""
+import io
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+
+from core.amazon_api import AmazonAPI, MERCHANT_LISTINGS_REPORT_TYPE
+from core.report_cache import ReportDocumentCache
+
+TSV = "seller-sku\tquantity\nSKU-1\t1\nSKU-2\t0\n"
+
+
+class TestReportDocumentCache:
+    """Test ReportDocumentCache functionality"""
+
+    def _store(self, cache, document_id, content=TSV, marketplace_id='M1'):
+        """Write a document into the cache"""
+        with cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, document_id, marketplace_id) as sink:
+            sink.write(content)
+
+    def test_round_trip(self, tmp_path):
+        """Test that a stored document is read back unchanged"""
+        cache = ReportDocumentCache(str(tmp_path))
+        self._store(cache, 'doc-1')
+
+        with cache.open(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1') as cached:
+            assert cached.read() == TSV
+        assert any(name.endswith('.tsv.gz') for name in os.listdir(tmp_path))
+
+    def test_miss_for_other_report_type(self, tmp_path):
+        """Test that the key includes the report type"""
+        cache = ReportDocumentCache(str(tmp_path))
+        self._store(cache, 'doc-1')
+
+        assert cache.open('GET_FBA_MYI_ALL_INVENTORY_DATA', 'doc-1') is None
+
+    def test_expired_entry_is_a_miss(self, tmp_path):
+        """Test that entries older than the TTL are not served"""
+        cache = ReportDocumentCache(str(tmp_path), ttl_seconds=60)
+        self._store(cache, 'doc-1')
+
+        with patch('core.report_cache.time.time', return_value=time.time() + 120):
+            assert cache.open(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1') is None
+        assert os.listdir(tmp_path) == []
+
+    def test_evicts_oldest_beyond_max_entries(self, tmp_path):
+        """Test that only the newest max_entries documents are kept"""
+        cache = ReportDocumentCache(str(tmp_path), max_entries=2)
+        for index in range(3):
+            with patch('core.report_cache.time.time', return_value=1000.0 + index):
+                self._store(cache, f'doc-{index}')
+
+        with patch('core.report_cache.time.time', return_value=1010.0):
+            assert cache.open(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-0') is None
+            assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'M1', 3600) == 'doc-2'
+
+    def test_interrupted_write_is_not_cached(self, tmp_path):
+        """Test that a partially written document never becomes visible"""
+        cache = ReportDocumentCache(str(tmp_path))
+
+        with pytest.raises(RuntimeError):
+            with cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1', 'M1') as sink:
+                sink.write("seller-sku\n")
+                raise RuntimeError("connection dropped")
+
+        assert cache.open(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1') is None
+        assert os.listdir(tmp_path) == []
+
+    def test_latest_respects_marketplace_and_max_age(self, tmp_path):
+        """Test that latest only returns fresh documents for the same marketplace"""
+        cache = ReportDocumentCache(str(tmp_path))
+        self._store(cache, 'doc-uk', marketplace_id='UK')
+
+        assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'US', 3600) is None
+        assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'UK', 3600) == 'doc-uk'
+        with patch('core.report_cache.time.time', return_value=time.time() + 7200):
+            assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'UK', 3600) is None
+
+    def test_freshness_measured_from_report_generation(self, tmp_path):
+        """Test that a report cached long after Amazon generated it is not reused past the window"""
+        cache = ReportDocumentCache(str(tmp_path))
+        with cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-old', 'M1', generated_at=time.time() - 3000) as sink:
+            sink.write(TSV)
+        with cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-new', 'M1', generated_at=time.time() - 60) as sink:
+            sink.write(TSV)
+
+        assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'M1', 3600) == 'doc-new'
+        os.remove(os.path.join(tmp_path, cache._key(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-new') + '.json'))
+        assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'M1', 3600) == 'doc-old'
+        assert cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'M1', 1800) is None
+
+
+class TestAmazonAPIReportCache:
+    """Test report cache integration in AmazonAPI"""
+
+    def setup_method(self):
+        """Set up cache test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'M1'
+
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+
+    def test_second_download_is_served_from_cache(self, tmp_path):
+        """Test that a downloaded document is cached and reused without another download"""
+        self.api.report_cache = ReportDocumentCache(str(tmp_path))
+        download = MagicMock()
+        download.__enter__.return_value = download
+        download.raw = io.BytesIO(TSV.encode())
+        download.encoding = 'utf-8'
+
+        with patch.object(self.api, '_make_api_request', return_value={'url': 'https://example.com/doc'}) as mock_request, \
+             patch.object(self.api.session, 'get', return_value=download) as mock_get:
+            first = self.api._download_report('doc-1')
+            second = self.api._download_report('doc-1')
+
+        assert [sku['sku'] for sku in first] == ['SKU-1', 'SKU-2']
+        assert second == first
+        assert mock_get.call_count == 1
+        assert mock_request.call_count == 1
+
+    def test_listings_table_reloads_details_from_cache(self, tmp_path):
+        """Test that listings keep only decision fields and reload item details from the cached document"""
+        self.api.report_cache = ReportDocumentCache(str(tmp_path))
+        with self.api.report_cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1', 'M1') as sink:
+            sink.write("seller-sku\titem-name\titem-description\nSKU-1\tMug\tA large mug\nSKU-2\tCup\tA cup\n")
+
+        with patch.object(self.api, '_make_api_request') as mock_request:
+            listings = self.api.get_merchant_listings()
+            details = listings[1].details()
+
+        mock_request.assert_not_called()
+        assert 'item_description' not in listings[1]
+        assert details['item_name'] == 'Cup'
+        assert details['item_description'] == 'A cup'
+
+    def test_recent_cached_report_skips_api(self, tmp_path):
+        """Test that a fresh cached listings report is reused without calling getReports"""
+        self.api.report_cache = ReportDocumentCache(str(tmp_path))
+        with self.api.report_cache.writer(MERCHANT_LISTINGS_REPORT_TYPE, 'doc-1', 'M1') as sink:
+            sink.write(TSV)
+
+        with patch.object(self.api, '_make_api_request') as mock_request:
+            listings = self.api.get_merchant_listings()
+
+        mock_request.assert_not_called()
+        assert len(listings) == 2
+
+    def test_reused_report_cached_with_its_generation_time(self, tmp_path):
+        """Test that a reused report's document is aged from processingEndTime, not the download time"""
+        self.api.report_cache = ReportDocumentCache(str(tmp_path))
+        finished = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=50)
+        reports = {'reports': [{
+            'reportId': 'R1',
+            'processingStatus': 'DONE',
+            'reportDocumentId': 'doc-1',
+            'processingEndTime': finished.isoformat()
+        }]}
+        download = MagicMock()
+        download.__enter__.return_value = download
+        download.raw = io.BytesIO(TSV.encode())
+        download.encoding = 'utf-8'
+
+        with patch.object(self.api, '_make_api_request', side_effect=[reports, {'url': 'https://example.com/doc'}]), \
+             patch.object(self.api.session, 'get', return_value=download):
+            self.api.get_merchant_listings()
+
+        (entry,) = self.api.report_cache._entries()
+        assert entry['generated_at'] == finished.timestamp()
+        # Cached just now, but already too old for a 30 minute reuse window
+        assert self.api.report_cache.latest(MERCHANT_LISTINGS_REPORT_TYPE, 'M1', 30 * 60) is None
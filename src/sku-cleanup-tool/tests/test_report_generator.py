@@ -8,6 +8,7 @@ import tempfile
 import os
 from pathlib import Path
 
+from core.sku_table import SkuTable
 from report_generator import ReportGenerator
 
 
@@ -118,6 +119,30 @@ class TestReportGenerator:
         assert '**SKUs Processed per Second:** 8.30' in content  # 1000/120.5 ≈ 8.30
         assert '**Success Rate:** 5.0%' in content
 
+    def test_generate_report_lists_candidates_from_sku_table(self):
+        """Test that deletion candidates are listed from SkuTable rows"""
+        candidates = SkuTable.from_records([
+            {'sku': 'OLD-1', 'fulfillment_channel': 'DEFAULT', 'age_days': 400},
+            {'sku': 'OLD-2', 'fulfillment_channel': 'AMAZON_EU', 'age_days': 95}
+        ])
+        test_results = {
+            'total_processed': 2,
+            'eligible_for_deletion': 2,
+            'deleted': [],
+            'skipped': [],
+            'errors': [],
+            'execution_time': 1.0
+        }
+
+        report_path = self.generator.generate_report(test_results, candidates=candidates)
+
+        with open(report_path, 'r') as f:
+            content = f.read()
+
+        assert '## Deletion Candidates (2)' in content
+        assert '| OLD-1 | 400 | DEFAULT |' in content
+        assert '| OLD-2 | 95 | AMAZON_EU |' in content
+
     def test_build_report_content_structure(self):
         """Test the structure of generated report content"""
         test_results = {
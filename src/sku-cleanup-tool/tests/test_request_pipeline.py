@@ -0,0 +1,155 @@
+"""
+Unit tests for the request middleware pipeline
+Tests composition order, metrics, response handling and per-instance pipelines
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from core.amazon_api import AmazonAPI
+from core.request_pipeline import (
+    APIRequest,
+    AuthMiddleware,
+    CircuitBreakerMiddleware,
+    MetricsMiddleware,
+    RequestMetrics,
+    ResponseMiddleware,
+    RetryMiddleware,
+    compose
+)
+from core.resilience import CircuitBreaker, CircuitBreakerConfig, RetryPolicy
+
+
+def make_request(**overrides):
+    """Build a request for pipeline tests"""
+    values = {'method': 'GET', 'url': 'https://example.test/x', 'operation': 'getListingsItem', 'family': 'listings'}
+    values.update(overrides)
+    return APIRequest(**values)
+
+
+class TestRequestPipeline:
+    """Test middleware composition and individual middleware"""
+
+    def test_compose_runs_middleware_outermost_first(self):
+        """Test that middleware wraps the handler in the order given"""
+        calls = []
+
+        def layer(name):
+            def middleware(request, next_handler):
+                calls.append(f'{name}-in')
+                result = next_handler(request)
+                calls.append(f'{name}-out')
+                return result
+            return middleware
+
+        pipeline = compose([layer('outer'), layer('inner')], lambda request: calls.append('handler') or 'done')
+
+        assert pipeline(make_request()) == 'done'
+        assert calls == ['outer-in', 'inner-in', 'handler', 'inner-out', 'outer-out']
+        assert len(pipeline.middlewares) == 2
+
+    def test_metrics_record_success_and_failure(self):
+        """Test that metrics count calls and errors per operation"""
+        metrics = RequestMetrics()
+        middleware = MetricsMiddleware(metrics)
+
+        middleware(make_request(), lambda request: {})
+        with pytest.raises(ValueError):
+            middleware(make_request(), Mock(side_effect=ValueError('boom')))
+
+        stats = metrics.snapshot()['getListingsItem']
+        assert stats['calls'] == 2
+        assert stats['errors'] == 1
+        assert stats['avg_seconds'] >= 0
+
+    def test_response_middleware_handles_expected_errors(self):
+        """Test that expected status codes become markers instead of exceptions"""
+        response = Mock(status_code=404, text='not found')
+
+        result = ResponseMiddleware()(make_request(expected_errors=[404]), lambda request: response)
+
+        assert result == {'_status_code': 404, '_response_text': 'not found'}
+        response.raise_for_status.assert_not_called()
+
+    def test_auth_middleware_sets_token_each_attempt(self):
+        """Test that a fresh token is attached on every attempt"""
+        provider = Mock(side_effect=['token-1', 'token-2'])
+        middleware = AuthMiddleware(provider)
+        seen = []
+
+        for _ in range(2):
+            middleware(make_request(), lambda request: seen.append(request.headers['x-amz-access-token']))
+
+        assert seen == ['token-1', 'token-2']
+
+    def test_retry_wraps_inner_layers(self):
+        """Test that retries repeat the layers inside the retry middleware"""
+        handler = Mock(side_effect=[requests.exceptions.ConnectionError('reset'), {'ok': True}])
+        retry = RetryMiddleware(RetryPolicy(max_retries=2, base_delay=0, max_delay=0, backoff_factor=1, jitter=False))
+
+        with patch('core.resilience.time.sleep'):
+            result = retry(make_request(), handler)
+
+        assert result == {'ok': True}
+        assert handler.call_count == 2
+
+    def test_circuit_breaker_middleware_uses_shared_breaker(self):
+        """Test that failures through the middleware are recorded on the family breaker"""
+        breaker = CircuitBreaker('listings_api', CircuitBreakerConfig(failure_threshold=1))
+        middleware = CircuitBreakerMiddleware(breaker)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            middleware(make_request(), Mock(side_effect=requests.exceptions.HTTPError('500')))
+
+        assert breaker.metrics.error_count == 1
+
+
+class TestAmazonAPIPipelines:
+    """Test the pipelines AmazonAPI composes at construction"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.credentials = Mock()
+        self.credentials.marketplace_id = 'ATVPDKIKX0DER'
+        with patch('boto3.Session'):
+            self.api = AmazonAPI(self.credentials)
+
+    def test_pipeline_per_endpoint_family(self):
+        """Test that each endpoint family gets its own pipeline built once"""
+        assert set(self.api.pipelines) == set(self.api.circuit_breakers)
+        assert self.api.base_url == 'https://sellingpartnerapi-na.amazon.com'
+
+        for family in ('listings', 'fba_inventory'):
+            layers = [type(layer) for layer in self.api.pipelines[family].middlewares]
+            assert layers[:3] == [MetricsMiddleware, CircuitBreakerMiddleware, RetryMiddleware]
+
+    def test_request_goes_through_pipeline(self):
+        """Test that _make_api_request sends through the composed pipeline and records metrics"""
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {'sku': 'SKU-001'}
+
+        with patch.object(self.api, '_get_access_token', return_value='token'), \
+             patch.object(self.api.session, 'request', return_value=response) as mock_request:
+            result = self.api._make_api_request('GET', '/listings/2021-08-01/items/SELLER/SKU-001')
+
+        assert result == {'sku': 'SKU-001'}
+        args, kwargs = mock_request.call_args
+        assert args == ('GET', 'https://sellingpartnerapi-na.amazon.com/listings/2021-08-01/items/SELLER/SKU-001')
+        assert kwargs['headers']['x-amz-access-token'] == 'token'
+        assert self.api.request_metrics.snapshot()['getListingsItem']['calls'] == 1
+
+    def test_failed_token_refresh_retried_by_one_layer(self):
+        """Test that a failing LWA refresh is retried only by the pipeline's RetryMiddleware"""
+        self.api.token_manager.cache = None
+        self.api.retry_policy.max_retries = 2
+        self.api.retry_policy.budget = None
+
+        with patch.object(self.api.session, 'post', side_effect=requests.ConnectionError("LWA unreachable")) as mock_post, \
+             patch.object(self.api.session, 'request') as mock_request, \
+             patch('core.resilience.time.sleep'):
+            with pytest.raises(requests.ConnectionError):
+                self.api._make_api_request('GET', '/listings/2021-08-01/items/SELLER/SKU-001')
+
+        assert mock_post.call_count == 3
+        mock_request.assert_not_called()
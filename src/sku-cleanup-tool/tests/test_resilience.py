@@ -2,21 +2,33 @@
 Comprehensive tests for API resilience patterns
 Tests exponential backoff, connection pooling, circuit breaker, and error handling
 """
+import asyncio
 import time
 import pytest
 import requests
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from requests.exceptions import ConnectionError, Timeout, HTTPError
 
 from core.resilience import (
     exponential_backoff,
+    async_exponential_backoff,
+    AsyncCircuitBreaker,
     CircuitBreaker,
     CircuitBreakerConfig,
     CircuitBreakerState,
     ErrorType,
     ResilienceMetrics,
     create_session_with_pool,
-    get_api_session
+    get_api_session,
+    get_rate_limiter,
+    RateLimit,
+    RateLimiter,
+    RetryBudget,
+    RetryPolicy,
+    SlidingWindowCounter,
+    TokenBucket,
+    DEFAULT_RATE_LIMITS,
+    server_retry_delay
 )
 from core.config import ResilienceSettings, CleanupSettings, Config
 
@@ -132,12 +144,11 @@ class TestCircuitBreaker:
             failing_call()
         assert call_count == 2
 
-        # Third call should be blocked by circuit breaker (now in half-open state)
+        # Third call should be blocked by the now open circuit breaker
         with pytest.raises(Exception) as exc_info:
             failing_call()
-        # The circuit breaker should either be open or the call should fail
-        assert "Circuit breaker 'test_api' is OPEN" in str(exc_info.value) or "API Error" in str(exc_info.value)
-        assert call_count == 3  # Should increment if call goes through
+        assert "Circuit breaker 'test_api' is OPEN" in str(exc_info.value)
+        assert call_count == 2  # Blocked call never reaches the API
 
     def test_circuit_breaker_half_open_recovery(self):
         """Test circuit breaker transitions to half-open for recovery"""
@@ -193,6 +204,228 @@ class TestCircuitBreaker:
         assert error_type == ErrorType.NETWORK
 
 
+class TestSlidingWindowCircuitBreaker:
+    """Test the time-windowed, 429-aware circuit breaker"""
+
+    def test_window_forgets_old_calls(self):
+        """Test that calls older than the window no longer count"""
+        window = SlidingWindowCounter(window_seconds=10, buckets=5)
+        window.record(False, now=100.0)
+        window.record(True, now=105.0)
+
+        assert window.totals(now=106.0) == (1, 1)
+        assert window.totals(now=111.0) == (1, 0)
+        assert window.totals(now=120.0) == (0, 0)
+
+    def test_old_successes_do_not_hide_recent_failures(self):
+        """Test that a burst of recent failures opens the circuit despite a long healthy history"""
+        cb = CircuitBreaker("test_api", CircuitBreakerConfig(failure_threshold=3, window_seconds=10, window_buckets=5))
+
+        with patch('core.resilience.time.monotonic', return_value=0.0):
+            for _ in range(100):
+                cb._record_success(False)
+
+        with patch('core.resilience.time.monotonic', return_value=60.0):
+            for _ in range(3):
+                cb._record_failure(requests.RequestException("API Error"), False)
+
+        assert cb.metrics.circuit_state == CircuitBreakerState.OPEN
+
+    def test_rate_limit_errors_do_not_open_circuit(self):
+        """Test that 429s are counted as throttling rather than failures"""
+        cb = CircuitBreaker("test_api", CircuitBreakerConfig(failure_threshold=1))
+        throttled = HTTPError("429")
+        throttled.response = Mock(status_code=429, headers={})
+
+        @cb
+        def throttled_call():
+            raise throttled
+
+        for _ in range(5):
+            with pytest.raises(HTTPError):
+                throttled_call()
+
+        assert cb.metrics.circuit_state == CircuitBreakerState.CLOSED
+        assert cb.metrics.throttle_count == 5
+        assert cb.metrics.error_count == 0
+
+    def test_half_open_limits_probe_concurrency(self):
+        """Test that only half_open_max_calls probes run while recovering"""
+        cb = CircuitBreaker("test_api", CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0, half_open_max_calls=1))
+        cb._record_failure(requests.RequestException("API Error"), False)
+        assert cb.metrics.circuit_state == CircuitBreakerState.OPEN
+
+        assert cb._acquire() is True
+        assert cb.metrics.circuit_state == CircuitBreakerState.HALF_OPEN
+        with pytest.raises(Exception, match="is HALF_OPEN"):
+            cb._acquire()
+
+        cb._record_success(True)
+        assert cb.metrics.circuit_state == CircuitBreakerState.CLOSED
+        assert cb._acquire() is False
+
+    def test_rate_limiter_drains_on_throttle(self):
+        """Test that a throttle signal makes the next caller wait for a fresh token"""
+        limiter = RateLimiter({'testOp': RateLimit(rate=10.0, burst=5)})
+        limiter.record_throttle('testOp')
+
+        assert limiter._get_bucket('testOp').reserve() > 0
+
+
+class TestAsyncResilience:
+    """Test coroutine variants of retry and circuit breaker"""
+
+    def test_async_retry_then_success(self):
+        """Test that async backoff retries a failing coroutine"""
+        call_count = 0
+
+        @async_exponential_backoff(max_retries=2, base_delay=0.01, jitter=False)
+        async def flaky_call():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise ConnectionError("Network error")
+            return "success"
+
+        assert asyncio.run(flaky_call()) == "success"
+        assert call_count == 2
+
+    def test_async_retry_skips_unlisted_exceptions(self):
+        """Test that exceptions outside retry_on are raised immediately"""
+        call_count = 0
+
+        @async_exponential_backoff(max_retries=3, base_delay=0.01, retry_on=(ConnectionError,))
+        async def failing_call():
+            nonlocal call_count
+            call_count += 1
+            raise ValueError("Bad input")
+
+        with pytest.raises(ValueError):
+            asyncio.run(failing_call())
+        assert call_count == 1
+
+    def test_async_circuit_breaker_opens(self):
+        """Test that the async circuit breaker blocks calls once open"""
+        cb = AsyncCircuitBreaker("async_api", CircuitBreakerConfig(failure_threshold=1, recovery_timeout=60))
+
+        should_fail = False
+
+        @cb
+        async def api_call():
+            if should_fail:
+                raise requests.RequestException("API Error")
+            return "success"
+
+        assert asyncio.run(api_call()) == "success"
+
+        should_fail = True
+        with pytest.raises(requests.RequestException):
+            asyncio.run(api_call())
+
+        assert cb.metrics.circuit_state == CircuitBreakerState.OPEN
+        with pytest.raises(Exception, match="Circuit breaker 'async_api' is OPEN"):
+            asyncio.run(api_call())
+
+
+def http_error(status_code, headers=None):
+    """Build an HTTPError carrying a response with a status code and headers"""
+    error = HTTPError(f"HTTP {status_code}")
+    error.response = Mock(status_code=status_code, headers=headers or {})
+    return error
+
+
+class TestRetryPolicy:
+    """Test the unified retry policy and run-wide retry budget"""
+
+    def test_honors_retry_after_on_429(self):
+        """Test that a 429 waits exactly as long as Retry-After asks"""
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=60)
+        func = Mock(side_effect=[http_error(429, {'Retry-After': '7'}), 'success'])
+
+        with patch('core.resilience.time.sleep') as mock_sleep:
+            assert policy.call(func) == 'success'
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    def test_rate_limit_header_sets_429_delay(self):
+        """Test that a 429 without Retry-After waits for one token at the reported rate"""
+        assert server_retry_delay(http_error(429, {'x-amzn-RateLimit-Limit': '0.5'})) == 2.0
+        assert server_retry_delay(http_error(429)) is None
+
+    def test_retry_after_beyond_max_delay_is_not_retried(self):
+        """Test that a Retry-After longer than max_delay fails fast instead of stalling the run"""
+        policy = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=30)
+        func = Mock(side_effect=http_error(429, {'Retry-After': '120'}))
+
+        with pytest.raises(HTTPError):
+            policy.call(func)
+        assert func.call_count == 1
+
+    def test_client_errors_are_not_retried(self):
+        """Test that 4xx errors other than 429 are raised immediately"""
+        policy = RetryPolicy(max_retries=3, base_delay=0.01)
+
+        for status_code in (400, 403, 404):
+            func = Mock(side_effect=http_error(status_code))
+            with pytest.raises(HTTPError):
+                policy.call(func)
+            assert func.call_count == 1
+
+    def test_server_errors_are_retried(self):
+        """Test that 5xx errors use exponential backoff"""
+        policy = RetryPolicy(max_retries=2, base_delay=0.5, backoff_factor=2, jitter=False)
+        func = Mock(side_effect=[http_error(503), http_error(503), 'success'])
+
+        with patch('core.resilience.time.sleep') as mock_sleep:
+            assert policy.call(func) == 'success'
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]
+
+    def test_budget_limits_retries(self):
+        """Test that retries stop once the run-wide budget is spent"""
+        budget = RetryBudget(ratio=1.0, min_retries=0)
+        policy = RetryPolicy(max_retries=3, base_delay=0, jitter=False, budget=budget)
+        func = Mock(side_effect=http_error(503))
+
+        with patch('core.resilience.time.sleep'):
+            with pytest.raises(HTTPError):
+                policy.call(func)
+
+        # One first attempt allows a single retry at ratio 1.0
+        assert func.call_count == 2
+        assert budget.snapshot() == {'requests': 1, 'retries': 1, 'denied': 1}
+
+    def test_budget_grows_with_requests(self):
+        """Test that the budget allows a fraction of the requests made"""
+        budget = RetryBudget(ratio=0.1, min_retries=0)
+        for _ in range(50):
+            budget.record_request()
+
+        allowed = sum(budget.try_acquire() for _ in range(10))
+        assert allowed == 5
+
+    def test_async_policy_honors_retry_after(self):
+        """Test that the coroutine path sleeps as long as the server asks"""
+        policy = RetryPolicy(max_retries=1, base_delay=0.01, retry_on=(HTTPError,))
+        calls = []
+
+        async def api_call():
+            calls.append(1)
+            if len(calls) == 1:
+                raise http_error(429, {'Retry-After': '3'})
+            return 'success'
+
+        with patch('core.resilience.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            assert asyncio.run(policy.call_async(api_call)) == 'success'
+
+        mock_sleep.assert_called_once_with(3.0)
+
+    def test_session_adapter_does_not_retry(self):
+        """Test that the pooled session leaves retries to RetryPolicy"""
+        session = create_session_with_pool(max_connections=5)
+        assert session.adapters['https://'].max_retries.total == 0
+
+
 class TestConnectionPooling:
     """Test connection pooling functionality"""
 
@@ -219,6 +452,75 @@ class TestConnectionPooling:
         assert session1 is session2
 
 
+class TestRateLimiting:
+    """Test token bucket rate limiting"""
+
+    def test_burst_is_not_delayed(self):
+        """Test that requests within the burst proceed immediately"""
+        bucket = TokenBucket(rate=1.0, burst=3)
+
+        waits = [bucket.acquire() for _ in range(3)]
+        assert waits == [0.0, 0.0, 0.0]
+
+    def test_requests_beyond_burst_are_paced(self):
+        """Test that requests beyond the burst wait for the sustained rate"""
+        bucket = TokenBucket(rate=20.0, burst=1)
+
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # Two paced requests at 20/s need about 0.1s
+        assert elapsed >= 0.09
+
+    def test_bucket_is_shared_across_threads(self):
+        """Test that concurrent callers share one rate"""
+        import threading
+
+        bucket = TokenBucket(rate=50.0, burst=1)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        # Five paced requests at 50/s need about 0.1s no matter how many threads
+        assert elapsed >= 0.09
+
+    def test_default_limits_cover_sp_api_operations(self):
+        """Test that documented usage plans are configured for every operation we call"""
+        for operation in ['getInventorySummaries', 'deleteListingsItem', 'createReport', 'getReport', 'token']:
+            assert operation in DEFAULT_RATE_LIMITS
+
+        assert DEFAULT_RATE_LIMITS['getInventorySummaries'] == RateLimit(rate=2.0, burst=2)
+
+    def test_unknown_operation_is_not_limited(self):
+        """Test that operations without a usage plan pass straight through"""
+        limiter = RateLimiter(limits={})
+        assert limiter.acquire('someNewOperation') == 0.0
+
+    def test_rate_updates_from_response_header(self):
+        """Test that x-amzn-RateLimit-Limit replaces the default rate"""
+        limiter = RateLimiter()
+        limiter.acquire('getInventorySummaries')
+
+        limiter.update_from_headers('getInventorySummaries', {'x-amzn-RateLimit-Limit': '5.0'})
+        assert limiter._get_bucket('getInventorySummaries').rate == 5.0
+
+        # Missing or malformed headers leave the rate unchanged
+        limiter.update_from_headers('getInventorySummaries', {})
+        limiter.update_from_headers('getInventorySummaries', {'x-amzn-RateLimit-Limit': 'n/a'})
+        assert limiter._get_bucket('getInventorySummaries').rate == 5.0
+
+    def test_global_rate_limiter_reuse(self):
+        """Test that the global rate limiter is shared"""
+        assert get_rate_limiter() is get_rate_limiter()
+
+
 class TestResilienceMetrics:
     """Test resilience metrics tracking"""
 
@@ -288,7 +590,7 @@ class TestErrorHandlingIntegration:
 
         # Create processor with mock API
         mock_amazon_api = Mock()
-        mock_amazon_api.check_fba_inventory.side_effect = requests.RequestException("API Error")
+        mock_amazon_api.check_fba_inventory_batch.side_effect = requests.RequestException("API Error")
 
         processor = DataProcessor(amazon_api=mock_amazon_api)
 
@@ -0,0 +1,83 @@
+"""
+Unit tests for cross-process rate limit coordination
+Tests SQLite-backed token buckets shared between limiters and processes
+"""
+import multiprocessing
+import sqlite3
+import time
+from unittest.mock import patch
+
+from core.resilience import RateLimit, RateLimiter, get_rate_limiter
+from core.shared_rate_limiter import SharedBucketStore
+
+
+def reserve_waits(path, count, queue):
+    """Reserve tokens from a separate process and report the waits"""
+    limiter = RateLimiter({'testOp': RateLimit(rate=10.0, burst=2)}, store=SharedBucketStore(path))
+    queue.put([limiter._get_bucket('testOp').reserve() for _ in range(count)])
+
+
+class TestSharedRateLimiter:
+    """Test SharedBucketStore and SharedTokenBucket functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.limits = {'testOp': RateLimit(rate=10.0, burst=2)}
+
+    def test_limiters_share_one_bucket(self, tmp_path):
+        """Test that two limiters on the same state file draw from the same burst"""
+        def limiter(path):
+            return RateLimiter(self.limits, store=SharedBucketStore(path))
+
+        path = str(tmp_path / 'seller.sqlite3')
+        first, second = limiter(path), limiter(path)
+
+        assert first._get_bucket('testOp').reserve() == 0.0
+        assert second._get_bucket('testOp').reserve() == 0.0
+        # Burst of 2 is spent across both limiters - the third caller waits
+        assert first._get_bucket('testOp').reserve() > 0
+
+    def test_rate_update_reaches_other_limiters(self, tmp_path):
+        """Test that a rate adopted from headers in one process is used by the others"""
+        path = str(tmp_path / 'seller.sqlite3')
+        first = RateLimiter(self.limits, store=SharedBucketStore(path))
+        second = RateLimiter(self.limits, store=SharedBucketStore(path))
+
+        first.update_from_headers('testOp', {'x-amzn-RateLimit-Limit': '1.0'})
+        second._get_bucket('testOp').reserve()
+
+        assert second._get_bucket('testOp').rate == 1.0
+
+    def test_processes_share_quota(self, tmp_path):
+        """Test that separate processes together stay within one burst"""
+        path = str(tmp_path / 'seller.sqlite3')
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        workers = [context.Process(target=reserve_waits, args=(path, 2, queue)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        waits = sorted(queue.get(timeout=30) + queue.get(timeout=30))
+        for worker in workers:
+            worker.join()
+
+        # Four reservations against a burst of 2 at 10/s: two immediate, then 0.1s and 0.2s
+        assert waits[:2] == [0.0, 0.0]
+        assert abs(waits[2] - 0.1) < 0.05
+        assert abs(waits[3] - 0.2) < 0.05
+
+    def test_state_file_error_falls_back_to_local_bucket(self, tmp_path):
+        """Test that an unusable state file degrades to process-local pacing"""
+        limiter = RateLimiter(self.limits, store=SharedBucketStore(str(tmp_path / 'seller.sqlite3')))
+        bucket = limiter._get_bucket('testOp')
+
+        with patch.object(bucket.store, 'update', side_effect=sqlite3.OperationalError('disk I/O error')):
+            assert bucket.reserve() == 0.0
+        assert bucket._fallback is not None
+
+    def test_global_limiter_per_state_file(self, tmp_path):
+        """Test that get_rate_limiter returns one shared limiter per state file"""
+        path = str(tmp_path / 'seller.sqlite3')
+
+        assert get_rate_limiter(path) is get_rate_limiter(path)
+        assert get_rate_limiter(path).store is not None
+        assert get_rate_limiter() is not get_rate_limiter(path)
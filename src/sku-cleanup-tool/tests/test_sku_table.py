@@ -0,0 +1,132 @@
+"""
+Unit tests for columnar SKU storage
+Tests dict-style row access, string interning, lazy detail loading and memory per SKU
+"""
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from core.data_processor import DataProcessor
+from core.sku_table import SkuRow, SkuTable
+
+
+def report_record(i):
+    """Parsed merchant listings row with realistic text fields"""
+    return {
+        'sku': f'SKU-{i:07d}',
+        'asin': f'B0{i:08d}',
+        'created_date': ''.join(['01/0', str(1 + i % 9), '/2023 10:00:00 GMT']),
+        'fulfillment_channel': ''.join(['DEF', 'AULT']),
+        'quantity': i % 5,
+        'item_name': f'Stainless steel travel mug with lid, 450ml, colour {i}',
+        'open_date': ''.join(['01/0', str(1 + i % 9), '/2023 10:00:00 GMT']),
+        'image_url': f'https://m.media-amazon.com/images/I/{i:011d}._SL75_.jpg',
+        'item_description': f'Double-walled vacuum insulated mug {i}. ' * 20,
+        'listing_id': f'{i:010d}ABC',
+        'seller_sku': f'SKU-{i:07d}'
+    }
+
+
+class TestSkuTable:
+    """Test SkuTable functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.records = [
+            {'sku': 'SKU-1', 'created_date': '01/01/2023', 'fulfillment_channel': 'AMAZON', 'status': 'Active'},
+            {'sku': 'SKU-2', 'created_date': '01/01/2023', 'fulfillment_channel': 'DEFAULT', 'quantity': 3}
+        ]
+
+    def test_rows_behave_like_dicts(self):
+        """Test that rows read, write and compare like the records they were built from"""
+        table = SkuTable.from_records(self.records)
+
+        assert table == self.records
+        assert isinstance(table[0], SkuRow)
+        assert table[0]['status'] == 'Active'
+        assert 'quantity' not in table[0] and table[1].get('quantity') == 3
+
+        table[1]['is_eligible_for_deletion'] = False
+        assert table[1]['is_eligible_for_deletion'] is False
+        assert 'is_eligible_for_deletion' not in table[0]
+        assert table.column('is_eligible_for_deletion', True) == [True, False]
+
+    def test_repeated_text_shares_one_string(self):
+        """Test that equal dates and channels from separate rows are stored as one object"""
+        table = SkuTable.from_records(report_record(i) for i in range(0, 18, 9))
+
+        first, second = table.column('created_date')
+        assert first is second
+        assert table[0]['fulfillment_channel'] is table[1]['fulfillment_channel']
+
+    def test_slices_are_independent_tables(self):
+        """Test that slicing yields a sub-table whose writes do not reach the original"""
+        table = SkuTable.from_records(self.records)
+
+        tail = table[1:]
+        tail[0]['age_days'] = 400
+        combined = SkuTable()
+        combined.extend(table[:1])
+        combined.extend(tail)
+
+        assert isinstance(tail, SkuTable) and len(tail) == 1
+        assert 'age_days' not in table[1]
+        assert combined.column('age_days') == [None, 400]
+        assert combined[0]['status'] == 'Active'
+
+    def test_details_loaded_on_demand(self):
+        """Test that fields dropped from report rows are loaded only when asked for"""
+        loader = Mock(return_value={'SKU-0000001': report_record(1)})
+        table = SkuTable.from_records((report_record(i) for i in range(3)), detail_loader=loader, keep_details=False)
+
+        assert 'item_description' not in table[1]
+        loader.assert_not_called()
+
+        details = table[1].details()
+
+        loader.assert_called_once_with({'SKU-0000001'})
+        assert details['item_name'] == report_record(1)['item_name']
+        assert details['sku'] == 'SKU-0000001'
+
+    def test_memory_per_sku_an_order_of_magnitude_lower(self):
+        """Test that the table holds a report with a tenth of the memory of parsed row dicts"""
+        def allocated(build):
+            tracemalloc.start()
+            kept = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+            return size
+
+        dict_bytes = allocated(lambda: [report_record(i) for i in range(2000)])
+        table_bytes = allocated(lambda: SkuTable.from_records((report_record(i) for i in range(2000)),
+                                                              keep_details=False))
+
+        assert table_bytes * 10 <= dict_bytes
+
+    def test_processing_leaves_input_table_unchanged(self):
+        """Test that DataProcessor returns a new table of results without copying rows into dicts"""
+        old_date = (datetime.now() - timedelta(days=60)).strftime('%d/%m/%Y')
+        table = SkuTable.from_records([
+            {'sku': 'OLD', 'created_date': old_date, 'fulfillment_channel': 'DEFAULT'},
+            {'created_date': old_date, 'fulfillment_channel': 'DEFAULT'}
+        ])
+
+        processed = DataProcessor().process_sku_data(table)
+
+        assert isinstance(processed, SkuTable)
+        assert [sku['sku'] for sku in processed] == ['OLD']
+        assert processed[0]['is_eligible_for_deletion'] is True
+        assert processed[0]['listing_inventory_check'] == 'not_applicable'
+        assert 'fba_inventory_check' not in processed[0]
+        assert 'age_days' not in table[0]
+
+    def test_extend_respects_keep_details(self):
+        """Test that a table built without details does not pick up extra fields from the tables it extends"""
+        full = SkuTable.from_records(report_record(i) for i in range(2))
+        combined = SkuTable(keep_details=False)
+        combined.extend(full)
+
+        assert len(combined) == 2
+        assert 'item_description' not in combined[0]
+        assert combined[1]['sku'] == 'SKU-0000001'
@@ -0,0 +1,126 @@
+"""
+Unit tests for LWA access token management
+Tests single-flight refresh, on-disk caching and proactive refresh
+"""
+import os
+import stat
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from core.amazon_api import AmazonAPI
+from core.token_manager import AccessTokenManager, TokenCache, token_cache_key
+
+
+class TestAccessTokenManager:
+    """Test AccessTokenManager functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.fetch = Mock(return_value={'access_token': 'token-1', 'expires_in': 3600})
+
+    def test_single_flight_refresh(self):
+        """Test that concurrent callers share one token refresh"""
+        def slow_fetch():
+            time.sleep(0.05)
+            return {'access_token': 'token-1', 'expires_in': 3600}
+
+        self.fetch.side_effect = slow_fetch
+        manager = AccessTokenManager(self.fetch, background_refresh=False)
+
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert tokens == ['token-1'] * 8
+        assert self.fetch.call_count == 1
+
+    def test_refreshes_inside_margin(self):
+        """Test that a token within the refresh margin is replaced"""
+        self.fetch.side_effect = [
+            {'access_token': 'short', 'expires_in': 200},
+            {'access_token': 'token-2', 'expires_in': 3600}
+        ]
+        manager = AccessTokenManager(self.fetch, refresh_margin_seconds=300, background_refresh=False)
+
+        assert manager.get_token() == 'short'
+        assert manager.get_token() == 'token-2'
+
+    def test_persisted_token_reused_by_new_manager(self, tmp_path):
+        """Test that a second process-like manager reuses the cached token without fetching"""
+        cache = TokenCache(str(tmp_path / 'token_cache.json'))
+        AccessTokenManager(self.fetch, cache=cache, cache_key='key', background_refresh=False).get_token()
+
+        second_fetch = Mock()
+        manager = AccessTokenManager(second_fetch, cache=TokenCache(cache.path), cache_key='key', background_refresh=False)
+
+        assert manager.get_token() == 'token-1'
+        second_fetch.assert_not_called()
+
+    def test_cache_file_is_owner_only(self, tmp_path):
+        """Test that the token cache is written with 0600 permissions"""
+        path = str(tmp_path / 'token_cache.json')
+        TokenCache(path).save('key', 'secret', time.time() + 3600)
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    def test_cache_keys_do_not_contain_refresh_token(self):
+        """Test that cache keys are hashed and differ per credentials"""
+        key = token_cache_key('client', 'refresh-secret')
+
+        assert 'refresh-secret' not in key
+        assert key != token_cache_key('client', 'other-refresh')
+
+    def test_background_refresh_replaces_token(self):
+        """Test that the background timer refreshes before the token expires"""
+        self.fetch.side_effect = [
+            {'access_token': 'token-1', 'expires_in': 3600},
+            {'access_token': 'token-2', 'expires_in': 3600}
+        ]
+        manager = AccessTokenManager(self.fetch, refresh_margin_seconds=300)
+
+        with patch('core.token_manager.threading.Timer') as mock_timer:
+            manager.get_token()
+            delay, callback = mock_timer.call_args[0]
+            assert 3600 - 300 - 61 < delay < 3600 - 300
+
+            callback()
+
+        assert manager.access_token == 'token-2'
+        manager.close()
+
+    def test_background_failure_keeps_current_token(self):
+        """Test that a failed background refresh leaves the current token in place"""
+        self.fetch.side_effect = [{'access_token': 'token-1', 'expires_in': 3600}, Exception('LWA down')]
+        manager = AccessTokenManager(self.fetch)
+
+        with patch('core.token_manager.threading.Timer') as mock_timer:
+            manager.get_token()
+            mock_timer.call_args[0][1]()
+
+        assert manager.get_token() == 'token-1'
+
+
+class TestAmazonAPIToken:
+    """Test AmazonAPI token integration"""
+
+    def test_get_access_token_uses_manager(self, tmp_path):
+        """Test that AmazonAPI fetches the token through the session once"""
+        credentials = Mock()
+        credentials.marketplace_id = 'ATVPDKIKX0DER'
+        with patch('boto3.Session'):
+            api = AmazonAPI(credentials)
+        api.token_manager.cache = TokenCache(str(tmp_path / 'token_cache.json'))
+        api.token_manager.background_refresh = False
+        api.rate_limiter = None
+
+        response = Mock()
+        response.json.return_value = {'access_token': 'token-1', 'expires_in': 3600}
+        with patch.object(api.session, 'post', return_value=response) as mock_post:
+            assert api._get_access_token() == 'token-1'
+            assert api._get_access_token() == 'token-1'
+
+        mock_post.assert_called_once()
@@ -0,0 +1,59 @@
+"""
+Unit tests for targeted post-deletion verification
+Tests per-SKU checks, batched search and error fallbacks
+"""
+import asyncio
+from unittest.mock import Mock, AsyncMock
+
+from core.verification import DeletionVerifier
+
+
+class TestDeletionVerifier:
+    """Test DeletionVerifier functionality"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.api = Mock()
+
+    def test_small_sets_use_get_listings_item(self):
+        """Test that a few deleted SKUs are checked individually"""
+        self.api.listing_exists.side_effect = lambda sku: sku == 'STILL-THERE'
+        verifier = DeletionVerifier(self.api, max_workers=4, search_threshold=5)
+
+        verified = verifier.verify(['GONE-1', 'STILL-THERE', 'GONE-2'])
+
+        assert verified == ['GONE-1', 'GONE-2']
+        assert self.api.listing_exists.call_count == 3
+        self.api.search_listings_items.assert_not_called()
+
+    def test_large_sets_use_search(self):
+        """Test that larger sets are verified with batched searchListingsItems calls"""
+        deleted = [f'SKU-{i}' for i in range(30)]
+        self.api.search_listings_items.return_value = {'SKU-7'}
+        verifier = DeletionVerifier(self.api, search_threshold=5)
+
+        verified = verifier.verify(deleted)
+
+        assert 'SKU-7' not in verified
+        assert len(verified) == 29
+        self.api.search_listings_items.assert_called_once_with(deleted)
+        self.api.listing_exists.assert_not_called()
+
+    def test_check_errors_assume_deleted(self):
+        """Test that a failed check falls back to trusting the accepted deletion"""
+        self.api.listing_exists.side_effect = Exception('HTTP 503')
+
+        assert DeletionVerifier(self.api).verify(['SKU-1']) == ['SKU-1']
+
+    def test_empty_input(self):
+        """Test that nothing is called when there is nothing to verify"""
+        assert DeletionVerifier(self.api).verify([]) == []
+        self.api.listing_exists.assert_not_called()
+
+    def test_verify_async(self):
+        """Test that async verification checks SKUs concurrently and keeps input order"""
+        self.api.listing_exists = AsyncMock(side_effect=lambda sku: sku == 'B')
+
+        verified = asyncio.run(DeletionVerifier(self.api, max_workers=2).verify_async(['A', 'B', 'C']))
+
+        assert verified == ['A', 'C']